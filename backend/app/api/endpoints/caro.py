@@ -36,6 +36,7 @@ async def create_new_game(
     - `board_size`: Board dimensions (10-20, default: 15)
     - `win_length`: Pieces needed to win (3-board_size, default: 5)
     - `mode`: 'pvp' (player vs player) or 'ai' (player vs computer)
+    - `rule`: 'freestyle' (default), 'exact_five', 'blocked_ends' or 'renju'
     
     **Returns**:
     - Empty board
@@ -51,7 +52,8 @@ async def create_new_game(
     game_state = service.create_new_game(
         board_size=request.board_size or 15,
         win_length=request.win_length or 5,
-        mode=request.mode or "pvp"
+        mode=request.mode or "pvp",
+        rule=request.rule or "freestyle"
     )
     
     return CaroGameStateResponse(
@@ -84,6 +86,7 @@ async def make_move(
     - `col`: Column index (0-based)
     - `player`: Player number (1 or 2)
     - `win_length`: Win condition (default: 5)
+    - `rule`: Rule variant (default: 'freestyle')
     
     **Returns**:
     - Updated board after move
@@ -98,6 +101,10 @@ async def make_move(
     **Win Condition**:
     - Get 5 (or win_length) pieces in a row
     - Can be horizontal, vertical, or diagonal
+    - `exact_five`: overlines (6+) do not win
+    - `blocked_ends`: a five blocked at both ends does not win
+    - `renju`: Black needs exactly five; double-three, double-four and
+      overline are forbidden for Black
     """
     service = CaroService(db)
     
@@ -106,7 +113,8 @@ async def make_move(
         row=request.row,
         col=request.col,
         player=request.player,
-        win_length=request.win_length or 5
+        win_length=request.win_length or 5,
+        rule=request.rule or "freestyle"
     )
     
     if not result.get("valid"):
@@ -155,6 +163,7 @@ async def get_ai_move(
     - `ai_player`: AI player number (1 or 2)
     - `win_length`: Win condition (default: 5)
     - `difficulty`: AI difficulty ('easy', 'medium', 'hard')
+    - `rule`: Rule variant (default: 'freestyle'); AI never suggests a forbidden move
     
     **Returns**:
     - Suggested move coordinates (row, col)
@@ -170,7 +179,8 @@ async def get_ai_move(
         board=request.board,
         ai_player=request.ai_player,
         win_length=request.win_length or 5,
-        difficulty=request.difficulty or "medium"
+        difficulty=request.difficulty or "medium",
+        rule=request.rule or "freestyle"
     )
     
     return {
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.models.cube import DetectionResponse, CubeStateRequest, CubeStateResponse
-from app.services.detection_service import DetectionService
+from app.models.cube import (
+    DetectionResponse, CubeDetectionResponse, CubeStateRequest, CubeStateResponse, FaceName
+)
+from app.services.detection_service import detection_service
 from app.services.cube_validator import CubeValidator
 
 router = APIRouter()
-detection_service = DetectionService()
 cube_validator = CubeValidator()
 
 
@@ -36,6 +37,48 @@ async def detect_cube_face(
     return result
 
 
+@router.post("/detect/batch", response_model=CubeDetectionResponse)
+async def detect_cube(
+    front: UploadFile = File(...),
+    back: UploadFile = File(...),
+    left: UploadFile = File(...),
+    right: UploadFile = File(...),
+    top: UploadFile = File(...),
+    bottom: UploadFile = File(...)
+):
+    """
+    Detect all six faces in one request and validate the cube.
+    
+    Colors are calibrated across the six photos (joint clustering with
+    exactly 9 stickers per color), which is more robust to lighting
+    differences than six separate /detect calls.
+    
+    Args:
+        front, back, left, right, top, bottom: Image of each face
+    
+    Returns:
+        CubeDetectionResponse with per-face colors and the validated state
+    """
+    uploads = {
+        FaceName.FRONT: front,
+        FaceName.BACK: back,
+        FaceName.LEFT: left,
+        FaceName.RIGHT: right,
+        FaceName.TOP: top,
+        FaceName.BOTTOM: bottom,
+    }
+    
+    # Validate file types
+    for name, upload in uploads.items():
+        if not upload.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail=f"File for {name.value} face must be an image")
+    
+    # Read images
+    images = {name: await upload.read() for name, upload in uploads.items()}
+    
+    return await detection_service.detect_cube(images)
+
+
 @router.post("/validate", response_model=CubeStateResponse)
 async def validate_cube_state(cube_state: CubeStateRequest):
     """
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.models.cube import CubeStateRequest
-from app.models.solution import SolutionResponse
+from app.core.exceptions import AppException
+from app.models.solution import SolutionResponse, SolveBatchRequest
 from app.services.solver_service import SolverService
 from app.services.cube_validator import CubeValidator
+from app.services.solution_optimizer import METRICS
 import time
 
 router = APIRouter()
@@ -11,21 +14,37 @@ cube_validator = CubeValidator()
 
 
 @router.post("/solve", response_model=SolutionResponse)
-async def solve_cube(cube_state: CubeStateRequest):
+async def solve_cube(
+    cube_state: CubeStateRequest,
+    frames: bool = False,
+    metric: str = "htm",
+    optimize: bool = False,
+    optimal: bool = False
+):
     """
     Solve the Rubik's cube and return step-by-step solution.
     
     Args:
         cube_state: Complete validated cube state with all 6 faces
+        frames: Include the facelet string after each step (3D viewer)
+        metric: 'htm' (half turn = 1 move) or 'qtm' (half turn = 2 moves)
+        optimize: Re-solve in parallel for a shorter solution (slower)
+        optimal: Try for the shortest possible solution within a time
+            budget (needs the pattern databases); `optimal` in the
+            response says whether it was found
     
     Returns:
         SolutionResponse with solving steps and algorithm
     """
-    start_time = time.time()
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(METRICS)}")
+    
+    start_time = time.perf_counter()
     
     try:
         # First validate and get Kociemba notation
         validation_result = cube_validator.validate(cube_state)
+        validation_time = time.perf_counter() - start_time
         
         if not validation_result.is_valid:
             return SolutionResponse(
@@ -33,19 +52,50 @@ async def solve_cube(cube_state: CubeStateRequest):
                 steps=[],
                 total_moves=0,
                 algorithm="",
-                execution_time=0.0,
+                execution_time=validation_time,
                 error_message=validation_result.error_message
             )
         
         # Solve the cube using the validated notation
-        solution = await solver_service.solve(cube_state, notation=validation_result.notation)
+        solution = await solver_service.solve(
+            cube_state,
+            notation=validation_result.notation,
+            include_frames=frames,
+            metric=metric,
+            optimize=optimize,
+            optimal=optimal
+        )
         
-        execution_time = time.time() - start_time
-        solution.execution_time = execution_time
+        if solution.timings is not None:
+            solution.timings.validation = validation_time
+        solution.execution_time += validation_time
         
         return solution
     
+    except AppException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Solving failed: {str(e)}")
+
+
+@router.post("/solve/batch")
+async def solve_batch(request: SolveBatchRequest):
+    """
+    Solve many cubes at once (e.g. grading a set of scrambles).
+    
+    Args:
+        request: Up to 500 cube states or 54-char facelet strings
+    
+    Returns:
+        NDJSON (application/x-ndjson), one object per cube in input order:
+        `index`, `success`, `notation`, `algorithm`, `total_moves`,
+        `cached`, `verified`, `execution_time`, `error_message`.
+        Invalid cubes are reported without being solved; identical cubes
+        are solved once; solves run in parallel on the solver pool.
+    """
+    return StreamingResponse(
+        solver_service.solve_batch(request.cubes),
+        media_type="application/x-ndjson"
+    )
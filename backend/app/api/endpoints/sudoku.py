@@ -2,12 +2,17 @@
 Sudoku Game Endpoints
 Clean architecture with service layer
 """
-from fastapi import APIRouter, Depends
+import time
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_user, get_optional_user
+from app.core.exceptions import AppException
 from app.models.user import User
 from app.models.schemas import (
     SudokuNewGameRequest,
@@ -15,13 +20,30 @@ from app.models.schemas import (
     SudokuValidateRequest,
     SudokuValidateResponse,
     SudokuMoveRequest,
-    SudokuSaveScoreRequest
+    SudokuSaveScoreRequest,
+    SudokuSolveRequest,
+    SudokuSolveResponse,
+    SudokuSessionMoveRequest,
+    SudokuCheckGridRequest,
+    SudokuVariantSolveRequest,
+    SudokuVariantSolveResponse
 )
 from app.services.sudoku_service import SudokuService
+from app.services.sudoku_batch import aiter_lines, aiter_spooled, spool_lines, sudoku_batch_runner
+from app.services.sudoku_daily import RenderedPayload
 
 router = APIRouter(prefix="/sudoku", tags=["Sudoku"])
 
 
+def _cached_json(request: Request, payload: RenderedPayload) -> Response:
+    """Serve a pre-rendered payload with ETag / If-None-Match support"""
+    max_age = max(0, int(payload.expires_at - time.time()))
+    headers = {"ETag": payload.etag, "Cache-Control": f"public, max-age={max_age}"}
+    if payload.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
 @router.post("/new", response_model=SudokuPuzzleResponse, status_code=200)
 async def get_new_puzzle(
     difficulty: str = "medium",
@@ -38,7 +60,7 @@ async def get_new_puzzle(
     
     **Returns**:
     - Puzzle ID and grid (9x9 matrix)
-    - Solution grid (for validation)
+    - Solution grid (for validation; omitted for today's daily challenge)
     - Difficulty level
     - Creation timestamp
     
@@ -98,6 +120,77 @@ async def make_move(
     return result
 
 
+@router.post("/session", status_code=201)
+async def start_session(
+    difficulty: str = "medium",
+    puzzle_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Start a server-side Sudoku session
+    
+    **Authentication**: Not required
+    
+    **Query Parameters**:
+    - `difficulty`: Puzzle difficulty ('easy', 'medium', 'hard')
+    - `puzzle_id`: Optional specific puzzle ID
+    
+    **Returns**:
+    - `session_id` to use with `/session/move`
+    - Current grid and given-cell mask
+    
+    **Note**: Sessions expire after a period of inactivity
+    """
+    service = SudokuService(db)
+    return service.start_session(difficulty=difficulty.lower(), puzzle_id=puzzle_id)
+
+
+@router.get("/session/{session_id}")
+async def get_session(
+    session_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current state of a Sudoku session
+    
+    **Authentication**: Not required
+    """
+    service = SudokuService(db)
+    return service.get_session(session_id).to_dict()
+
+
+@router.post("/session/move")
+async def make_session_move(
+    request: SudokuSessionMoveRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Make a move in a Sudoku session
+    
+    **Authentication**: Not required
+    
+    **Request**:
+    - `session_id`: Session from `/session`
+    - `row`, `col`: Cell position (0-8)
+    - `value`: Number to place (1-9) or 0 to clear
+    
+    **Returns**:
+    - Move validation result and conflict type (row/column/box) if invalid
+    - Filled cell count and completion status
+    
+    Unlike `/move`, the grid is not sent back and forth: the server keeps
+    row/column/box masks, so every check is constant time.
+    """
+    service = SudokuService(db)
+    
+    return service.session_move(
+        session_id=request.session_id,
+        row=request.row,
+        col=request.col,
+        value=request.value
+    )
+
+
 @router.post("/validate")
 async def validate_move(
     request: SudokuMoveRequest,
@@ -134,21 +227,22 @@ async def validate_move(
 @router.post("/hint")
 async def get_hint(
     puzzle_grid: List[List[int]],
-    solution_grid: List[List[int]],
+    solution_grid: Optional[List[List[int]]] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get a hint for the current puzzle
+    Get a logical hint for the current puzzle
     
     **Authentication**: Not required
     
     **Request**:
     - `puzzle_grid`: Current grid with user's progress
-    - `solution_grid`: Complete solution grid
+    - `solution_grid`: Complete solution grid (optional, used to flag wrong entries)
     
     **Returns**:
-    - Position (row, col) of hint
-    - Correct value for that position
+    - Position (row, col) and value of the next placement
+    - Technique used (naked/hidden single, pointing, pairs, X-Wing, ...)
+    - Candidates eliminated on the way to the placement
     - Hint message
     
     **Note**: Using hints may reduce final score
@@ -163,6 +257,141 @@ async def get_hint(
     return hint
 
 
+@router.post("/check-grid")
+async def check_grid(
+    request: SudokuCheckGridRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Check every cell of a grid in one request
+    
+    **Authentication**: Not required
+    
+    **Request**:
+    - `grid`: Current grid with user's progress
+    - `solution_grid`: Solution grid (optional)
+    - `puzzle_id`: Puzzle ID to look the solution up (optional)
+    
+    **Returns**:
+    - `conflict_cells`: Cells breaking a row/column/box rule
+    - `wrong_cells`: Cells that differ from the solution (null without one)
+    - `dead_cells`: Empty cells with no candidate left
+    - `candidate_counts`: 9x9 remaining candidates per cell (0 when filled)
+    - `solved`, `has_errors`
+    """
+    service = SudokuService(db)
+    
+    return service.check_grid(
+        grid=request.grid,
+        solution_grid=request.solution_grid,
+        puzzle_id=request.puzzle_id
+    )
+
+
+@router.post("/solve", response_model=SudokuSolveResponse)
+async def solve_puzzle(
+    request: SudokuSolveRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Solve a user-entered Sudoku grid
+    
+    **Authentication**: Not required
+    
+    **Request**:
+    - `grid`: 9x9 grid, 0 for empty cells
+    
+    **Returns**:
+    - Whether the grid is solvable and the solution is unique
+    - Solution grid (if solvable)
+    - Solver statistics (naked/hidden singles, guesses)
+    """
+    service = SudokuService(db)
+    result = await run_in_threadpool(service.solve_puzzle, request.grid)
+    
+    return SudokuSolveResponse(**result)
+
+
+@router.post("/batch")
+async def batch_check(request: Request):
+    """
+    Bulk solve/validate puzzles (puzzle-pack import and QA)
+    
+    **Authentication**: Not required
+    
+    **Request body** (text/plain), one puzzle per line:
+    - 81 characters, '0' or '.' for empty cells
+    - Optionally followed by a comma/space and the expected solution
+    
+    **Returns** (application/x-ndjson), one JSON object per puzzle, in input order:
+    - `line`, `puzzle`, `solvable`, `unique`, `clues`, `solution`
+    - `difficulty` graded by the technique engine (unique puzzles only)
+    - `solution_matches` when an expected solution was given
+    - `error` for malformed lines
+    
+    The body is spooled to a temporary file first (lines longer than
+    `SUDOKU_BATCH_MAX_LINE_LENGTH` are rejected with 400), then checked on
+    a process pool with results streamed as they are ready.
+    """
+    try:
+        spool = await spool_lines(aiter_lines(request.stream()))
+    except ValueError as e:
+        raise AppException(str(e), status_code=400)
+    
+    return StreamingResponse(
+        sudoku_batch_runner.stream(aiter_spooled(spool)),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/variant/solve", response_model=SudokuVariantSolveResponse)
+async def solve_variant(
+    request: SudokuVariantSolveRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Solve a 4x4, 9x9, 16x16 or 25x25 Sudoku (Dancing Links exact cover)
+    
+    **Authentication**: Not required
+    
+    **Request**:
+    - `grid`: NxN matrix (0 = empty) or grid string of N*N characters
+      ('0'/'.' = empty, 1-9 then A-P for values 10-25)
+    
+    **Returns**:
+    - Whether the grid is solvable and the solution is unique
+    - Solution as a matrix and as a grid string
+    """
+    service = SudokuService(db)
+    result = await run_in_threadpool(service.solve_variant, request.grid)
+    
+    return SudokuVariantSolveResponse(**result)
+
+
+@router.post("/variant/new")
+async def new_variant_puzzle(
+    size: int = 16,
+    difficulty: str = "medium",
+    db: Session = Depends(get_db)
+):
+    """
+    Generate a 4x4, 9x9, 16x16 or 25x25 puzzle
+    
+    **Authentication**: Not required
+    
+    **Query Parameters**:
+    - `size`: Grid size (4, 9, 16, 25)
+    - `difficulty`: 'easy', 'medium' or 'hard' (share of clues kept)
+    
+    **Returns**:
+    - Puzzle and solution as matrices and grid strings
+    
+    **Note**: 25x25 generation takes a few seconds; it runs off the event loop
+    """
+    service = SudokuService(db)
+    return await run_in_threadpool(service.generate_variant, size, difficulty.lower())
+
+
 @router.post("/save-score", status_code=201)
 async def save_completion_score(
     request: "SudokuSaveScoreRequest",
@@ -241,6 +470,59 @@ async def get_leaderboard(
     }
 
 
+@router.get("/daily")
+async def get_daily_challenge(
+    request: Request,
+    difficulty: str = "medium",
+    db: Session = Depends(get_db)
+):
+    """
+    Get today's daily challenge (UTC day)
+    
+    **Authentication**: Not required
+    
+    **Query Parameters**:
+    - `difficulty`: 'easy', 'medium' or 'hard'
+    
+    **Returns**:
+    - Date, puzzle ID, grid, clue count and technique grade
+    - No solution (save the score with this `puzzle_id` to enter the daily leaderboard)
+    
+    **Caching**: Pre-rendered ahead of midnight. Responses carry an `ETag`
+    and are cacheable until the end of the day; `If-None-Match` returns 304.
+    """
+    service = SudokuService(db)
+    daily = service.get_daily_challenge(difficulty.lower())
+    return _cached_json(request, daily.payload)
+
+
+@router.get("/daily/leaderboard")
+async def get_daily_leaderboard(
+    request: Request,
+    difficulty: str = "medium",
+    limit: int = 10,
+    db: Session = Depends(get_db)
+):
+    """
+    Get today's daily challenge leaderboard
+    
+    **Authentication**: Not required
+    
+    **Query Parameters**:
+    - `difficulty`: 'easy', 'medium' or 'hard'
+    - `limit`: Number of top players (default: 10, max: 100)
+    
+    **Returns**:
+    - Best score per user for today's puzzle, ties broken by time
+    
+    **Caching**: Rendered results are reused for a few seconds
+    (`SUDOKU_DAILY_LEADERBOARD_TTL`); `If-None-Match` returns 304.
+    """
+    service = SudokuService(db)
+    payload = service.get_daily_leaderboard(difficulty.lower(), min(limit, 100))
+    return _cached_json(request, payload)
+
+
 @router.get("/stats")
 async def get_user_stats(
     current_user: User = Depends(get_current_user),
@@ -296,7 +578,7 @@ async def get_puzzle_by_id(
     **Authentication**: Not required
     
     **Returns**:
-    - Puzzle data with grid and solution
+    - Puzzle data with grid and solution (no solution for today's daily challenge)
     """
     service = SudokuService(db)
     puzzle = service.get_puzzle(puzzle_id=puzzle_id)
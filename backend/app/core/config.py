@@ -38,8 +38,53 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_IMAGE_EXTENSIONS: List[str] = [".jpg", ".jpeg", ".png"]
     
+    # Detection Settings
+    DETECTION_THREADS: int = 6  # Images decoded/processed at once, off the event loop
+    DETECTION_MAX_QUEUE: int = 32  # Images waiting for a thread before rejecting (503)
+    DETECTION_MAX_SIZE: int = 800  # Longest image side (px) detection works at; uploads are decoded down to it
+    
     # Cube Settings
     CUBE_SIZE: int = 3
+    RUBIK_WARMUP_ON_STARTUP: bool = True  # Load kociemba tables before serving
+    RUBIK_SOLVER_WORKERS: int = 2  # Solver processes
+    RUBIK_SOLVER_MAX_QUEUE: int = 32  # Solves waiting for a worker before rejecting (503)
+    RUBIK_SOLVE_TIMEOUT: float = 10.0  # Seconds before a solve is killed (504)
+    RUBIK_OPTIMIZE_RUNS: int = 3  # Parallel re-solves with tighter depth limits (?optimize=true)
+    RUBIK_OPTIMIZE_WORKERS: int = 2  # Processes for those re-solves (separate from RUBIK_SOLVER_WORKERS); caps the runs
+    RUBIK_OPTIMIZE_BUDGET: float = 2.0  # Seconds allowed for those re-solves
+    RUBIK_PDB_DIR: str = "data/rubik_pdb"  # Pattern databases for ?optimal=true
+    RUBIK_OPTIMAL_BUDGET: float = 10.0  # Seconds for the optimal search before falling back
+    RUBIK_OPTIMAL_WORKERS: int = 1  # Processes reserved for optimal searches (separate from RUBIK_SOLVER_WORKERS)
+    RUBIK_OPTIMAL_MAX_QUEUE: int = 0  # Optimal searches waiting for a worker before falling back to two-phase
+    RUBIK_CACHE_SIZE: int = 10000  # Solutions kept in memory per process
+    RUBIK_CACHE_TTL: int = 24 * 60 * 60  # Seconds a cached solution is reused
+    RUBIK_CACHE_PERSIST: bool = False  # Also store solutions in rubik_solutions
+    
+    # Sudoku Puzzle Pool (background generation)
+    SUDOKU_POOL_ENABLED: bool = True
+    SUDOKU_POOL_TARGET_SIZE: int = 100  # Puzzles per difficulty
+    SUDOKU_POOL_BATCH_SIZE: int = 10  # Puzzles per worker job / bulk insert
+    SUDOKU_POOL_WORKERS: int = 2
+    SUDOKU_POOL_REFILL_INTERVAL: int = 600  # Seconds between pool checks
+    SUDOKU_INDEX_REFRESH_OVERLAP: int = 300  # Seconds of created_at re-read per index refresh (late commits)
+    SUDOKU_STORE_SOLUTION: bool = True  # False: derive solutions with the solver on read
+    SUDOKU_STORE_TEXT: bool = False  # Also write legacy 81-char text columns
+    
+    # Sudoku Daily Challenge
+    SUDOKU_DAILY_ENABLED: bool = True
+    SUDOKU_DAILY_RETRY_INTERVAL: int = 300  # Seconds between retries while the pool is empty
+    SUDOKU_DAILY_LEADERBOARD_TTL: int = 15  # Seconds a rendered daily leaderboard is reused
+    
+    # Sudoku Play Sessions (in-process: single worker or sticky routing only)
+    SUDOKU_SESSION_MAX: int = 10000
+    SUDOKU_SESSION_TTL: int = 2 * 60 * 60  # Idle seconds before expiry
+    
+    # Sudoku Batch Check (bulk import / QA)
+    SUDOKU_BATCH_WORKERS: int = 2
+    SUDOKU_BATCH_CHUNK_SIZE: int = 200  # Lines per worker job
+    SUDOKU_BATCH_MAX_PENDING: int = 4  # Chunks in flight per request
+    SUDOKU_BATCH_MAX_LINE_LENGTH: int = 1024  # Longer input lines are rejected (400)
+    SUDOKU_BATCH_SPOOL_SIZE: int = 1024 * 1024  # Body bytes kept in memory before spilling to disk
     
     class Config:
         env_file = ".env"
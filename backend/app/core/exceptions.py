@@ -89,6 +89,24 @@ class CubeSolverError(AppException):
         super().__init__(message, status_code=500, error_code="CUBE_SOLVER_ERROR")
 
 
+class CubeSolverTimeoutError(AppException):
+    """Giải rubik quá thời gian cho phép"""
+    def __init__(self, message: str = "Solve timed out"):
+        super().__init__(message, status_code=504, error_code="CUBE_SOLVER_TIMEOUT")
+
+
+class CubeSolverBusyError(AppException):
+    """Hàng đợi solver đã đầy"""
+    def __init__(self, message: str = "Solver is busy, try again shortly"):
+        super().__init__(message, status_code=503, error_code="CUBE_SOLVER_BUSY")
+
+
+class DetectionBusyError(AppException):
+    """Hàng đợi nhận diện ảnh đã đầy"""
+    def __init__(self, message: str = "Image detection is busy, try again shortly"):
+        super().__init__(message, status_code=503, error_code="DETECTION_BUSY")
+
+
 # Validation Exceptions
 class ValidationError(AppException):
     """Lỗi validation"""
@@ -15,7 +15,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.core.config import settings
-from app.core.database import init_db, engine
+from app.core.database import init_db, engine, SessionLocal
 from app.core.exceptions import AppException
 from app.core.exception_handlers import (
     app_exception_handler,
@@ -24,9 +24,14 @@ from app.core.exception_handlers import (
     generic_exception_handler
 )
 from app.models import user, game  # Import models to register them
+from app.services.sudoku_pool import sudoku_pool_refiller
+from app.services.sudoku_batch import sudoku_batch_runner
+from app.services.sudoku_daily import sudoku_daily_challenge
+from app.services.sudoku_index import sudoku_puzzle_index
 
 # Import routers
 from app.api.endpoints import auth, game_2048, sudoku, caro, friend, message, announcement, admin, leaderboard
+from app.api.endpoints import solver, detection
 
 # Create FastAPI app
 app = FastAPI(
@@ -90,6 +95,39 @@ async def startup_event():
     print(f"📋 Environment: {'Development' if settings.DEBUG else 'Production'}")
     init_db()
     print("✅ Database initialized successfully")
+    
+    db = SessionLocal()
+    try:
+        indexed = sudoku_puzzle_index.load(db)
+    finally:
+        db.close()
+    print(f"🧩 Sudoku puzzle index loaded: {indexed} puzzles")
+    
+    if settings.SUDOKU_POOL_ENABLED:
+        sudoku_pool_refiller.start()
+        print("🧩 Sudoku puzzle pool refill started")
+    
+    if settings.SUDOKU_DAILY_ENABLED:
+        sudoku_daily_challenge.start()
+        print("🧩 Sudoku daily challenge precompute started")
+    
+    if settings.RUBIK_WARMUP_ON_STARTUP:
+        from app.services.solver_service import solver_warmup
+        solver_warmup.start()
+        print("🧊 Rubik solver warm-up started")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs on shutdown"""
+    await sudoku_pool_refiller.stop()
+    await sudoku_daily_challenge.stop()
+    sudoku_batch_runner.shutdown()
+    
+    from app.services.solver_pool import rubik_optimal_pool, rubik_optimize_pool, rubik_solver_pool
+    rubik_solver_pool.shutdown()
+    rubik_optimize_pool.shutdown()
+    rubik_optimal_pool.shutdown()
 
 
 @app.get("/", tags=["Root"])
@@ -121,6 +159,8 @@ async def health_check():
     """
     Health check endpoint
     Kiểm tra kết nối database và trạng thái service
+    
+    Trạng thái warm-up của Rubik solver chỉ được báo cáo, không làm fail health
     """
     try:
         # Test database connection
@@ -128,6 +168,10 @@ async def health_check():
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
         
+        from app.services.solver_service import solver_warmup
+        from app.services.detection_service import detection_service
+        
+        solver_ready = solver_warmup.ready or not settings.RUBIK_WARMUP_ON_STARTUP
         return {
             "status": "healthy",
             "version": "2.0.0",
@@ -135,8 +179,10 @@ async def health_check():
             "services": {
                 "auth": "up",
                 "games": "up",
-                "rubik_solver": "up"
-            }
+                "rubik_solver": "up" if solver_ready else solver_warmup.status
+            },
+            "rubik_solver": solver_warmup.to_dict(),
+            "detection": detection_service.stats()
         }
     except Exception as e:
         return JSONResponse(
@@ -161,6 +207,8 @@ app.include_router(leaderboard.router, prefix="/api")
 app.include_router(game_2048.router, prefix="/api/games")
 app.include_router(sudoku.router, prefix="/api/games")
 app.include_router(caro.router, prefix="/api/games")
+app.include_router(solver.router, prefix="/api/rubik", tags=["Rubik"])
+app.include_router(detection.router, prefix="/api/rubik", tags=["Rubik"])
 
 
 if __name__ == "__main__":
@@ -60,3 +60,10 @@ class DetectionResponse(BaseModel):
     colors: List[List[FaceColor]]
     confidence: float
     message: Optional[str] = None
+
+
+class CubeDetectionResponse(BaseModel):
+    success: bool
+    faces: List[DetectionResponse]
+    validation: Optional[CubeStateResponse] = None  # Validated state when all faces were read
+    message: Optional[str] = None
@@ -1,7 +1,7 @@
 """
 SQLAlchemy Game models
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..core.database import Base
@@ -35,14 +35,44 @@ class SudokuPuzzle(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     difficulty = Column(String(10), nullable=False)  # 'easy', 'medium', 'hard'
-    puzzle_data = Column(Text, nullable=False)  # 81 character string
-    solution_data = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Legacy 81 character strings, NULL for rows stored packed only
+    puzzle_data = Column(Text, nullable=True)
+    solution_data = Column(Text, nullable=True)
+    # 4-bit packed grids (41 bytes); NULL solution = derived with the solver
+    puzzle_packed = Column(LargeBinary, nullable=True)
+    solution_packed = Column(LargeBinary, nullable=True)
+    # SHA-1 of the canonical form: equal for puzzles that are the same up to symmetry
+    canonical_hash = Column(String(40), unique=True, index=True, nullable=True)
+    # Indexed for the puzzle index's incremental refresh window
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     def __repr__(self):
         return f"<SudokuPuzzle(id={self.id}, difficulty='{self.difficulty}')>"
 
 
+class RubikSolution(Base):
+    __tablename__ = "rubik_solutions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # NULL user_id = shared solution cache row (one per cube_state)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)
+    cube_state = Column(Text, nullable=False)  # 54 character Kociemba facelet string
+    solution = Column(Text, nullable=False)  # e.g. "R U R' U'"
+    steps_count = Column(Integer, nullable=False)
+    time_to_solve_ms = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            "idx_rubik_solutions_cache_state", "cube_state",
+            unique=True, postgresql_where=user_id.is_(None)
+        ),
+    )
+
+    def __repr__(self):
+        return f"<RubikSolution(id={self.id}, steps={self.steps_count})>"
+
+
 class Game2048Session(Base):
     __tablename__ = "game_2048_sessions"
 
@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation
 """
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
 
 
@@ -102,11 +102,53 @@ class SudokuValidateResponse(BaseModel):
     completion_percentage: float
 
 
+class SudokuSessionMoveRequest(BaseModel):
+    session_id: str
+    row: int = Field(..., ge=0, le=8)
+    col: int = Field(..., ge=0, le=8)
+    value: int = Field(..., ge=0, le=9)  # 0 means clear cell
+
+
+class SudokuCheckGridRequest(BaseModel):
+    grid: List[List[int]] = Field(..., min_length=9, max_length=9)  # 0 = empty
+    solution_grid: Optional[List[List[int]]] = None
+    puzzle_id: Optional[int] = None  # Used to look up the solution if not given
+
+
+class SudokuSolveRequest(BaseModel):
+    grid: List[List[int]] = Field(..., min_length=9, max_length=9)  # 0 = empty
+
+
+class SudokuSolveResponse(BaseModel):
+    solvable: bool
+    unique: bool
+    solution: Optional[List[List[int]]] = None
+    stats: dict
+    message: str
+
+
+class SudokuVariantSolveRequest(BaseModel):
+    # NxN matrix or grid string (4x4, 9x9, 16x16, 25x25; '0'/'.' = empty)
+    grid: Union[str, List[List[int]]]
+
+
+class SudokuVariantSolveResponse(BaseModel):
+    size: int
+    box_size: int
+    solvable: bool
+    unique: bool
+    solution: Optional[List[List[int]]] = None
+    solution_string: Optional[str] = None
+    stats: dict
+    message: str
+
+
 # ============= Caro Schemas =============
 class CaroNewGameRequest(BaseModel):
     player1_id: int
     player2_id: Optional[int] = None  # None for AI opponent
     board_size: int = Field(default=15, ge=10, le=20)
+    rule: Optional[str] = Field(default="freestyle", pattern="^(freestyle|exact_five|blocked_ends|renju)$")
 
 
 class CaroMoveRequest(BaseModel):
@@ -114,11 +156,13 @@ class CaroMoveRequest(BaseModel):
     player_id: int
     row: int
     col: int
+    rule: Optional[str] = Field(default="freestyle", pattern="^(freestyle|exact_five|blocked_ends|renju)$")
 
 
 class CaroAIMoveRequest(BaseModel):
     game_id: int
     difficulty: str = Field(default="medium", pattern="^(easy|medium|hard|expert|normal)$")
+    rule: Optional[str] = Field(default="freestyle", pattern="^(freestyle|exact_five|blocked_ends|renju)$")
 
 
 class CaroGameStateResponse(BaseModel):
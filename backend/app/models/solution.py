@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Union
+
+from app.models.cube import CubeStateRequest
 
 
 class SolutionStep(BaseModel):
@@ -8,12 +10,27 @@ class SolutionStep(BaseModel):
     description: str
 
 
+class SolutionTimings(BaseModel):
+    """Seconds spent per stage; `execution_time` is their sum"""
+    validation: float = 0.0
+    queue: float = 0.0  # Waiting for a free solver worker
+    solve: float = 0.0
+    optimize: float = 0.0  # Re-solves for a shorter solution / optimal search
+
+
 class SolutionResponse(BaseModel):
     success: bool
     steps: List[SolutionStep]
-    total_moves: int
+    total_moves: int  # In `metric`
     algorithm: str
     execution_time: float
+    metric: str = "htm"  # 'htm' (R2 = 1 move) or 'qtm' (R2 = 2 moves)
+    optimal: bool = False  # Proven shortest in HTM (optimal search finished in time)
+    timings: Optional[SolutionTimings] = None
+    cached: bool = False  # Served from the solution cache
+    verified: bool = False  # Replayed on the cube model and ends solved
+    # Optional: 54-char facelet string before the first step and after each step
+    frames: Optional[List[str]] = None
     error_message: Optional[str] = None
     
     class Config:
@@ -34,6 +51,26 @@ class SolutionResponse(BaseModel):
                 ],
                 "total_moves": 20,
                 "algorithm": "U R U' R' U' F' U F",
-                "execution_time": 0.125
+                "execution_time": 0.125,
+                "timings": {
+                    "validation": 0.001,
+                    "queue": 0.004,
+                    "solve": 0.12
+                }
+            }
+        }
+
+
+class SolveBatchRequest(BaseModel):
+    # Cube states as for /solve, or 54-char Kociemba facelet strings (URFDLB)
+    cubes: List[Union[CubeStateRequest, str]] = Field(..., min_length=1, max_length=500)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "cubes": [
+                    "DRLUUBFBRBLURRLRUBLRDDFDLFUFUFFDBRDUBRUFLLFDDBFLUBLRBD",
+                    "BBURUDBFUFFFRRFUUFLULUFUDLRRDBBDBDBLUDDFLLRRBRLLLBRDDF"
+                ]
             }
         }
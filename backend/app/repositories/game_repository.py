@@ -2,13 +2,14 @@
 Game Repository
 Xử lý data access cho game scores và sessions
 """
-from typing import List, Optional
+from typing import List, Optional, Dict, Set
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime
 
 from ..models.game import (
-    GameScore, SudokuPuzzle, 
+    GameScore, SudokuPuzzle, RubikSolution,
     Game2048Session, CaroGame, UserActivityLog
 )
 from .base import BaseRepository
@@ -98,6 +99,13 @@ class GameScoreRepository(BaseRepository[GameScore, dict, dict]):
             }
             for idx, r in enumerate(results)
         ]
+    
+    def get_sudoku_puzzle_ids(self, db: Session) -> Set[int]:
+        """Các puzzle_id mà Sudoku scores tham chiếu (game_data->>'puzzle_id')"""
+        rows = db.query(GameScore.game_data["puzzle_id"].as_string()).filter(
+            GameScore.game_type == "sudoku"
+        ).distinct().all()
+        return {int(value) for value, in rows if value is not None and str(value).isdigit()}
 
 
 
@@ -160,9 +168,165 @@ class SudokuPuzzleRepository(BaseRepository[SudokuPuzzle, dict, dict]):
         return db.query(SudokuPuzzle).filter(
             SudokuPuzzle.difficulty == difficulty
         ).all()
+    
+    def get_random_by_difficulty(
+        self,
+        db: Session,
+        difficulty: str
+    ) -> Optional[SudokuPuzzle]:
+        """Lấy một puzzle ngẫu nhiên theo difficulty"""
+        return db.query(SudokuPuzzle).filter(
+            SudokuPuzzle.difficulty == difficulty
+        ).order_by(func.random()).first()
+    
+    def count_by_difficulty(self, db: Session) -> Dict[str, int]:
+        """Đếm số puzzles theo từng difficulty"""
+        rows = db.query(
+            SudokuPuzzle.difficulty,
+            func.count(SudokuPuzzle.id)
+        ).group_by(SudokuPuzzle.difficulty).all()
+        return {difficulty: count for difficulty, count in rows}
+    
+    def bulk_create(
+        self,
+        db: Session,
+        rows: List[dict],
+        batch_size: int = 500
+    ) -> int:
+        """
+        Insert nhiều puzzles bằng executemany, mỗi batch một round trip
+        
+        Rows trùng `canonical_hash` (cùng puzzle qua phép đối xứng) bị bỏ qua.
+        Trả về số puzzles thực sự được insert.
+        """
+        stmt = pg_insert(SudokuPuzzle).on_conflict_do_nothing(
+            index_elements=[SudokuPuzzle.canonical_hash]
+        ).returning(SudokuPuzzle.id)
+        
+        inserted = 0
+        for start in range(0, len(rows), batch_size):
+            inserted += len(db.execute(stmt, rows[start:start + batch_size]).all())
+        db.commit()
+        return inserted
+    
+    def get_missing_canonical_hash(
+        self,
+        db: Session,
+        after_id: int = 0,
+        limit: int = 1000
+    ) -> List[SudokuPuzzle]:
+        """Lấy puzzles chưa có canonical_hash (để backfill)"""
+        return db.query(SudokuPuzzle).filter(
+            SudokuPuzzle.canonical_hash.is_(None),
+            SudokuPuzzle.id > after_id
+        ).order_by(SudokuPuzzle.id).limit(limit).all()
+    
+    def get_missing_packed(
+        self,
+        db: Session,
+        after_id: int = 0,
+        limit: int = 1000
+    ) -> List[SudokuPuzzle]:
+        """Lấy puzzles chưa có cột packed (để backfill)"""
+        return db.query(SudokuPuzzle).filter(
+            SudokuPuzzle.puzzle_packed.is_(None),
+            SudokuPuzzle.id > after_id
+        ).order_by(SudokuPuzzle.id).limit(limit).all()
+    
+    def get_by_canonical_hash(self, db: Session, canonical_hash: str) -> Optional[SudokuPuzzle]:
+        """Lấy puzzle tương đương (cùng canonical_hash) nếu đã tồn tại"""
+        return db.query(SudokuPuzzle).filter(
+            SudokuPuzzle.canonical_hash == canonical_hash
+        ).first()
+
+
+class RubikSolutionRepository(BaseRepository[RubikSolution, dict, dict]):
+    """Repository cho Rubik solutions (lịch sử user và cache dùng chung)"""
+    
+    def __init__(self):
+        super().__init__(RubikSolution)
+    
+    def get_by_id(self, db: Session, id: int) -> Optional[RubikSolution]:
+        return db.query(RubikSolution).filter(RubikSolution.id == id).first()
+    
+    def get_all(
+        self, 
+        db: Session, 
+        skip: int = 0, 
+        limit: int = 100
+    ) -> List[RubikSolution]:
+        return db.query(RubikSolution).offset(skip).limit(limit).all()
+    
+    def create(self, db: Session, obj_in: dict) -> RubikSolution:
+        db_obj = RubikSolution(**obj_in)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    
+    def update(
+        self, 
+        db: Session, 
+        db_obj: RubikSolution, 
+        obj_in: dict
+    ) -> RubikSolution:
+        for field, value in obj_in.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    
+    def delete(self, db: Session, id: int) -> bool:
+        obj = self.get_by_id(db, id)
+        if obj:
+            db.delete(obj)
+            db.commit()
+            return True
+        return False
+    
+    def count(self, db: Session) -> int:
+        return db.query(func.count(RubikSolution.id)).scalar()
+    
+    def get_cached(self, db: Session, cube_state: str) -> Optional[RubikSolution]:
+        """Lấy lời giải đã cache (user_id NULL) theo facelet string"""
+        return db.query(RubikSolution).filter(
+            RubikSolution.user_id.is_(None),
+            RubikSolution.cube_state == cube_state
+        ).first()
+    
+    def save_cached(
+        self,
+        db: Session,
+        cube_state: str,
+        solution: str,
+        time_to_solve_ms: int
+    ) -> bool:
+        """
+        Lưu lời giải vào cache dùng chung
+        
+        Bỏ qua nếu cube_state đã có (unique index). Trả về True nếu insert.
+        """
+        stmt = pg_insert(RubikSolution).values(
+            user_id=None,
+            cube_state=cube_state,
+            solution=solution,
+            steps_count=len(solution.split()),
+            time_to_solve_ms=time_to_solve_ms,
+            created_at=datetime.utcnow()
+        ).on_conflict_do_nothing(
+            index_elements=[RubikSolution.cube_state],
+            index_where=RubikSolution.user_id.is_(None)
+        ).returning(RubikSolution.id)
+        
+        inserted = db.execute(stmt).first() is not None
+        db.commit()
+        return inserted
 
 
 # Singleton instances
 game_score_repository = GameScoreRepository()
 
 sudoku_puzzle_repository = SudokuPuzzleRepository()
+
+rubik_solution_repository = RubikSolutionRepository()
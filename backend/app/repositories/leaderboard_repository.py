@@ -40,6 +40,43 @@ class LeaderboardRepository:
         self.db.refresh(game_score)
         return game_score
 
+    def get_daily_sudoku_leaderboard(
+        self,
+        day: str,
+        difficulty: str,
+        limit: int = 10
+    ) -> List[dict]:
+        """
+        Best score per user for one Sudoku daily challenge
+        
+        Uses the expression index on `game_data->>'daily'`
+        (database/add_sudoku_daily_challenge.sql).
+        """
+        results = self.db.query(
+            User.id.label("user_id"),
+            User.username,
+            func.max(GameScore.score).label("score"),
+            func.min(GameScore.time_seconds).label("time_seconds")
+        ).join(User, GameScore.user_id == User.id).filter(
+            GameScore.game_type == "sudoku",
+            GameScore.completed == True,
+            GameScore.game_data["daily"].as_string() == day,
+            GameScore.game_data["difficulty"].as_string() == difficulty
+        ).group_by(User.id, User.username).order_by(
+            desc("score"), "time_seconds"
+        ).limit(limit).all()
+        
+        return [
+            {
+                "rank": idx + 1,
+                "user_id": r.user_id,
+                "username": r.username,
+                "score": r.score,
+                "time_seconds": r.time_seconds
+            }
+            for idx, r in enumerate(results)
+        ]
+
     def get_leaderboard(
         self,
         game_type: str,
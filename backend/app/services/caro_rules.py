@@ -0,0 +1,320 @@
+"""
+Caro Rule Variants
+Pluggable win / forbidden-move rules for Caro (Gomoku)
+
+All checks are local to the last move: only the four lines through the
+placed stone are inspected, within a window of ``win_length + 1`` cells on
+each side. Cost per move is therefore constant regardless of board size,
+so the AI can call them for every candidate without rescanning the board.
+"""
+from typing import List, Dict, Optional, Tuple
+
+from app.core.exceptions import AppException
+
+
+DIRECTIONS = [
+    (0, 1),   # Horizontal
+    (1, 0),   # Vertical
+    (1, 1),   # Diagonal \
+    (1, -1)   # Diagonal /
+]
+
+# Segment cell markers (relative to the player being checked)
+_EMPTY = 0
+_OWN = 1
+_BLOCKED = 2  # Opponent stone or board edge
+
+
+class CaroRules:
+    """
+    Base rule set: freestyle Gomoku
+
+    Subclasses override `_is_winning_run` and/or `get_forbidden_reason`.
+    """
+
+    name = "freestyle"
+    description = "Five or more in a row wins"
+
+    def __init__(self, win_length: int = 5):
+        self.win_length = win_length
+
+    # ---------- Public API ----------
+
+    def check_win(
+        self,
+        board: List[List[int]],
+        row: int,
+        col: int,
+        player: int
+    ) -> Tuple[bool, Optional[List[Tuple[int, int]]]]:
+        """
+        Check if the stone just placed at (row, col) wins under this rule set
+
+        Returns:
+            Tuple of (is_win, winning_line_coordinates)
+        """
+        for dr, dc in DIRECTIONS:
+            line, end_before, end_after = self._scan_run(board, row, col, dr, dc, player)
+            if self._is_winning_run(len(line), player, end_before, end_after):
+                return True, sorted(line)
+        return False, None
+
+    def get_forbidden_reason(
+        self,
+        board: List[List[int]],
+        row: int,
+        col: int,
+        player: int
+    ) -> Optional[str]:
+        """
+        Return why placing `player` at (row, col) is forbidden, or None if allowed
+
+        The board must still have (row, col) empty.
+        """
+        return None
+
+    def describe(self) -> Dict[str, str]:
+        """Short description used by the rules endpoint"""
+        return {"name": self.name, "description": self.description}
+
+    # ---------- Hooks ----------
+
+    def _is_winning_run(
+        self,
+        count: int,
+        player: int,
+        end_before: int,
+        end_after: int
+    ) -> bool:
+        """Decide whether a contiguous run of `count` stones wins"""
+        return count >= self.win_length
+
+    # ---------- Helpers ----------
+
+    def _scan_run(
+        self,
+        board: List[List[int]],
+        row: int,
+        col: int,
+        dr: int,
+        dc: int,
+        player: int
+    ) -> Tuple[List[Tuple[int, int]], int, int]:
+        """
+        Collect the contiguous run of `player` through (row, col)
+
+        Returns:
+            Tuple of (run_cells, value_before_run, value_after_run) where the
+            end values are board values, or -1 for the board edge
+        """
+        board_size = len(board)
+        line = [(row, col)]
+
+        r, c = row + dr, col + dc
+        while (0 <= r < board_size and 0 <= c < board_size and
+               board[r][c] == player):
+            line.append((r, c))
+            r += dr
+            c += dc
+        end_after = board[r][c] if (0 <= r < board_size and 0 <= c < board_size) else -1
+
+        r, c = row - dr, col - dc
+        while (0 <= r < board_size and 0 <= c < board_size and
+               board[r][c] == player):
+            line.append((r, c))
+            r -= dr
+            c -= dc
+        end_before = board[r][c] if (0 <= r < board_size and 0 <= c < board_size) else -1
+
+        return line, end_before, end_after
+
+
+class ExactFiveRules(CaroRules):
+    """Exactly `win_length` in a row wins; overlines do not count"""
+
+    name = "exact_five"
+    description = "Exactly five in a row wins, six or more does not"
+
+    def _is_winning_run(self, count, player, end_before, end_after):
+        return count == self.win_length
+
+
+class BlockedEndsRules(CaroRules):
+    """
+    Vietnamese Caro rule: a five blocked at both ends by the opponent
+    does not win (chặn hai đầu)
+    """
+
+    name = "blocked_ends"
+    description = "Five in a row wins unless both ends are blocked by the opponent"
+
+    def _is_winning_run(self, count, player, end_before, end_after):
+        if count < self.win_length:
+            return False
+        opponent = 2 if player == 1 else 1
+        return not (end_before == opponent and end_after == opponent)
+
+
+class RenjuRules(CaroRules):
+    """
+    Renju: Black (player 1) must make exactly five and may not play
+    double-three, double-four or overline. White wins with five or more.
+
+    Threes are detected as "can become a straight four with one more stone";
+    the full recursive Renju definition (a three whose completing point is
+    itself forbidden is not a three) is not applied.
+    """
+
+    name = "renju"
+    description = "Black needs exactly five and may not play double-three, double-four or overline"
+
+    BLACK = 1
+
+    def _is_winning_run(self, count, player, end_before, end_after):
+        if player == self.BLACK:
+            return count == self.win_length
+        return count >= self.win_length
+
+    def get_forbidden_reason(self, board, row, col, player):
+        if player != self.BLACK:
+            return None
+
+        segments = [
+            self._segment(board, row, col, dr, dc, player)
+            for dr, dc in DIRECTIONS
+        ]
+        center = self.win_length + 1
+
+        # A move that makes exactly five always wins, even if it also
+        # creates forbidden shapes elsewhere
+        runs = [self._run_through(seg, center)[0] for seg in segments]
+        if any(run == self.win_length for run in runs):
+            return None
+        if any(run > self.win_length for run in runs):
+            return "Overline is forbidden for Black"
+
+        fours = sum(self._count_fours(seg, center) for seg in segments)
+        if fours >= 2:
+            return "Double-four is forbidden for Black"
+
+        threes = sum(1 for seg in segments if self._has_open_three(seg, center))
+        if threes >= 2:
+            return "Double-three is forbidden for Black"
+
+        return None
+
+    # ---------- Line-segment analysis ----------
+
+    def _segment(
+        self,
+        board: List[List[int]],
+        row: int,
+        col: int,
+        dr: int,
+        dc: int,
+        player: int
+    ) -> List[int]:
+        """
+        Extract the line through (row, col) as own / empty / blocked markers
+
+        The window spans `win_length + 1` cells on each side, which is enough
+        to tell an exact five from an overline for any point within
+        `win_length` of the move. The move itself is marked as own.
+        """
+        board_size = len(board)
+        radius = self.win_length + 1
+        segment = []
+        for k in range(-radius, radius + 1):
+            r, c = row + k * dr, col + k * dc
+            if k == 0:
+                segment.append(_OWN)
+            elif not (0 <= r < board_size and 0 <= c < board_size):
+                segment.append(_BLOCKED)
+            elif board[r][c] == 0:
+                segment.append(_EMPTY)
+            elif board[r][c] == player:
+                segment.append(_OWN)
+            else:
+                segment.append(_BLOCKED)
+        return segment
+
+    @staticmethod
+    def _run_through(segment: List[int], index: int) -> Tuple[int, int, int]:
+        """Length and bounds of the own-stone run through `index`"""
+        lo = index
+        while lo > 0 and segment[lo - 1] == _OWN:
+            lo -= 1
+        hi = index
+        while hi < len(segment) - 1 and segment[hi + 1] == _OWN:
+            hi += 1
+        return hi - lo + 1, lo, hi
+
+    def _five_points(self, segment: List[int], center: int) -> List[int]:
+        """Empty points that would complete an exact five through `center`"""
+        points = []
+        for i in range(center - self.win_length, center + self.win_length + 1):
+            if segment[i] != _EMPTY:
+                continue
+            segment[i] = _OWN
+            count, lo, hi = self._run_through(segment, i)
+            segment[i] = _EMPTY
+            if count == self.win_length and lo <= center <= hi:
+                points.append(i)
+        return points
+
+    def _count_fours(self, segment: List[int], center: int) -> int:
+        """
+        Number of fours through `center` on this line
+
+        A straight four (two completion points exactly `win_length` apart)
+        counts once; separate completion points count individually, which
+        catches same-line double-fours such as X.XXX.X.
+        """
+        points = self._five_points(segment, center)
+        if len(points) == 2 and points[1] - points[0] == self.win_length:
+            return 1
+        return len(points)
+
+    def _has_open_three(self, segment: List[int], center: int) -> bool:
+        """True if one more stone on this line makes a straight four through `center`"""
+        # A line that already holds a four counts as a four, not also a three
+        if self._five_points(segment, center):
+            return False
+        for i in range(center - self.win_length + 1, center + self.win_length):
+            if segment[i] != _EMPTY:
+                continue
+            segment[i] = _OWN
+            points = self._five_points(segment, center)
+            segment[i] = _EMPTY
+            if len(points) == 2 and points[1] - points[0] == self.win_length:
+                return True
+        return False
+
+
+RULE_VARIANTS: Dict[str, type] = {
+    CaroRules.name: CaroRules,
+    ExactFiveRules.name: ExactFiveRules,
+    BlockedEndsRules.name: BlockedEndsRules,
+    RenjuRules.name: RenjuRules,
+}
+
+
+def get_rules(rule: Optional[str] = None, win_length: int = 5) -> CaroRules:
+    """
+    Build the rule set for a variant name
+
+    Args:
+        rule: Variant name ('freestyle', 'exact_five', 'blocked_ends', 'renju')
+        win_length: Number in a row needed to win
+
+    Returns:
+        CaroRules instance
+    """
+    rule_class = RULE_VARIANTS.get((rule or CaroRules.name).lower())
+    if rule_class is None:
+        raise AppException(
+            f"Unknown rule variant: {rule}. "
+            f"Available: {', '.join(RULE_VARIANTS)}",
+            status_code=400
+        )
+    return rule_class(win_length)
@@ -9,6 +9,7 @@ import copy
 
 from app.repositories.game_repository import GameScoreRepository
 from app.core.exceptions import AppException
+from app.services.caro_rules import CaroRules, RULE_VARIANTS, get_rules
 
 
 class CaroService:
@@ -23,7 +24,8 @@ class CaroService:
         self,
         board_size: int = 15,
         win_length: int = 5,
-        mode: str = "pvp"
+        mode: str = "pvp",
+        rule: str = "freestyle"
     ) -> Dict[str, Any]:
         """
         Create a new Caro game
@@ -32,6 +34,7 @@ class CaroService:
             board_size: Size of the board (default 15x15)
             win_length: Number in a row needed to win (default 5)
             mode: Game mode ('pvp' or 'ai')
+            rule: Rule variant ('freestyle', 'exact_five', 'blocked_ends', 'renju')
         
         Returns:
             Dict containing initial game state
@@ -42,6 +45,8 @@ class CaroService:
         if win_length < 3 or win_length > board_size:
             raise AppException(f"Win length must be between 3 and {board_size}")
         
+        rules = get_rules(rule, win_length)
+        
         # Initialize empty board
         board = [[0 for _ in range(board_size)] for _ in range(board_size)]
         
@@ -50,6 +55,7 @@ class CaroService:
             "board_size": board_size,
             "win_length": win_length,
             "mode": mode,
+            "rule": rules.name,
             "current_player": 1,  # 1 = X, 2 = O
             "moves": [],
             "game_over": False,
@@ -63,7 +69,8 @@ class CaroService:
         row: int,
         col: int,
         player: int,
-        win_length: int = 5
+        win_length: int = 5,
+        rule: str = "freestyle"
     ) -> Dict[str, Any]:
         """
         Make a move on the Caro board
@@ -74,6 +81,7 @@ class CaroService:
             col: Column index
             player: Player number (1 or 2)
             win_length: Number in a row needed to win
+            rule: Rule variant ('freestyle', 'exact_five', 'blocked_ends', 'renju')
         
         Returns:
             Dict with move result and updated board
@@ -99,13 +107,25 @@ class CaroService:
                 "error": "Invalid player number"
             }
         
+        rules = get_rules(rule, win_length)
+        
+        # Forbidden moves (e.g. Renju double-three) only look at the
+        # lines through this cell, so this stays cheap
+        forbidden_reason = rules.get_forbidden_reason(board, row, col, player)
+        if forbidden_reason:
+            return {
+                "valid": False,
+                "forbidden": True,
+                "error": forbidden_reason
+            }
+        
         # Make the move
         new_board = copy.deepcopy(board)
         new_board[row][col] = player
         
         # Check for win
         is_winning_move, winning_line = self._check_win(
-            new_board, row, col, player, win_length
+            new_board, row, col, player, win_length, rules
         )
         
         # Check for draw (board full)
@@ -127,49 +147,32 @@ class CaroService:
         row: int,
         col: int,
         player: int,
-        win_length: int
+        win_length: int,
+        rules: Optional[CaroRules] = None
     ) -> Tuple[bool, Optional[List[Tuple[int, int]]]]:
         """
         Check if the last move resulted in a win
         
+        Args:
+            rules: Rule variant to apply (default: freestyle)
+        
         Returns:
             Tuple of (is_win, winning_line_coordinates)
         """
-        board_size = len(board)
-        directions = [
-            (0, 1),   # Horizontal
-            (1, 0),   # Vertical
-            (1, 1),   # Diagonal \
-            (1, -1)   # Diagonal /
-        ]
-        
-        for dr, dc in directions:
-            count = 1  # Count the placed piece
-            line = [(row, col)]
-            
-            # Check forward direction
-            r, c = row + dr, col + dc
-            while (0 <= r < board_size and 0 <= c < board_size and
-                   board[r][c] == player):
-                count += 1
-                line.append((r, c))
-                r += dr
-                c += dc
-            
-            # Check backward direction
-            r, c = row - dr, col - dc
-            while (0 <= r < board_size and 0 <= c < board_size and
-                   board[r][c] == player):
-                count += 1
-                line.append((r, c))
-                r -= dr
-                c -= dc
-            
-            # Check if win condition met
-            if count >= win_length:
-                return True, sorted(line)
-        
-        return False, None
+        if rules is None:
+            rules = CaroRules(win_length)
+        return rules.check_win(board, row, col, player)
+    
+    def _is_playable(
+        self,
+        board: List[List[int]],
+        row: int,
+        col: int,
+        player: int,
+        rules: CaroRules
+    ) -> bool:
+        """Check if an empty cell is a legal move for player under the rules"""
+        return rules.get_forbidden_reason(board, row, col, player) is None
     
     def _is_board_full(self, board: List[List[int]]) -> bool:
         """Check if board is completely filled"""
@@ -183,7 +186,8 @@ class CaroService:
         board: List[List[int]],
         ai_player: int,
         win_length: int = 5,
-        difficulty: str = "medium"
+        difficulty: str = "medium",
+        rule: str = "freestyle"
     ) -> Dict[str, Any]:
         """
         Calculate AI move (simple heuristic-based)
@@ -193,19 +197,21 @@ class CaroService:
             ai_player: AI player number (1 or 2)
             win_length: Win condition
             difficulty: AI difficulty ('easy', 'medium', 'hard')
+            rule: Rule variant ('freestyle', 'exact_five', 'blocked_ends', 'renju')
         
         Returns:
             Dict with AI move coordinates
         """
         board_size = len(board)
         opponent = 2 if ai_player == 1 else 1
+        rules = get_rules(rule, win_length)
         
         # Easy: random move
         if difficulty == "easy":
             empty_cells = [
                 (i, j) for i in range(board_size)
                 for j in range(board_size)
-                if board[i][j] == 0
+                if board[i][j] == 0 and self._is_playable(board, i, j, ai_player, rules)
             ]
             if empty_cells:
                 import random
@@ -219,10 +225,10 @@ class CaroService:
                 if board[i][j] == 0:
                     # Try the move
                     board[i][j] = ai_player
-                    is_win, _ = self._check_win(board, i, j, ai_player, win_length)
+                    is_win, _ = self._check_win(board, i, j, ai_player, win_length, rules)
                     board[i][j] = 0
                     
-                    if is_win:
+                    if is_win and self._is_playable(board, i, j, ai_player, rules):
                         return {"row": i, "col": j}
         
         # 2. Check if need to block opponent
@@ -231,10 +237,12 @@ class CaroService:
                 if board[i][j] == 0:
                     # Try opponent's move
                     board[i][j] = opponent
-                    is_win, _ = self._check_win(board, i, j, opponent, win_length)
+                    is_win, _ = self._check_win(board, i, j, opponent, win_length, rules)
                     board[i][j] = 0
                     
-                    if is_win:
+                    # No need to block a point the opponent is not allowed to play
+                    if (is_win and self._is_playable(board, i, j, opponent, rules) and
+                            self._is_playable(board, i, j, ai_player, rules)):
                         return {"row": i, "col": j}
         
         # 3. Hard/Expert: score-based move selection
@@ -246,7 +254,7 @@ class CaroService:
                 for j in range(board_size):
                     if board[i][j] == 0:
                         score = self._evaluate_position(board, i, j, ai_player)
-                        if score > best_score:
+                        if score > best_score and self._is_playable(board, i, j, ai_player, rules):
                             best_score = score
                             best_move = (i, j)
             
@@ -257,7 +265,7 @@ class CaroService:
         center = board_size // 2
         
         # Try center
-        if board[center][center] == 0:
+        if board[center][center] == 0 and self._is_playable(board, center, center, ai_player, rules):
             return {"row": center, "col": center}
         
         # Try near existing pieces
@@ -269,13 +277,14 @@ class CaroService:
                         for dj in [-1, 0, 1]:
                             ni, nj = i + di, j + dj
                             if (0 <= ni < board_size and 0 <= nj < board_size and
-                                board[ni][nj] == 0):
+                                board[ni][nj] == 0 and
+                                self._is_playable(board, ni, nj, ai_player, rules)):
                                 return {"row": ni, "col": nj}
         
         # Fallback: any empty cell
         for i in range(board_size):
             for j in range(board_size):
-                if board[i][j] == 0:
+                if board[i][j] == 0 and self._is_playable(board, i, j, ai_player, rules):
                     return {"row": i, "col": j}
         
         raise AppException("No valid moves available")
@@ -411,6 +420,9 @@ class CaroService:
                 "pvp": "Play against another human player",
                 "ai": "Play against computer (Easy/Medium/Hard)"
             },
+            "variants": [
+                rule_class().describe() for rule_class in RULE_VARIANTS.values()
+            ],
             "scoring": {
                 "win": "100 base points",
                 "draw": "50 base points",
@@ -0,0 +1,324 @@
+"""
+Cubie Cube Model
+Rubik's cube as corner/edge permutation + orientation arrays
+
+The 54-char facelet string (Kociemba order U, R, F, D, L, B, each face
+read row by row) is what clients send and kociemba takes. Internally a
+cube is 8 corners and 12 edges, each with a position and an orientation,
+which makes the solvability invariants cheap to check:
+- corner twists sum to 0 mod 3 (no twisted corner);
+- edge flips sum to 0 mod 2 (no flipped edge);
+- corner and edge permutation parities are equal (no single swap).
+A move is a fixed permutation of 20 cubies, applied with precomputed
+tables. Definitions follow Kociemba's reference implementation.
+
+Each move is also precomputed as a permutation of the 54 facelets, so
+the state after every step of a solution can be produced for the 3D
+viewer with numpy gathers instead of rebuilding strings move by move.
+"""
+import random
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+FACES = "URFDLB"
+SOLVED_FACELETS = "".join(face * 9 for face in FACES)
+
+CORNER_NAMES = ["URF", "UFL", "ULB", "UBR", "DFR", "DLF", "DBL", "DRB"]
+EDGE_NAMES = ["UR", "UF", "UL", "UB", "DR", "DF", "DL", "DB", "FR", "FL", "BL", "BR"]
+
+# Facelet indices of each corner/edge position, U/D sticker first
+CORNER_FACELETS = [
+    (8, 9, 20), (6, 18, 38), (0, 36, 47), (2, 45, 11),
+    (29, 26, 15), (27, 44, 24), (33, 53, 42), (35, 17, 51),
+]
+EDGE_FACELETS = [
+    (5, 10), (7, 19), (3, 37), (1, 46), (32, 16), (28, 25),
+    (30, 43), (34, 52), (23, 12), (21, 41), (50, 39), (48, 14),
+]
+
+# Face colors of each corner/edge cubie in the same sticker order
+CORNER_COLORS = [tuple(name) for name in CORNER_NAMES]
+EDGE_COLORS = [tuple(name) for name in EDGE_NAMES]
+
+_CORNER_BY_COLORS = {colors: i for i, colors in enumerate(CORNER_COLORS)}
+_EDGE_BY_COLORS = {colors: i for i, colors in enumerate(EDGE_COLORS)}
+
+# Quarter turns of the six faces: (cp, co, ep, eo) as in Kociemba's tables
+_BASIC_MOVES = {
+    "U": ([3, 0, 1, 2, 4, 5, 6, 7], [0] * 8,
+          [3, 0, 1, 2, 4, 5, 6, 7, 8, 9, 10, 11], [0] * 12),
+    "R": ([4, 1, 2, 0, 7, 5, 6, 3], [2, 0, 0, 1, 1, 0, 0, 2],
+          [8, 1, 2, 3, 11, 5, 6, 7, 4, 9, 10, 0], [0] * 12),
+    "F": ([1, 5, 2, 3, 0, 4, 6, 7], [1, 2, 0, 0, 2, 1, 0, 0],
+          [0, 9, 2, 3, 4, 8, 6, 7, 1, 5, 10, 11], [0, 1, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0]),
+    "D": ([0, 1, 2, 3, 5, 6, 7, 4], [0] * 8,
+          [0, 1, 2, 3, 5, 6, 7, 4, 8, 9, 10, 11], [0] * 12),
+    "L": ([0, 2, 6, 3, 4, 1, 5, 7], [0, 1, 2, 0, 0, 2, 1, 0],
+          [0, 1, 10, 3, 4, 5, 9, 7, 8, 2, 6, 11], [0] * 12),
+    "B": ([0, 1, 3, 7, 4, 5, 2, 6], [0, 0, 1, 2, 0, 0, 2, 1],
+          [0, 1, 2, 11, 4, 5, 6, 10, 8, 9, 3, 7], [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 1]),
+}
+
+MOVE_SUFFIXES = ("", "2", "'")
+MOVE_NAMES = [face + suffix for face in FACES for suffix in MOVE_SUFFIXES]
+
+
+def _parity(perm: Sequence[int]) -> int:
+    """0 for an even permutation, 1 for odd"""
+    inversions = 0
+    n = len(perm)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if perm[i] > perm[j]:
+                inversions += 1
+    return inversions & 1
+
+
+class CubieCube:
+    """Cube state at the cubie level; moves mutate it in place"""
+
+    __slots__ = ("cp", "co", "ep", "eo")
+
+    def __init__(
+        self,
+        cp: Optional[List[int]] = None,
+        co: Optional[List[int]] = None,
+        ep: Optional[List[int]] = None,
+        eo: Optional[List[int]] = None
+    ):
+        self.cp = list(cp) if cp is not None else list(range(8))
+        self.co = list(co) if co is not None else [0] * 8
+        self.ep = list(ep) if ep is not None else list(range(12))
+        self.eo = list(eo) if eo is not None else [0] * 12
+
+    # ---------- Facelet conversion ----------
+
+    @classmethod
+    def from_facelets(cls, facelets: str) -> "CubieCube":
+        """
+        Build from a 54-char facelet string
+
+        Raises:
+            ValueError: A sticker combination that no corner or edge has
+        """
+        if len(facelets) != 54 or any(ch not in FACES for ch in facelets):
+            raise ValueError("Facelet string must be 54 characters of URFDLB")
+
+        cube = cls()
+        for i, positions in enumerate(CORNER_FACELETS):
+            stickers = [facelets[p] for p in positions]
+            for ori in range(3):
+                if stickers[ori] in "UD":
+                    break
+            else:
+                raise ValueError(f"Invalid corner at {CORNER_NAMES[i]}: no U/D sticker")
+            colors = tuple(stickers[(ori + n) % 3] for n in range(3))
+            corner = _CORNER_BY_COLORS.get(colors)
+            if corner is None:
+                raise ValueError(f"Invalid corner at {CORNER_NAMES[i]}: {''.join(stickers)}")
+            cube.cp[i] = corner
+            cube.co[i] = ori
+
+        for i, positions in enumerate(EDGE_FACELETS):
+            stickers = (facelets[positions[0]], facelets[positions[1]])
+            edge = _EDGE_BY_COLORS.get(stickers)
+            if edge is not None:
+                cube.ep[i], cube.eo[i] = edge, 0
+                continue
+            edge = _EDGE_BY_COLORS.get(stickers[::-1])
+            if edge is None:
+                raise ValueError(f"Invalid edge at {EDGE_NAMES[i]}: {''.join(stickers)}")
+            cube.ep[i], cube.eo[i] = edge, 1
+        return cube
+
+    def to_facelets(self) -> str:
+        facelets = list(SOLVED_FACELETS)
+        for i, positions in enumerate(CORNER_FACELETS):
+            colors = CORNER_COLORS[self.cp[i]]
+            ori = self.co[i]
+            for n in range(3):
+                facelets[positions[(n + ori) % 3]] = colors[n]
+        for i, positions in enumerate(EDGE_FACELETS):
+            colors = EDGE_COLORS[self.ep[i]]
+            flip = self.eo[i]
+            for n in range(2):
+                facelets[positions[(n + flip) % 2]] = colors[n]
+        return "".join(facelets)
+
+    # ---------- Moves ----------
+
+    def copy(self) -> "CubieCube":
+        return CubieCube(self.cp, self.co, self.ep, self.eo)
+
+    def multiply(self, other: "CubieCube") -> None:
+        """Apply `other` after this state (self = self * other)"""
+        cp, co, ep, eo = self.cp, self.co, self.ep, self.eo
+        self.cp = [cp[p] for p in other.cp]
+        self.co = [(co[p] + o) % 3 for p, o in zip(other.cp, other.co)]
+        self.ep = [ep[p] for p in other.ep]
+        self.eo = [(eo[p] + o) & 1 for p, o in zip(other.ep, other.eo)]
+
+    def apply(self, move: str) -> "CubieCube":
+        """Apply one move in face-turn notation (e.g. R, U', F2)"""
+        cube = MOVE_CUBES.get(move)
+        if cube is None:
+            raise ValueError(f"Unknown move: {move}")
+        self.multiply(cube)
+        return self
+
+    def apply_moves(self, moves: Sequence[str]) -> "CubieCube":
+        for move in moves:
+            self.apply(move)
+        return self
+
+    # ---------- Invariants ----------
+
+    def corner_parity(self) -> int:
+        return _parity(self.cp)
+
+    def edge_parity(self) -> int:
+        return _parity(self.ep)
+
+    def verify(self) -> Optional[str]:
+        """
+        Check that the state is reachable by face turns
+
+        Returns:
+            None if solvable, otherwise the reason it is not
+        """
+        if sorted(self.cp) != list(range(8)):
+            return "Each corner must appear exactly once"
+        if sorted(self.ep) != list(range(12)):
+            return "Each edge must appear exactly once"
+        if sum(self.co) % 3:
+            return "Unsolvable cube: a corner is twisted"
+        if sum(self.eo) % 2:
+            return "Unsolvable cube: an edge is flipped"
+        if self.corner_parity() != self.edge_parity():
+            return "Unsolvable cube: two pieces are swapped (parity error)"
+        return None
+
+    def is_solved(self) -> bool:
+        return (
+            self.cp == list(range(8)) and self.ep == list(range(12))
+            and not any(self.co) and not any(self.eo)
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CubieCube) and (
+            self.cp, self.co, self.ep, self.eo
+        ) == (other.cp, other.co, other.ep, other.eo)
+
+
+def _build_move_cubes() -> dict:
+    cubes = {}
+    for face, (cp, co, ep, eo) in _BASIC_MOVES.items():
+        quarter = CubieCube(cp, co, ep, eo)
+        turned = CubieCube()
+        for suffix in MOVE_SUFFIXES:
+            # "", "2", "'" = 1, 2, 3 quarter turns
+            turned.multiply(quarter)
+            cubes[face + suffix] = turned.copy()
+    return cubes
+
+
+MOVE_CUBES = _build_move_cubes()
+
+
+def _facelet_permutation(move: CubieCube) -> List[int]:
+    """`perm` such that facelets after the move = [before[perm[i]] for i]"""
+    perm = list(range(54))
+    for i, positions in enumerate(CORNER_FACELETS):
+        source, twist = move.cp[i], move.co[i]
+        for k in range(3):
+            perm[positions[(k + twist) % 3]] = CORNER_FACELETS[source][k]
+    for i, positions in enumerate(EDGE_FACELETS):
+        source, flip = move.ep[i], move.eo[i]
+        for k in range(2):
+            perm[positions[(k + flip) % 2]] = EDGE_FACELETS[source][k]
+    return perm
+
+
+FACELET_MOVES = {
+    name: np.array(_facelet_permutation(cube), dtype=np.intp)
+    for name, cube in MOVE_CUBES.items()
+}
+
+
+def parse_moves(algorithm: str) -> List[str]:
+    """
+    Split an algorithm string into validated moves
+
+    Raises:
+        ValueError: Unknown move token
+    """
+    moves = algorithm.split()
+    for move in moves:
+        if move not in MOVE_CUBES:
+            raise ValueError(f"Unknown move: {move}")
+    return moves
+
+
+def invert_moves(moves: Sequence[str]) -> List[str]:
+    """Moves that undo `moves` (reversed, each turned the other way)"""
+    inverse = {"": "'", "2": "2", "'": ""}
+    return [move[0] + inverse[move[1:]] for move in reversed(moves)]
+
+
+def random_cube(rng: Optional[random.Random] = None) -> CubieCube:
+    """
+    Uniformly random solvable cube (random-state scramble)
+
+    Every reachable state is equally likely: random permutations and
+    orientations, with the last twist/flip and the permutation parity
+    fixed up to satisfy the invariants above. Random move sequences are
+    not uniform and favour states close to solved.
+    """
+    rng = rng or random.Random()
+    cube = CubieCube()
+    rng.shuffle(cube.cp)
+    rng.shuffle(cube.ep)
+    if _parity(cube.cp) != _parity(cube.ep):
+        cube.ep[0], cube.ep[1] = cube.ep[1], cube.ep[0]
+    cube.co = [rng.randrange(3) for _ in range(7)]
+    cube.co.append(-sum(cube.co) % 3)
+    cube.eo = [rng.randrange(2) for _ in range(11)]
+    cube.eo.append(sum(cube.eo) % 2)
+    return cube
+
+
+def check_facelets(facelets: str) -> Optional[str]:
+    """Reason a facelet string is not a solvable cube, or None"""
+    if len(facelets) == 54 and any(facelets[9 * i + 4] != face for i, face in enumerate(FACES)):
+        return "Centers must be U, R, F, D, L, B in facelet order"
+    try:
+        cube = CubieCube.from_facelets(facelets)
+    except ValueError as e:
+        return str(e)
+    return cube.verify()
+
+
+def solves(facelets: str, moves: Sequence[str]) -> bool:
+    """True if applying `moves` to the cube leaves it solved"""
+    try:
+        return CubieCube.from_facelets(facelets).apply_moves(moves).is_solved()
+    except ValueError:
+        return False
+
+
+def facelet_frames(facelets: str, moves: Sequence[str]) -> List[str]:
+    """
+    Facelet string before the first move and after each move
+
+    The cumulative index maps are built first (one 54-entry gather per
+    move), then every frame is gathered from the start state at once.
+    """
+    index = np.empty((len(moves) + 1, 54), dtype=np.intp)
+    index[0] = np.arange(54)
+    for step, move in enumerate(moves, start=1):
+        index[step] = index[step - 1][FACELET_MOVES[move]]
+
+    start = np.frombuffer(facelets.encode("ascii"), dtype=np.uint8)
+    frames = start[index]
+    return [row.tobytes().decode("ascii") for row in frames]
@@ -1,4 +1,5 @@
 from app.models.cube import CubeStateRequest, CubeStateResponse, FaceColor
+from app.services.cube_model import check_facelets
 from typing import Dict, List
 
 
@@ -14,6 +15,8 @@ class CubeValidator:
         - 9 stickers per face (3x3)
         - 9 stickers of each color across all faces
         - Valid center colors
+        - Real corner/edge pieces, with no twisted corner, flipped edge or
+          parity error (checked on the cubie model, before any solver work)
         
         Args:
             cube_state: The cube state to validate
@@ -117,6 +120,15 @@ class CubeValidator:
                     error_message=f"Invalid color count: {color} appears {count} times (should be 9)"
                 )
         
+        # Check pieces and solvability invariants
+        error = check_facelets(notation)
+        if error is not None:
+            return CubeStateResponse(
+                is_valid=False,
+                notation="",
+                error_message=error
+            )
+        
         return CubeStateResponse(
             is_valid=True,
             notation=notation,
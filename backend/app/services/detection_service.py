@@ -1,9 +1,29 @@
+import asyncio
+import itertools
+import threading
+import time
 import cv2
 import numpy as np
 from PIL import Image
 from io import BytesIO
-from typing import List, Tuple
-from app.models.cube import DetectionResponse, FaceName, FaceColor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from app.core.config import settings
+from app.core.exceptions import AppException, DetectionBusyError
+from app.models.cube import (
+    CubeDetectionResponse, CubeFaceRequest, CubeStateRequest,
+    DetectionResponse, FaceName, FaceColor
+)
+from app.services.cube_validator import CubeValidator
+
+
+# Decode flags by scale denominator
+_REDUCED_COLOR = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
 
 
 class DetectionService:
@@ -39,6 +59,76 @@ class DetectionService:
                 'upper': np.array([80, 255, 255]),
             },
         }
+        self.colors = list(self.color_ranges)
+        # Pixels sampled per sticker for color voting
+        self.roi_samples = 1024
+        # Longest image side used for detection, whatever the camera resolution
+        self.max_size = settings.DETECTION_MAX_SIZE
+        # HSV lookup table (12 MB), built on first use, not at import
+        self._color_lut = None
+        self._color_lut_lock = threading.Lock()
+        self.cube_validator = CubeValidator()
+        # OpenCV releases the GIL, so images are processed in parallel threads
+        # and the event loop stays free while they run
+        self.threads = settings.DETECTION_THREADS
+        self.max_queue = settings.DETECTION_MAX_QUEUE
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.threads, thread_name_prefix="detection"
+        )
+        self._slots = asyncio.Semaphore(self.threads)
+        # Per-thread reusable objects (CLAHE keeps internal buffers)
+        self._local = threading.local()
+        
+        # Metrics
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_time = 0.0
+        self.max_queue_time = 0.0
+        self.run_time = 0.0
+    
+    def _get_color_lut(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(hsv_lut, mask_votes), built once by the first thread that needs them"""
+        if self._color_lut is None:
+            with self._color_lut_lock:
+                if self._color_lut is None:
+                    self._color_lut = self._build_color_lut()
+        return self._color_lut
+    
+    def _build_color_lut(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Precompute color membership for every 8-bit HSV value.
+        
+        hsv_lut[h, s, v] is a bit mask with bit i set when the pixel falls
+        in the range of self.colors[i] (ranges may overlap at the borders,
+        e.g. H=10 is both red and orange). mask_votes[m, i] is 1 when mask
+        m has bit i set, so per-color pixel counts = bincount(masks) @ mask_votes.
+        """
+        h = np.arange(180)[:, None, None]
+        s = np.arange(256)[None, :, None]
+        v = np.arange(256)[None, None, :]
+        
+        def in_range(lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+            return (
+                (lower[0] <= h) & (h <= upper[0])
+                & (lower[1] <= s) & (s <= upper[1])
+                & (lower[2] <= v) & (v <= upper[2])
+            )
+        
+        lut = np.zeros((180, 256, 256), dtype=np.uint8)
+        for bit, color in enumerate(self.colors):
+            ranges = self.color_ranges[color]
+            if color == FaceColor.RED:
+                # Red wraps around in HSV: two hue ranges
+                member = in_range(ranges['lower1'], ranges['upper1']) | in_range(ranges['lower2'], ranges['upper2'])
+            else:
+                member = in_range(ranges['lower'], ranges['upper'])
+            lut |= member.astype(np.uint8) << bit
+        
+        masks = np.arange(1 << len(self.colors))[:, None]
+        mask_votes = (masks >> np.arange(len(self.colors))) & 1
+        return lut, mask_votes
     
     async def detect_face(self, image_bytes: bytes, face_name: str) -> DetectionResponse:
         """
@@ -52,26 +142,7 @@ class DetectionService:
             DetectionResponse with detected colors
         """
         try:
-            # Convert bytes to image
-            image = Image.open(BytesIO(image_bytes))
-            img_array = np.array(image)
-            
-            # Convert RGB to BGR for OpenCV
-            if len(img_array.shape) == 3 and img_array.shape[2] == 3:
-                img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-            
-            # Preprocess image
-            processed_img = self._preprocess_image(img_array)
-            
-            # Detect grid and extract stickers
-            stickers = self._detect_grid(processed_img)
-            
-            if stickers is None or len(stickers) != 9:
-                # Fallback: try simpler grid division
-                stickers = self._simple_grid_division(processed_img)
-            
-            # Classify colors for each sticker
-            colors = self._classify_stickers(stickers, processed_img)
+            stickers, colors = await self._run(self._detect_face_sync, image_bytes)
             
             # Calculate confidence based on detection quality
             confidence = self._calculate_confidence(stickers, colors)
@@ -84,6 +155,8 @@ class DetectionService:
                 message="Colors detected successfully"
             )
         
+        except AppException:
+            raise
         except Exception as e:
             return DetectionResponse(
                 success=False,
@@ -93,27 +166,135 @@ class DetectionService:
                 message=f"Detection failed: {str(e)}"
             )
     
+    async def _run(self, fn, *args):
+        """
+        Run `fn(*args)` on a detection thread, at most `threads` at a time.
+        
+        Raises:
+            DetectionBusyError: Too many images already waiting
+        """
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise DetectionBusyError()
+        
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        queued = started_at - queued_at
+        self.queue_time += queued
+        self.max_queue_time = max(self.max_queue_time, queued)
+        
+        def finished(_future) -> None:
+            # A thread cannot be interrupted: the slot is freed when it
+            # really finishes, even if the request was cancelled earlier
+            self.running -= 1
+            self.completed += 1
+            self.run_time += time.perf_counter() - started_at
+            self._slots.release()
+        
+        self.running += 1
+        future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        future.add_done_callback(finished)
+        return await asyncio.shield(future)
+    
+    def stats(self) -> dict:
+        return {
+            "threads": self.threads,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_queue_ms": round(self.queue_time / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_queue_ms": round(self.max_queue_time * 1000, 2),
+            "avg_run_ms": round(self.run_time / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+    
+    def _detect_face_sync(self, image_bytes: bytes) -> Tuple[List[Tuple[int, int, int, int]], List[List[FaceColor]]]:
+        """
+        Sticker boxes and 3x3 colors of a face.
+        Runs in a worker thread.
+        """
+        stickers, processed_img = self._load_face(image_bytes)
+        
+        # Classify colors for each sticker
+        colors = self._classify_stickers(stickers, processed_img)
+        return stickers, colors
+    
+    def _load_face(self, image_bytes: bytes) -> Tuple[List[Tuple[int, int, int, int]], np.ndarray]:
+        """
+        Decode an upload and locate its 9 stickers.
+        Returns (sticker boxes, preprocessed BGR image).
+        """
+        img_array = self._decode_image(image_bytes)
+        
+        # Preprocess image
+        processed_img = self._preprocess_image(img_array)
+        
+        # Detect grid and extract stickers
+        stickers = self._detect_grid(processed_img)
+        
+        if stickers is None or len(stickers) != 9:
+            # Fallback: try simpler grid division
+            stickers = self._simple_grid_division(processed_img)
+        
+        return stickers, processed_img
+    
+    def _decode_image(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Decode an upload to a BGR array already close to max_size.
+        
+        Only the header is parsed to get the size; JPEGs are then decoded
+        by libjpeg at 1/2, 1/4 or 1/8 scale (IMREAD_REDUCED_*), the largest
+        reduction that stays at or above max_size. A 12MP photo never
+        exists in memory at full resolution, and OpenCV decodes straight
+        to BGR, without an RGB copy to convert.
+        """
+        image = Image.open(BytesIO(image_bytes))  # Lazy: header only
+        factor = 1
+        while factor < 8 and max(image.size) / (factor * 2) >= self.max_size:
+            factor *= 2
+        
+        # EXIF orientation is ignored, as with the PIL decoder
+        flags = _REDUCED_COLOR[factor] | cv2.IMREAD_IGNORE_ORIENTATION
+        decoded = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), flags)
+        if decoded is not None:
+            return decoded
+        
+        # Formats OpenCV cannot read (e.g. GIF): PIL, shrunk before the copy
+        image.draft("RGB", (self.max_size, self.max_size))
+        image.thumbnail((self.max_size, self.max_size))
+        return cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+    
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """
         Preprocess image for better detection.
         """
         # Resize if too large
         height, width = image.shape[:2]
-        max_size = 800
+        max_size = self.max_size
         if max(height, width) > max_size:
             scale = max_size / max(height, width)
-            image = cv2.resize(image, None, fx=scale, fy=scale)
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         
         # Apply bilateral filter to reduce noise while keeping edges sharp
         image = cv2.bilateralFilter(image, 9, 75, 75)
         
-        # Enhance contrast
+        # Enhance contrast on the L channel, in place in the Lab image
         lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
-        enhanced = cv2.merge([l, a, b])
-        image = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+        local = self._local
+        if getattr(local, "clahe", None) is None:
+            local.clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        if getattr(local, "lightness", None) is None or local.lightness.shape != lab.shape[:2]:
+            local.lightness = np.empty(lab.shape[:2], dtype=np.uint8)
+        cv2.extractChannel(lab, 0, local.lightness)
+        local.clahe.apply(local.lightness, local.lightness)
+        cv2.insertChannel(local.lightness, lab, 0)
+        image = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
         
         return image
     
@@ -184,18 +365,16 @@ class DetectionService:
         
         return stickers
     
-    def _classify_stickers(
+    def _sample_stickers(
         self,
         stickers: List[Tuple[int, int, int, int]],
         image: np.ndarray
-    ) -> List[List[FaceColor]]:
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Classify the color of each sticker.
-        Returns 3x3 grid of colors.
+        Sample the center of each sticker on a grid of about roi_samples pixels.
+        Returns (BGR pixels (n, 3), sticker index of each pixel).
         """
-        colors = []
-        hsv_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-        
+        rois = []
         for i in range(9):
             x, y, w, h = stickers[i]
             
@@ -206,53 +385,53 @@ class DetectionService:
             cw = int(w * (1 - 2 * center_margin))
             ch = int(h * (1 - 2 * center_margin))
             
-            # Extract ROI
-            roi = hsv_image[cy:cy+ch, cx:cx+cw]
-            
-            if roi.size == 0:
-                colors.append(FaceColor.WHITE)  # Default
-                continue
-            
-            # Classify color
-            detected_color = self._classify_color(roi)
-            colors.append(detected_color)
+            roi = image[cy:cy+ch, cx:cx+cw]
+            step = max(1, int(np.ceil(np.sqrt(roi.shape[0] * roi.shape[1] / self.roi_samples))))
+            rois.append(roi[::step, ::step].reshape(-1, 3))
         
-        # Reshape to 3x3
-        return [colors[i:i+3] for i in range(0, 9, 3)]
+        pixels = np.concatenate(rois)
+        sticker_ids = np.repeat(np.arange(9), [len(roi) for roi in rois])
+        return pixels, sticker_ids
     
-    def _classify_color(self, roi: np.ndarray) -> FaceColor:
+    def _count_colors(self, pixels: np.ndarray, sticker_ids: np.ndarray) -> np.ndarray:
         """
-        Classify the color of a single sticker region.
+        Pixels of each sticker matching each color, shape (9, len(self.colors)).
+        
+        All samples go through the HSV lookup table in one indexing pass;
+        only the sampled pixels are converted to HSV, not the whole image.
         """
-        # Get median color (more robust than mean)
-        median_color = np.median(roi.reshape(-1, 3), axis=0)
+        hsv_lut, mask_votes = self._get_color_lut()
+        if len(pixels):
+            hsv = cv2.cvtColor(pixels.reshape(-1, 1, 3), cv2.COLOR_BGR2HSV).reshape(-1, 3)
+            masks = hsv_lut[hsv[:, 0], hsv[:, 1], hsv[:, 2]]
+        else:
+            masks = np.zeros(0, dtype=np.uint8)
         
-        # Calculate distance to each color
-        min_distance = float('inf')
-        detected_color = FaceColor.WHITE
+        n_masks = len(mask_votes)
+        mask_counts = np.bincount(
+            sticker_ids * n_masks + masks, minlength=9 * n_masks
+        ).reshape(9, n_masks)
+        return mask_counts @ mask_votes
+    
+    def _classify_stickers(
+        self,
+        stickers: List[Tuple[int, int, int, int]],
+        image: np.ndarray
+    ) -> List[List[FaceColor]]:
+        """
+        Classify the color of each sticker.
+        Returns 3x3 grid of colors.
         
-        for color, ranges in self.color_ranges.items():
-            if color == FaceColor.RED:
-                # Red wraps around in HSV, check both ranges
-                mask1 = cv2.inRange(roi, ranges['lower1'], ranges['upper1'])
-                mask2 = cv2.inRange(roi, ranges['lower2'], ranges['upper2'])
-                pixels = cv2.countNonZero(mask1) + cv2.countNonZero(mask2)
-            else:
-                mask = cv2.inRange(roi, ranges['lower'], ranges['upper'])
-                pixels = cv2.countNonZero(mask)
-            
-            # Calculate percentage of matching pixels
-            total_pixels = roi.shape[0] * roi.shape[1]
-            match_percentage = pixels / total_pixels if total_pixels > 0 else 0
-            
-            # Use inverse of percentage as "distance"
-            distance = 1 - match_percentage
-            
-            if distance < min_distance:
-                min_distance = distance
-                detected_color = color
+        A sticker takes the color most of its sampled pixels match (first
+        color in self.colors on ties, white if none).
+        """
+        color_counts = self._count_colors(*self._sample_stickers(stickers, image))
+        
+        # Empty ROI: no votes, falls back to white
+        colors = [self.colors[i] for i in color_counts.argmax(axis=1)]
         
-        return detected_color
+        # Reshape to 3x3
+        return [colors[i:i+3] for i in range(0, 9, 3)]
     
     def _calculate_confidence(
         self,
@@ -281,3 +460,175 @@ class DetectionService:
             confidence += 0.05
         
         return min(confidence, 0.95)  # Cap at 0.95
+
+    # ---------- Six-face batch detection ----------
+    
+    async def detect_cube(self, images: Dict[FaceName, bytes]) -> CubeDetectionResponse:
+        """
+        Detect all six faces together and validate the resulting cube.
+        
+        Faces are decoded and processed concurrently on the detection threads.
+        Sticker colors are then labelled jointly instead of face by face:
+        - the 54 sticker colors (CIE Lab means) are clustered with k-means,
+          seeded by the 6 center stickers, so lighting differences between
+          photos affect every cluster alike;
+        - each cluster gets exactly 9 stickers (minimum-distance assignment),
+          as on a real cube;
+        - clusters are named by the per-face HSV votes of their stickers.
+        
+        Args:
+            images: Image bytes of each of the six faces
+        
+        Returns:
+            CubeDetectionResponse with per-face colors and the validated state
+        """
+        face_names = list(images)
+        results = await asyncio.gather(
+            *(self._run(self._analyze_face, images[name]) for name in face_names),
+            return_exceptions=True
+        )
+        
+        for name, result in zip(face_names, results):
+            if isinstance(result, AppException):
+                raise result
+            if isinstance(result, Exception):
+                return CubeDetectionResponse(
+                    success=False,
+                    faces=[],
+                    message=f"Detection failed for {name.value} face: {str(result)}"
+                )
+        
+        stickers = [result[0] for result in results]
+        lab = np.concatenate([result[1] for result in results])
+        votes = np.concatenate([result[2] for result in results])
+        labels = self._calibrate_colors(lab, votes)
+        
+        faces = []
+        for f, name in enumerate(face_names):
+            colors = [self.colors[k] for k in labels[f * 9:(f + 1) * 9]]
+            grid = [colors[i:i+3] for i in range(0, 9, 3)]
+            faces.append(DetectionResponse(
+                success=True,
+                face_name=name,
+                colors=grid,
+                confidence=self._calculate_confidence(stickers[f], grid),
+                message="Colors detected successfully"
+            ))
+        
+        validation = self.cube_validator.validate(CubeStateRequest(faces=[
+            CubeFaceRequest(face_name=face.face_name, colors=face.colors) for face in faces
+        ]))
+        return CubeDetectionResponse(
+            success=True,
+            faces=faces,
+            validation=validation,
+            message="Cube detected successfully" if validation.is_valid else validation.error_message
+        )
+    
+    def _analyze_face(self, image_bytes: bytes) -> Tuple[List[Tuple[int, int, int, int]], np.ndarray, np.ndarray]:
+        """
+        Sticker boxes, mean Lab color (9, 3) and HSV color votes (9, 6) of a face.
+        Runs in a worker thread.
+        """
+        stickers, image = self._load_face(image_bytes)
+        pixels, sticker_ids = self._sample_stickers(stickers, image)
+        votes = self._count_colors(pixels, sticker_ids)
+        
+        # Mean BGR of each sticker, then Lab (perceptual distances for clustering)
+        sizes = np.maximum(np.bincount(sticker_ids, minlength=9), 1)
+        bgr = np.stack([
+            np.bincount(sticker_ids, weights=pixels[:, c], minlength=9) for c in range(3)
+        ], axis=1) / sizes[:, None]
+        lab = cv2.cvtColor((bgr / 255.0).astype(np.float32).reshape(9, 1, 3), cv2.COLOR_BGR2LAB)
+        return stickers, lab.reshape(9, 3), votes
+    
+    def _calibrate_colors(self, lab: np.ndarray, votes: np.ndarray, iterations: int = 10) -> List[int]:
+        """
+        Joint color labels of all 54 stickers (indices into self.colors).
+        
+        Args:
+            lab: Lab color of each sticker, face by face (54, 3)
+            votes: HSV pixel votes of each sticker per color (54, 6)
+        """
+        n_colors = len(self.colors)
+        centers = np.arange(4, 54, 9)  # Center sticker of each face
+        others = np.setdiff1d(np.arange(54), centers)
+        
+        # k-means seeded by the centers; a center always stays in its cluster
+        means = lab[centers].copy()
+        clusters = np.arange(54) // 9
+        for _ in range(iterations):
+            distances = ((lab[:, None, :] - means[None, :, :]) ** 2).sum(axis=2)
+            new_clusters = distances.argmin(axis=1)
+            new_clusters[centers] = np.arange(n_colors)
+            for k in range(n_colors):
+                means[k] = lab[new_clusters == k].mean(axis=0)
+            if (new_clusters == clusters).all():
+                break
+            clusters = new_clusters
+        
+        # 8 non-center stickers per cluster: cheapest balanced assignment
+        distances = ((lab[others, None, :] - means[None, :, :]) ** 2).sum(axis=2)
+        slots = np.repeat(np.arange(n_colors), len(others) // n_colors)
+        assigned = _min_cost_assignment(distances[:, slots])
+        clusters = np.arange(54) // 9
+        clusters[centers] = np.arange(n_colors)
+        clusters[others] = slots[assigned]
+        
+        # Name the clusters: the color permutation with the most HSV votes
+        shares = votes / np.maximum(votes.sum(axis=1, keepdims=True), 1)
+        cluster_votes = np.stack([shares[clusters == k].sum(axis=0) for k in range(n_colors)])
+        naming = max(
+            itertools.permutations(range(n_colors)),
+            key=lambda perm: cluster_votes[np.arange(n_colors), perm].sum()
+        )
+        return [naming[k] for k in clusters]
+
+
+def _min_cost_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Column assigned to each row minimizing the total cost (Hungarian
+    algorithm, shortest augmenting paths). `cost` is (n, m) with n <= m.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=np.intp)  # Row (1-based) matched to each column, 0 = free
+    way = np.zeros(m + 1, dtype=np.intp)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = j0
+            
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            j1 = int(candidates.argmin()) + 1
+            delta = candidates[j1 - 1]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_reduced[1:][free] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    
+    assignment = np.empty(n, dtype=np.intp)
+    for j in range(1, m + 1):
+        if match[j]:
+            assignment[match[j] - 1] = j - 1
+    return assignment
+
+
+detection_service = DetectionService()
@@ -0,0 +1,338 @@
+"""
+Optimal Rubik Solver
+IDA* over pattern databases (Korf's method), half-turn metric
+
+kociemba's two-phase answers are usually a few moves above optimal. This
+searches iterative-deepening A* with an admissible heuristic: the max of
+three pattern databases (PDBs), each the exact distance to solved of one
+group of pieces:
+- corners: all 8 corners, position + twist (88,179,840 entries);
+- edges_a / edges_b: edges UR..DF / DL..BR, position + flip (42,577,920 each).
+
+Tables are one byte per entry (~173 MB total). They are generated offline
+once, with a vectorized breadth-first search, and opened with `mmap`, so
+every worker process shares the same page-cache pages instead of holding
+its own copy:
+
+    python -m app.services.optimal_solver build [--out DIR]
+
+Hard cubes can take far longer than a request can wait, so the search
+runs under a time budget and the caller falls back to the two-phase
+solution when it runs out.
+"""
+import argparse
+import logging
+import mmap
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.cube_model import MOVE_CUBES, MOVE_NAMES, CubieCube
+
+logger = logging.getLogger(__name__)
+
+# Bit counts for positions below p: digit of a partial-permutation rank
+_POPCOUNT = [bin(i).count("1") for i in range(1 << 12)]
+
+
+def _state_moves(n_positions: int, n_orientations: int, corners: bool) -> List[List[int]]:
+    """
+    Per move: piece state (position * n_orientations + orientation) after it
+
+    A move puts the piece from position `cp[i]` at position `i`, adding
+    `co[i]` to its orientation (same for edges).
+    """
+    tables = []
+    for name in MOVE_NAMES:
+        cube = MOVE_CUBES[name]
+        perm, ori = (cube.cp, cube.co) if corners else (cube.ep, cube.eo)
+        table = [0] * (n_positions * n_orientations)
+        for i in range(n_positions):
+            for o in range(n_orientations):
+                table[perm[i] * n_orientations + o] = i * n_orientations + (o + ori[i]) % n_orientations
+        tables.append(table)
+    return tables
+
+
+CORNER_STATE_MOVES = _state_moves(8, 3, corners=True)
+EDGE_STATE_MOVES = _state_moves(12, 2, corners=False)
+
+
+class PieceGroup:
+    """
+    Coordinate of a group of tracked pieces
+
+    index = rank of their positions as a partial permutation * orientation
+    code. With all 8 corners tracked the last twist follows from the
+    others and is left out of the code.
+    """
+
+    def __init__(self, name: str, corners: bool, pieces: Sequence[int]):
+        self.name = name
+        self.corners = corners
+        self.pieces = list(pieces)
+        self.n_positions = 8 if corners else 12
+        self.n_orientations = 3 if corners else 2
+        self.state_moves = CORNER_STATE_MOVES if corners else EDGE_STATE_MOVES
+
+        k = len(self.pieces)
+        self.k_orientations = k - 1 if corners and k == 8 else k
+        self.orientation_count = self.n_orientations ** self.k_orientations
+        self.perm_count = 1
+        for j in range(k):
+            self.perm_count *= self.n_positions - j
+        self.size = self.perm_count * self.orientation_count
+
+    def solved_states(self) -> List[int]:
+        return [p * self.n_orientations for p in self.pieces]
+
+    def index(self, states: Sequence[int]) -> int:
+        """Coordinate of the tracked pieces' states (scalar, hot path)"""
+        n_ori = self.n_orientations
+        n = self.n_positions
+        rank = 0
+        ori = 0
+        seen = 0
+        for j, state in enumerate(states):
+            p, o = divmod(state, n_ori)
+            rank = rank * (n - j) + p - _POPCOUNT[seen & ((1 << p) - 1)]
+            seen |= 1 << p
+            if j < self.k_orientations:
+                ori = ori * n_ori + o
+        return rank * self.orientation_count + ori
+
+    def encode(self, states: np.ndarray) -> np.ndarray:
+        """Vectorized `index` over rows of an (n, k) state array"""
+        n_ori = self.n_orientations
+        positions = states // n_ori
+        rank = np.zeros(len(states), dtype=np.int64)
+        ori = np.zeros(len(states), dtype=np.int64)
+        for j in range(len(self.pieces)):
+            smaller = (positions[:, :j] < positions[:, j:j + 1]).sum(axis=1)
+            rank = rank * (self.n_positions - j) + positions[:, j] - smaller
+            if j < self.k_orientations:
+                ori = ori * n_ori + states[:, j] % n_ori
+        return rank * self.orientation_count + ori
+
+    def decode(self, indices: np.ndarray) -> np.ndarray:
+        """Inverse of `encode`: (n,) indices -> (n, k) piece states"""
+        k = len(self.pieces)
+        n_ori = self.n_orientations
+        rank, code = np.divmod(indices.astype(np.int64), self.orientation_count)
+
+        orientations = np.zeros((len(indices), k), dtype=np.int64)
+        for j in reversed(range(self.k_orientations)):
+            code, orientations[:, j] = np.divmod(code, n_ori)
+        if self.k_orientations < k:
+            orientations[:, k - 1] = (-orientations[:, :k - 1].sum(axis=1)) % n_ori
+
+        digits = np.zeros((len(indices), k), dtype=np.int64)
+        for j in reversed(range(k)):
+            rank, digits[:, j] = np.divmod(rank, self.n_positions - j)
+
+        # Position j = the digit-th position not taken by pieces before it
+        used = np.zeros((len(indices), self.n_positions), dtype=bool)
+        rows = np.arange(len(indices))
+        states = np.empty((len(indices), k), dtype=np.int64)
+        for j in range(k):
+            free_rank = np.cumsum(~used, axis=1)
+            position = np.argmax(free_rank == (digits[:, j:j + 1] + 1), axis=1)
+            used[rows, position] = True
+            states[:, j] = position * n_ori + orientations[:, j]
+        return states
+
+    def build(self, chunk_size: int = 1 << 20) -> np.ndarray:
+        """Distance to solved of every coordinate, by breadth-first search"""
+        table = np.full(self.size, 255, dtype=np.uint8)
+        table[self.index(self.solved_states())] = 0
+        moves = np.array(self.state_moves, dtype=np.int64)
+
+        depth = 0
+        frontier = np.flatnonzero(table == 0)
+        while frontier.size:
+            started = time.perf_counter()
+            for start in range(0, frontier.size, chunk_size):
+                states = self.decode(frontier[start:start + chunk_size])
+                for move in moves:
+                    following = self.encode(move[states])
+                    table[following[table[following] == 255]] = depth + 1
+            depth += 1
+            frontier = np.flatnonzero(table == depth)
+            logger.info(
+                "PDB %s: depth %d, %d states (%.1fs)",
+                self.name, depth, frontier.size, time.perf_counter() - started
+            )
+        return table
+
+
+PATTERN_GROUPS = [
+    PieceGroup("corners", corners=True, pieces=range(8)),
+    PieceGroup("edges_a", corners=False, pieces=range(6)),
+    PieceGroup("edges_b", corners=False, pieces=range(6, 12)),
+]
+
+
+def _table_path(directory: str, group: PieceGroup) -> str:
+    return os.path.join(directory, f"{group.name}.pdb")
+
+
+def tables_available(directory: str = settings.RUBIK_PDB_DIR) -> bool:
+    """True if every PDB file exists with the expected size"""
+    for group in PATTERN_GROUPS:
+        path = _table_path(directory, group)
+        if not os.path.isfile(path) or os.path.getsize(path) != group.size:
+            return False
+    return True
+
+
+# ---------- Search ----------
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class OptimalSolver:
+    """IDA* over memory-mapped PDBs; one instance per process"""
+
+    def __init__(self, directory: str = settings.RUBIK_PDB_DIR):
+        self.directory = directory
+        self._tables: Optional[Dict[str, mmap.mmap]] = None
+
+    def _open(self) -> Dict[str, mmap.mmap]:
+        if self._tables is None:
+            tables = {}
+            for group in PATTERN_GROUPS:
+                with open(_table_path(self.directory, group), "rb") as f:
+                    # Read-only shared mapping: pages are shared by processes
+                    tables[group.name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._tables = tables
+        return self._tables
+
+    def solve(self, facelets: str, budget: float) -> Optional[List[str]]:
+        """
+        Optimal (HTM) solution, or None if `budget` seconds run out
+
+        Raises:
+            ValueError: Invalid facelet string
+        """
+        cube = CubieCube.from_facelets(facelets)
+        error = cube.verify()
+        if error is not None:
+            raise ValueError(error)
+
+        tables = self._open()
+        corner_pdb = tables["corners"]
+        edge_a_pdb = tables["edges_a"]
+        edge_b_pdb = tables["edges_b"]
+        corner_group, edge_a_group, edge_b_group = PATTERN_GROUPS
+        corner_moves = CORNER_STATE_MOVES
+        edge_moves = EDGE_STATE_MOVES
+
+        corners = [0] * 8
+        for i, piece in enumerate(cube.cp):
+            corners[piece] = i * 3 + cube.co[i]
+        edges = [0] * 12
+        for i, piece in enumerate(cube.ep):
+            edges[piece] = i * 2 + cube.eo[i]
+
+        def heuristic(c: List[int], e: List[int]) -> int:
+            return max(
+                corner_pdb[corner_group.index(c)],
+                edge_a_pdb[edge_a_group.index(e[:6])],
+                edge_b_pdb[edge_b_group.index(e[6:])],
+            )
+
+        deadline = time.monotonic() + budget
+        path: List[int] = []
+        nodes = 0
+
+        def search(c: List[int], e: List[int], g: int, bound: int, last_face: int) -> int:
+            nonlocal nodes
+            nodes += 1
+            if not nodes & 0xFFF and time.monotonic() > deadline:
+                raise _BudgetExceeded()
+
+            best = 255
+            for move in range(18):
+                face = move // 3
+                # Same face twice, or opposite faces in both orders: redundant
+                if face == last_face or face + 3 == last_face:
+                    continue
+                table = corner_moves[move]
+                nc = [table[s] for s in c]
+                # Cheapest bound first: the corner PDB alone often prunes
+                h = corner_pdb[corner_group.index(nc)]
+                if g + 1 + h > bound:
+                    best = min(best, g + 1 + h)
+                    continue
+                table = edge_moves[move]
+                ne = [table[s] for s in e]
+                h = max(h, edge_a_pdb[edge_a_group.index(ne[:6])], edge_b_pdb[edge_b_group.index(ne[6:])])
+                if g + 1 + h > bound:
+                    best = min(best, g + 1 + h)
+                    continue
+
+                path.append(move)
+                if h == 0:
+                    return -1
+                found = search(nc, ne, g + 1, bound, face)
+                if found < 0:
+                    return -1
+                best = min(best, found)
+                path.pop()
+            return best
+
+        bound = heuristic(corners, edges)
+        if bound == 0:
+            return []
+        try:
+            while True:
+                found = search(corners, edges, 0, bound, -1)
+                if found < 0:
+                    return [MOVE_NAMES[move] for move in path]
+                logger.debug("IDA* bound %d exhausted after %d nodes", bound, nodes)
+                bound = found
+        except _BudgetExceeded:
+            return None
+
+
+_solver: Optional[OptimalSolver] = None
+
+
+def optimal_solve(facelets: str, budget: float) -> Optional[str]:
+    """Process-pool entry point: optimal solution string or None"""
+    global _solver
+    if _solver is None:
+        _solver = OptimalSolver()
+    moves = _solver.solve(facelets, budget)
+    return " ".join(moves) if moves is not None else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Optimal Rubik solver pattern databases")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Generate the PDB files (minutes, ~2 GB RAM peak)")
+    build.add_argument("--out", default=settings.RUBIK_PDB_DIR)
+    build.add_argument("--only", choices=[g.name for g in PATTERN_GROUPS], help="Build one table")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    os.makedirs(args.out, exist_ok=True)
+    for group in PATTERN_GROUPS:
+        if args.only and group.name != args.only:
+            continue
+        path = _table_path(args.out, group)
+        table = group.build()
+        # Write then rename, so workers never map a partial file
+        table.tofile(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        logger.info("Wrote %s (%d bytes)", path, table.size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
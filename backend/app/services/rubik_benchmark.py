@@ -0,0 +1,180 @@
+"""
+Rubik Solver Benchmark
+Random-state scrambles, a fixed-seed corpus and a solver benchmark
+
+Random-state means every solvable cube is equally likely (unlike random
+move sequences, which favour states near solved), which is how speedcubing
+scrambles are made and what the solver sees in practice.
+
+The corpus in `data/rubik_corpus.txt` was generated with the default
+seed; benchmark it before and after a solver change to compare latency
+and solution length on the same cubes:
+
+    python -m app.services.rubik_benchmark run --workers 4
+    python -m app.services.rubik_benchmark run --count 200 --seed 7 --json
+    python -m app.services.rubik_benchmark corpus --count 1000 -o data/rubik_corpus.txt
+    python -m app.services.rubik_benchmark scramble --count 5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.cube_model import invert_moves, random_cube, solves
+from app.services.solver_pool import WARMUP_CUBE, _warm_worker, solve_notation
+
+CORPUS_SEED = 20240101
+CORPUS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data", "rubik_corpus.txt"
+)
+
+
+def random_states(count: int, seed: int = CORPUS_SEED) -> List[str]:
+    """`count` uniformly random solvable cubes as facelet strings"""
+    rng = random.Random(seed)
+    return [random_cube(rng).to_facelets() for _ in range(count)]
+
+
+def scramble(facelets: str) -> List[str]:
+    """Move sequence that takes a solved cube to `facelets`"""
+    return invert_moves(solve_notation(facelets).split())
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def _solve_timed(facelets: str) -> Tuple[float, str]:
+    started = time.perf_counter()
+    solution = solve_notation(facelets)
+    return time.perf_counter() - started, solution
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmark(cubes: List[str], workers: int = 1) -> Dict[str, Any]:
+    """
+    Solve every cube on `workers` processes, like the solver pool does
+
+    Returns:
+        Report with latency percentiles (ms, per solve inside the worker),
+        HTM length histogram, throughput and failures
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker
+    ) as executor:
+        # Start every worker before timing
+        list(executor.map(_solve_timed, [WARMUP_CUBE] * workers))
+        started = time.perf_counter()
+        results = list(executor.map(_solve_timed, cubes, chunksize=max(1, len(cubes) // (workers * 8))))
+        wall = time.perf_counter() - started
+
+    latencies = sorted(seconds * 1000 for seconds, _ in results)
+    lengths = Counter(len(solution.split()) for _, solution in results)
+    failures = sum(
+        1 for cube, (_, solution) in zip(cubes, results) if not solves(cube, solution.split())
+    )
+    return {
+        "cubes": len(cubes),
+        "workers": workers,
+        "wall_seconds": round(wall, 3),
+        "throughput": round(len(cubes) / wall, 2) if wall else None,
+        "throughput_per_core": round(len(cubes) / wall / workers, 2) if wall else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": round(_percentile(latencies, 50), 3),
+            "p90": round(_percentile(latencies, 90), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "length_histogram": dict(sorted(lengths.items())),
+        "mean_length": round(sum(k * v for k, v in lengths.items()) / len(cubes), 2) if cubes else 0.0,
+        "failures": failures,
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    print(f"Cubes: {report['cubes']}  Workers: {report['workers']}  Wall: {report['wall_seconds']}s")
+    print(f"Throughput: {report['throughput']} cubes/s ({report['throughput_per_core']} per core)")
+    print(
+        f"Latency ms: mean {latency['mean']}  p50 {latency['p50']}  p90 {latency['p90']}  "
+        f"p99 {latency['p99']}  max {latency['max']}"
+    )
+    print(f"Solution length (HTM), mean {report['mean_length']}:")
+    peak = max(report["length_histogram"].values(), default=1)
+    for length, count in report["length_histogram"].items():
+        print(f"  {length:>2} | {'#' * max(1, round(40 * count / peak))} {count}")
+    print(f"Failures: {report['failures']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rubik scrambles, corpus and solver benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Benchmark the solver (default: shipped corpus)")
+    run.add_argument("--corpus", default=None, help="Facelet strings, one per line")
+    run.add_argument("--count", type=int, default=None, help="Random cubes instead of a corpus")
+    run.add_argument("--seed", type=int, default=CORPUS_SEED)
+    run.add_argument("-w", "--workers", type=int, default=1)
+    run.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    corpus = sub.add_parser("corpus", help="Write random cubes, one facelet string per line")
+    corpus.add_argument("--count", type=int, default=1000)
+    corpus.add_argument("--seed", type=int, default=CORPUS_SEED)
+    corpus.add_argument("-o", "--output", default="-")
+
+    scrambles = sub.add_parser("scramble", help="Print random-state scrambles")
+    scrambles.add_argument("--count", type=int, default=1)
+    scrambles.add_argument("--seed", type=int, default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.count is not None:
+            cubes = random_states(args.count, args.seed)
+        else:
+            cubes = load_corpus(args.corpus or CORPUS_PATH)
+        report = run_benchmark(cubes, args.workers)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            _print_report(report)
+        return 1 if report["failures"] else 0
+
+    if args.command == "corpus":
+        if args.output != "-" and os.path.dirname(args.output):
+            os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        try:
+            sink.write(f"# Random-state Rubik corpus: seed={args.seed} count={args.count}\n")
+            for facelets in random_states(args.count, args.seed):
+                sink.write(facelets + "\n")
+        finally:
+            if sink is not sys.stdout:
+                sink.close()
+        return 0
+
+    seed = args.seed if args.seed is not None else random.randrange(1 << 30)
+    for facelets in random_states(args.count, seed):
+        print(" ".join(scramble(facelets)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
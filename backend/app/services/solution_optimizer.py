@@ -0,0 +1,108 @@
+"""
+Rubik Solution Optimizer
+Post-processing for solver output
+
+- `simplify` merges and cancels same-face moves, also across a move of
+  the opposite face (R L R' -> L), since opposite faces commute.
+- `count_moves` measures a solution in the half-turn (HTM: R2 = 1) or
+  quarter-turn (QTM: R2 = 2) metric.
+- `shorten` re-runs kociemba with smaller `max_depth` limits in parallel
+  on its own pool (`rubik_optimize_pool`) and keeps the shortest result
+  found within a time budget. Two-phase solutions are usually a few moves above optimal, and
+  a tighter limit makes kociemba search longer for a shorter one.
+"""
+import asyncio
+import logging
+from typing import List, Sequence
+
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.services.solver_pool import rubik_optimize_pool, solve_notation
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("htm", "qtm")
+
+_OPPOSITE = {"U": "D", "D": "U", "R": "L", "L": "R", "F": "B", "B": "F"}
+_TURNS = {"": 1, "2": 2, "'": 3}
+_SUFFIX = {1: "", 2: "2", 3: "'"}
+
+
+def simplify(moves: Sequence[str]) -> List[str]:
+    """
+    Merge adjacent same-face turns and drop those that cancel
+
+    Examples: R R' -> (nothing), U U2 -> U', R L R -> R2 L
+    """
+    # Stack of [face, quarter turns mod 4]
+    stack: List[list] = []
+    for move in moves:
+        face, turns = move[0], _TURNS[move[1:]]
+        target = None
+        if stack and stack[-1][0] == face:
+            target = -1
+        elif len(stack) >= 2 and stack[-1][0] == _OPPOSITE[face] and stack[-2][0] == face:
+            target = -2
+
+        if target is None:
+            stack.append([face, turns])
+            continue
+        stack[target][1] = (stack[target][1] + turns) % 4
+        if stack[target][1] == 0:
+            del stack[target]
+
+    return [face + _SUFFIX[turns] for face, turns in stack]
+
+
+def count_moves(moves: Sequence[str], metric: str = "htm") -> int:
+    """Solution length in the half-turn or quarter-turn metric"""
+    if metric == "qtm":
+        return sum(2 if move.endswith("2") else 1 for move in moves)
+    return len(moves)
+
+
+async def shorten(
+    notation: str,
+    moves: List[str],
+    metric: str = "htm",
+    runs: int = settings.RUBIK_OPTIMIZE_RUNS,
+    budget: float = settings.RUBIK_OPTIMIZE_BUDGET
+) -> List[str]:
+    """
+    Shortest of `moves` and re-solves with tighter depth limits
+
+    Runs `max_depth` = len - 1 ... len - `runs` in parallel, at most one
+    per optimize worker; each is stopped when `budget` seconds are up.
+    Unsuccessful runs (no solution under the limit, timeout, busy pool)
+    are ignored.
+    """
+    runs = min(runs, rubik_optimize_pool.max_workers)
+    depths = [len(moves) - k for k in range(1, runs + 1) if len(moves) - k > 0]
+    if not depths:
+        return moves
+
+    tasks = [
+        asyncio.ensure_future(
+            rubik_optimize_pool.run(solve_notation, notation, depth, timeout=budget)
+        )
+        for depth in depths
+    ]
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+
+    best = moves
+    for task in done:
+        if task.cancelled():
+            continue
+        error = task.exception()
+        if error is not None:
+            if not isinstance(error, (AppException, ValueError)):
+                logger.warning("Rubik shorten run failed: %s", error)
+            continue
+        solution = task.result()[0]
+        candidate = simplify(solution.split())
+        if count_moves(candidate, metric) < count_moves(best, metric):
+            best = candidate
+    return best
+
@@ -0,0 +1,184 @@
+"""
+Rubik Solution Cache
+Facelet string -> solution, in front of the solver pool
+
+Tutorial scrambles and repeated attempts produce identical 54-char
+notation strings, and kociemba is deterministic, so a solution can be
+reused as is. Two tiers:
+- in-process LRU with a TTL (per uvicorn worker);
+- optionally `rubik_solutions` rows with user_id NULL, shared by every
+  worker and kept across restarts (unique partial index on cube_state).
+
+Concurrent requests for the same uncached cube share one solve.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.game_repository import rubik_solution_repository
+from app.services.solver_pool import SolveResult
+
+logger = logging.getLogger(__name__)
+
+
+class CacheLookup(NamedTuple):
+    solution: str
+    source: str  # 'memory', 'database' or 'solver'
+    result: Optional[SolveResult] = None  # Timings when `source` is 'solver'
+
+
+class SolutionCache:
+    """Two-tier solution cache keyed by Kociemba notation"""
+
+    def __init__(
+        self,
+        max_entries: int = settings.RUBIK_CACHE_SIZE,
+        ttl_seconds: int = settings.RUBIK_CACHE_TTL,
+        persist: bool = settings.RUBIK_CACHE_PERSIST
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self.hits = {"memory": 0, "database": 0}
+        self.misses = 0
+        # notation -> (solution, stored at)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    # ---------- Memory tier ----------
+
+    def get(self, notation: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(notation)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self.ttl_seconds:
+                del self._entries[notation]
+                return None
+            self._entries.move_to_end(notation)
+            return entry[0]
+
+    def put(self, notation: str, solution: str) -> None:
+        with self._lock:
+            self._entries[notation] = (solution, time.time())
+            self._entries.move_to_end(notation)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, notation: str) -> None:
+        with self._lock:
+            self._entries.pop(notation, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ---------- Database tier ----------
+
+    def _load(self, notation: str) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            row = rubik_solution_repository.get_cached(db, notation)
+            return row.solution if row is not None else None
+        finally:
+            db.close()
+
+    def _store(self, notation: str, solution: str, solve_seconds: float) -> None:
+        db = SessionLocal()
+        try:
+            rubik_solution_repository.save_cached(db, notation, solution, int(solve_seconds * 1000))
+        except Exception:
+            # The cache is an optimization; a failed write must not fail the solve
+            logger.exception("Failed to persist Rubik solution")
+        finally:
+            db.close()
+
+    # ---------- Lookup ----------
+
+    async def get_or_solve(
+        self,
+        notation: str,
+        solve: Callable[[str], Awaitable[SolveResult]]
+    ) -> CacheLookup:
+        """
+        Solution for `notation`, from the cache or by calling `solve`
+
+        On a miss, `solve(notation)` runs once however many requests ask
+        for the same cube concurrently; the others wait for it and count
+        as memory hits. New solutions are stored in both tiers.
+        """
+        solution = self.get(notation)
+        if solution is not None:
+            self.hits["memory"] += 1
+            return CacheLookup(solution, "memory")
+
+        pending = self._inflight.get(notation)
+        if pending is not None:
+            try:
+                solution = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request running the solve went away: try again
+                return await self.get_or_solve(notation, solve)
+            self.hits["memory"] += 1
+            return CacheLookup(solution, "memory")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[notation] = future
+        try:
+            lookup = await self._load_or_solve(notation, solve)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved: no warning when nobody waits
+            raise
+        finally:
+            self._inflight.pop(notation, None)
+
+        future.set_result(lookup.solution)
+        return lookup
+
+    async def _load_or_solve(
+        self,
+        notation: str,
+        solve: Callable[[str], Awaitable[SolveResult]]
+    ) -> CacheLookup:
+        loop = asyncio.get_running_loop()
+        if self.persist:
+            try:
+                solution = await loop.run_in_executor(None, self._load, notation)
+            except Exception:
+                logger.exception("Rubik solution cache lookup failed")
+                solution = None
+            if solution is not None:
+                self.put(notation, solution)
+                self.hits["database"] += 1
+                return CacheLookup(solution, "database")
+
+        self.misses += 1
+        result = await solve(notation)
+        self.put(notation, result.solution)
+        if self.persist:
+            loop.run_in_executor(None, self._store, notation, result.solution, result.solve_time)
+        return CacheLookup(result.solution, "solver", result)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "persist": self.persist,
+        }
+
+
+solver_cache = SolutionCache()
@@ -0,0 +1,226 @@
+"""
+Rubik Solver Pool
+Runs kociemba solves in worker processes
+
+`kociemba.solve` is CPU-bound and blocking; called from a request handler
+it stalls every other request on the uvicorn worker. Each pool slot is a
+single-process executor, so a solve that overruns its timeout (or whose
+request is cancelled) can be stopped by killing just that process and
+spawning a replacement, without touching solves running in other slots.
+The replacement only rejoins the pool once its tables are loaded, so the
+next caller never spends its own timeout on a cold worker.
+
+At most `max_workers` solves run at once and at most `max_queue` wait for
+a slot; beyond that requests are rejected instead of piling up.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, NamedTuple, Optional
+
+import kociemba
+
+from app.core.config import settings
+from app.core.exceptions import CubeSolverBusyError, CubeSolverError, CubeSolverTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Any valid scrambled cube; solving it forces every table to load
+WARMUP_CUBE = "BBURUDBFUFFFRRFUUFLULUFUDLRRDBBDBDBLUDDFLLRRBRLLLBRDDF"
+
+
+class SolveResult(NamedTuple):
+    solution: str
+    queue_time: float  # Seconds waiting for a free worker
+    solve_time: float  # Seconds from submission to result
+
+
+def _warm_worker() -> None:
+    """Worker initializer: load the tables before the first real solve"""
+    kociemba.solve(WARMUP_CUBE)
+
+
+def _ping() -> bool:
+    return True
+
+
+def solve_notation(notation: str, max_depth: int = 24) -> str:
+    """Process-pool entry point: solve one 54-char facelet string"""
+    return kociemba.solve(notation, max_depth=max_depth)
+
+
+def _kill(executor: ProcessPoolExecutor) -> None:
+    """Shut an executor down, terminating a solve it is still running"""
+    # ProcessPoolExecutor cannot cancel a running call; stop the process
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+class SolverPool:
+    """Bounded set of single-process solver workers"""
+
+    def __init__(
+        self,
+        max_workers: int = settings.RUBIK_SOLVER_WORKERS,
+        max_queue: int = settings.RUBIK_SOLVER_MAX_QUEUE,
+        timeout: float = settings.RUBIK_SOLVE_TIMEOUT,
+        initializer: Optional[Callable[[], None]] = _warm_worker
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.initializer = initializer
+        self.waiting = 0
+        self.running = 0
+        self.warming = 0
+        self.timeouts = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[ProcessPoolExecutor] = []
+
+    def _new_worker(self) -> ProcessPoolExecutor:
+        # Spawn rather than fork: the server process already runs threads
+        worker = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self.initializer
+        )
+        self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: ProcessPoolExecutor) -> None:
+        """Kill `worker`; its replacement rejoins the idle queue once warm"""
+        _kill(worker)
+        if worker in self._workers:
+            self._workers.remove(worker)
+        asyncio.get_running_loop().create_task(
+            self._rejoin_when_warm(self._new_worker(), self._idle)
+        )
+
+    async def _rejoin_when_warm(self, worker: ProcessPoolExecutor, idle: asyncio.Queue) -> None:
+        self.warming += 1
+        try:
+            await asyncio.get_running_loop().run_in_executor(worker, _ping)
+        except Exception as e:
+            # A broken worker is replaced again by the next call that uses it
+            logger.warning("Rubik solver worker failed to warm up: %s", e)
+        finally:
+            self.warming -= 1
+        if idle is self._idle:  # Not shut down meanwhile
+            idle.put_nowait(worker)
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.max_workers):
+                self._idle.put_nowait(self._new_worker())
+        return self._idle
+
+    async def warm(self) -> None:
+        """Start every worker and wait until each has loaded its tables"""
+        idle = self._ensure_started()
+        loop = asyncio.get_running_loop()
+        workers = [await idle.get() for _ in range(self.max_workers)]
+        try:
+            await asyncio.gather(*(
+                loop.run_in_executor(worker, _ping) for worker in workers
+            ))
+        finally:
+            for worker in workers:
+                idle.put_nowait(worker)
+
+    async def run(self, fn, *args, timeout: Optional[float] = None):
+        """
+        Run `fn(*args)` on a free worker
+
+        Returns:
+            (result, queue seconds, run seconds)
+
+        Raises:
+            CubeSolverBusyError: Too many requests already waiting
+            CubeSolverTimeoutError: The call overran `timeout`
+        """
+        idle = self._ensure_started()
+        if idle.empty() and self.waiting >= self.max_queue:
+            raise CubeSolverBusyError()
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            worker = await idle.get()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+
+        timeout = self.timeout if timeout is None else timeout
+        self.running += 1
+        replaced = False
+        try:
+            future = asyncio.get_running_loop().run_in_executor(worker, fn, *args)
+            result = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._replace(worker)
+            replaced = True
+            raise CubeSolverTimeoutError(f"Solve timed out after {timeout:g}s")
+        except asyncio.CancelledError:
+            # Client went away: don't let the orphaned solve hold the slot
+            self._replace(worker)
+            replaced = True
+            raise
+        except BrokenProcessPool:
+            self._replace(worker)
+            replaced = True
+            raise CubeSolverError("Solver worker crashed")
+        finally:
+            self.running -= 1
+            if not replaced:
+                idle.put_nowait(worker)
+
+        return result, started_at - queued_at, time.perf_counter() - started_at
+
+    async def solve(self, notation: str, timeout: Optional[float] = None) -> SolveResult:
+        """Solve a facelet string on the pool"""
+        solution, queue_time, solve_time = await self.run(solve_notation, notation, timeout=timeout)
+        return SolveResult(solution, queue_time, solve_time)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "warming": self.warming,
+            "timeouts": self.timeouts,
+        }
+
+    def shutdown(self) -> None:
+        for worker in self._workers:
+            _kill(worker)
+        self._workers = []
+        self._idle = None
+
+
+rubik_solver_pool = SolverPool()
+
+# ?optimize=true re-solves with tight depth limits routinely run out their
+# budget and get killed; on their own workers that never costs ordinary
+# solves a warm worker
+rubik_optimize_pool = SolverPool(
+    max_workers=settings.RUBIK_OPTIMIZE_WORKERS,
+    max_queue=0,
+    timeout=settings.RUBIK_OPTIMIZE_BUDGET
+)
+
+# Optimal (IDA*) searches hold a worker for up to RUBIK_OPTIMAL_BUDGET, so
+# they get their own workers and never delay ordinary solves
+rubik_optimal_pool = SolverPool(
+    max_workers=settings.RUBIK_OPTIMAL_WORKERS,
+    max_queue=settings.RUBIK_OPTIMAL_MAX_QUEUE,
+    timeout=settings.RUBIK_OPTIMAL_BUDGET + 2.0,
+    initializer=None
+)
@@ -1,7 +1,134 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
 import kociemba
+from app.core.config import settings
+from app.core.exceptions import AppException, CubeSolverBusyError, CubeSolverError
 from app.models.cube import CubeStateRequest, FaceColor
-from app.models.solution import SolutionResponse, SolutionStep
-from typing import List
+from app.services.cube_validator import CubeValidator
+from app.models.solution import SolutionResponse, SolutionStep, SolutionTimings
+from app.services.cube_model import check_facelets, facelet_frames, solves
+from app.services.solver_cache import solver_cache
+from app.services.solver_pool import WARMUP_CUBE, rubik_optimal_pool, rubik_optimize_pool, rubik_solver_pool
+from app.services.solution_optimizer import count_moves, shorten, simplify
+from app.services.optimal_solver import optimal_solve, tables_available
+from typing import List, Dict, Any, Optional, Union, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+# Pruning/move tables the native solver loads from `kociemba.cache_dir`
+KOCIEMBA_TABLES = [
+    "twistMove", "flipMove", "FRtoBR_Move", "URFtoDLF_Move", "URtoDF_Move",
+    "URtoUL_Move", "UBtoDF_Move", "MergeURtoULandUBtoDF",
+    "Slice_URFtoDLF_Parity_Prun", "Slice_URtoDF_Parity_Prun",
+    "Slice_Twist_Prun", "Slice_Flip_Prun",
+]
+
+
+class SolverWarmup:
+    """
+    Loads kociemba's tables before the first user request
+
+    kociemba reads (or, if missing, generates) its tables on the first
+    solve in each process, which stalls that request for seconds. At
+    startup missing tables are generated once in this process, then every
+    solver pool worker is started and loads them. The status feeds
+    `/health` so traffic can wait for readiness.
+    """
+    
+    def __init__(self):
+        self.status = "cold"  # cold -> warming -> ready | failed
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        self.tables: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+    
+    def check_tables(self) -> Dict[str, Any]:
+        """Report which implementation is used and whether its tables exist"""
+        native = getattr(kociemba, "lib", None) is not None
+        if native:
+            table_dir = kociemba.cache_dir
+            missing = [
+                name for name in KOCIEMBA_TABLES
+                if not os.path.isfile(os.path.join(table_dir, name))
+            ]
+        else:
+            table_dir = os.path.join(os.path.dirname(kociemba.__file__), "pykociemba", "prunetables")
+            missing = [] if os.path.isdir(table_dir) and os.listdir(table_dir) else ["*"]
+        
+        return {"native": native, "table_dir": table_dir, "missing": missing}
+    
+    def prepare(self) -> None:
+        """Check the tables, generating missing ones in this process"""
+        self.tables = self.check_tables()
+        logger.info(
+            "Rubik solver warm-up: %s implementation, tables in %s",
+            "native" if self.tables["native"] else "pure-Python",
+            self.tables["table_dir"]
+        )
+        if not self.tables["native"]:
+            logger.warning("Rubik solver: native kociemba unavailable, solves will be slow")
+        if self.tables["missing"]:
+            # Once here, so pool workers don't all write the same files
+            logger.warning(
+                "Rubik solver: tables missing (%s), generating them; this can take minutes",
+                ", ".join(self.tables["missing"])
+            )
+            kociemba.solve(WARMUP_CUBE)
+    
+    async def run(self) -> bool:
+        """Prepare the tables and warm every pool worker; returns readiness"""
+        self.status = "warming"
+        started = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.prepare)
+            logger.info("Rubik solver warm-up: starting %d workers...", rubik_solver_pool.max_workers)
+            await rubik_solver_pool.warm()
+            
+            self.duration = time.perf_counter() - started
+            self.status = "ready"
+            logger.info("Rubik solver ready in %.2fs", self.duration)
+        except Exception as e:
+            self.duration = time.perf_counter() - started
+            self.status = "failed"
+            self.error = str(e)
+            logger.exception("Rubik solver warm-up failed")
+            return False
+        
+        # Best effort, after readiness: only ?optimize=true waits on these
+        try:
+            await rubik_optimize_pool.warm()
+        except Exception:
+            logger.exception("Rubik optimize workers failed to warm up")
+        return True
+    
+    def start(self) -> None:
+        """Run the warm-up in the background without blocking startup"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "native": self.tables.get("native"),
+            "missing_tables": self.tables.get("missing", []),
+            "warmup_seconds": round(self.duration, 3) if self.duration is not None else None,
+            "error": self.error,
+            "pool": rubik_solver_pool.stats(),
+            "optimize_pool": rubik_optimize_pool.stats(),
+            "optimal_pool": rubik_optimal_pool.stats(),
+            "cache": solver_cache.stats(),
+        }
+
+
+solver_warmup = SolverWarmup()
 
 
 class SolverService:
@@ -28,16 +155,42 @@ class SolverService:
         "B2": "Turn back face 180 degrees",
     }
     
-    async def solve(self, cube_state: CubeStateRequest, notation: str = None) -> SolutionResponse:
+    async def solve(
+        self,
+        cube_state: CubeStateRequest,
+        notation: str = None,
+        include_frames: bool = False,
+        metric: str = "htm",
+        optimize: bool = False,
+        optimal: bool = False
+    ) -> SolutionResponse:
         """
         Solve the Rubik's cube using Kociemba's two-phase algorithm.
         
+        Repeated cubes are answered from the solution cache; others are
+        solved on the solver process pool, so the event loop stays free.
+        `timings` reports queue wait and solve time separately. Solutions
+        are simplified (same-face moves merged), optionally shortened by
+        re-solving with tighter depth limits, and replayed on the cube
+        model before they are returned.
+        
         Args:
             cube_state: Complete validated cube state
             notation: Optional pre-computed Kociemba notation string
+            include_frames: Also return the facelet string after each step
+            metric: 'htm' or 'qtm', for `total_moves` and picking the shortest
+            optimize: Spend up to RUBIK_OPTIMIZE_BUDGET looking for shorter
+            optimal: Try the optimal IDA* search for up to RUBIK_OPTIMAL_BUDGET,
+                keeping the two-phase solution if it does not finish or
+                every optimal worker is busy
         
         Returns:
             SolutionResponse with steps to solve the cube
+        
+        Raises:
+            CubeSolverBusyError: Solver queue is full
+            CubeSolverTimeoutError: Solve exceeded RUBIK_SOLVE_TIMEOUT
+            CubeSolverError: The solution does not solve the cube
         """
         try:
             # Use provided notation or convert cube state
@@ -45,10 +198,38 @@ class SolverService:
                 notation = self._convert_to_kociemba_notation(cube_state)
             
             # Solve using Kociemba algorithm
-            solution_string = kociemba.solve(notation)
+            lookup = await solver_cache.get_or_solve(notation, rubik_solver_pool.solve)
+            solution_string = lookup.solution
+            result = lookup.result
+            queue_time = result.queue_time if result else 0.0
+            solve_time = result.solve_time if result else 0.0
             
             # Parse solution into steps
-            moves = solution_string.split()
+            moves = simplify(solution_string.split())
+            optimize_time = 0.0
+            is_optimal = False
+            if optimal:
+                started = time.perf_counter()
+                optimal_moves = await self._solve_optimal(notation)
+                optimize_time = time.perf_counter() - started
+                if optimal_moves is not None and solves(notation, optimal_moves):
+                    moves = optimal_moves
+                    is_optimal = True
+                    solver_cache.put(notation, " ".join(moves))
+            if optimize and not is_optimal:
+                started = time.perf_counter()
+                shorter = await shorten(notation, moves, metric)
+                optimize_time += time.perf_counter() - started
+                if shorter is not moves and solves(notation, shorter):
+                    moves = shorter
+                    # Later requests for this cube get the shorter solution
+                    solver_cache.put(notation, " ".join(moves))
+            solution_string = " ".join(moves)
+            
+            if not solves(notation, moves):
+                solver_cache.discard(notation)
+                raise CubeSolverError("Solver returned a solution that does not solve the cube")
+            
             steps = [
                 SolutionStep(
                     move=move,
@@ -61,12 +242,20 @@ class SolverService:
             return SolutionResponse(
                 success=True,
                 steps=steps,
-                total_moves=len(steps),
+                total_moves=count_moves(moves, metric),
                 algorithm=solution_string,
-                execution_time=0.0,  # Will be set by the endpoint
+                execution_time=queue_time + solve_time + optimize_time,  # Endpoint adds validation
+                metric=metric,
+                optimal=is_optimal,
+                timings=SolutionTimings(queue=queue_time, solve=solve_time, optimize=optimize_time),
+                cached=result is None,
+                verified=True,
+                frames=facelet_frames(notation, moves) if include_frames else None,
                 error_message=None
             )
         
+        except AppException:
+            raise
         except Exception as e:
             return SolutionResponse(
                 success=False,
@@ -77,6 +266,92 @@ class SolverService:
                 error_message=f"Failed to solve: {str(e)}"
             )
     
+    async def _solve_optimal(self, notation: str) -> Optional[List[str]]:
+        """
+        Optimal moves, or None (no PDBs, budget spent, optimal workers busy)
+        
+        Runs on rubik_optimal_pool, not the main solver pool; None keeps
+        the two-phase solution that is already computed.
+        """
+        if not tables_available():
+            logger.warning("Optimal solve requested but no pattern databases in %s", settings.RUBIK_PDB_DIR)
+            return None
+        budget = settings.RUBIK_OPTIMAL_BUDGET
+        try:
+            # Grace on top of the budget: the search stops itself first
+            solution, _, _ = await rubik_optimal_pool.run(
+                optimal_solve, notation, budget, timeout=budget + 2.0
+            )
+        except CubeSolverBusyError:
+            logger.info("Optimal solver busy, returning the two-phase solution")
+            return None
+        except AppException:
+            return None
+        return solution.split() if solution is not None else None
+    
+    async def solve_batch(
+        self,
+        cubes: List[Union[CubeStateRequest, str]],
+        max_in_flight: int = rubik_solver_pool.max_workers
+    ) -> AsyncIterator[str]:
+        """
+        Validate and solve many cubes, yielding NDJSON in input order
+        
+        Everything is validated up front, identical cubes are solved once,
+        and at most `max_in_flight` solves of this batch wait on the pool
+        so one batch cannot fill the solver queue. Each line is written as
+        soon as it and every line before it are done.
+        
+        Args:
+            cubes: Cube states or 54-char Kociemba facelet strings
+            max_in_flight: Concurrent solves for this batch
+        """
+        validator = CubeValidator()
+        notations: List[Optional[str]] = []
+        errors: Dict[int, str] = {}
+        for index, cube in enumerate(cubes):
+            if isinstance(cube, str):
+                notation = cube.strip().upper()
+                error = check_facelets(notation)
+            else:
+                validation = validator.validate(cube)
+                notation = validation.notation
+                error = validation.error_message if not validation.is_valid else None
+            if error is not None:
+                errors[index] = error
+                notation = None
+            notations.append(notation)
+        
+        limit = asyncio.Semaphore(max(1, max_in_flight))
+        
+        async def solve_one(notation: str) -> Dict[str, Any]:
+            async with limit:
+                try:
+                    response = await self.solve(None, notation=notation)
+                except AppException as e:
+                    return {"success": False, "error_message": e.message}
+            return response.model_dump(
+                include={"success", "algorithm", "total_moves", "cached", "verified",
+                         "execution_time", "error_message"}
+            )
+        
+        tasks: Dict[str, asyncio.Task] = {}
+        for notation in notations:
+            if notation is not None and notation not in tasks:
+                tasks[notation] = asyncio.ensure_future(solve_one(notation))
+        
+        try:
+            for index, notation in enumerate(notations):
+                if notation is None:
+                    line = {"index": index, "success": False, "error_message": errors[index]}
+                else:
+                    line = {"index": index, "notation": notation, **(await tasks[notation])}
+                yield json.dumps(line) + "\n"
+        finally:
+            # Client disconnected or the batch finished: drop leftover work
+            for task in tasks.values():
+                task.cancel()
+    
     def _convert_to_kociemba_notation(self, cube_state: CubeStateRequest) -> str:
         """
         Convert our cube state to Kociemba notation string.
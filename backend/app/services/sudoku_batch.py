@@ -0,0 +1,257 @@
+"""
+Sudoku Batch Checker
+Bulk solve/validate for puzzle-pack imports and QA
+
+Input is one puzzle per line: 81 characters ('0' or '.' = empty),
+optionally followed by a comma or whitespace and the expected solution.
+Lines are checked in chunks on a process pool with a bounded number of
+chunks in flight, and results come back in input order as NDJSON. The
+CLI reads input only as fast as results are produced; the endpoint first
+spools the request body to a temporary file, so memory stays flat
+regardless of input size either way.
+
+CLI:
+    python -m app.services.sudoku_batch puzzles.txt > results.ndjson
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from tempfile import SpooledTemporaryFile
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, AsyncIterable, AsyncIterator
+
+from app.core.config import settings
+from app.services.sudoku_solver import CELL_COUNT, sudoku_solver, flatten_grid, to_string
+from app.services.sudoku_techniques import sudoku_technique_engine
+
+
+def check_line(line_number: int, line: str) -> Dict[str, Any]:
+    """
+    Solve, check uniqueness and grade one input line
+
+    Returns:
+        Result dict; `error` is set for malformed lines
+    """
+    result: Dict[str, Any] = {"line": line_number}
+    parts = line.replace(",", " ").split()
+    if not parts:
+        result["error"] = "Empty line"
+        return result
+
+    try:
+        puzzle = flatten_grid(parts[0])
+        expected = flatten_grid(parts[1]) if len(parts) > 1 else None
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+
+    analysis = sudoku_solver.analyze(puzzle, limit=2)
+    solution = analysis["solution"]
+    unique = analysis["solution_count"] == 1
+
+    result.update({
+        "puzzle": to_string(puzzle),
+        "solvable": solution is not None,
+        "unique": unique,
+        "clues": CELL_COUNT - puzzle.count(0),
+        "solution": to_string(solution) if solution else None,
+        "difficulty": sudoku_technique_engine.grade(puzzle)["difficulty"] if unique else None,
+    })
+    if expected is not None:
+        result["solution_matches"] = unique and solution == expected
+    return result
+
+
+def check_chunk(chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    """Process-pool entry point: check a chunk of (line number, line)"""
+    return [check_line(number, line) for number, line in chunk]
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+    chunk = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        chunk.append((number, line.strip()))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_results(
+    lines: Iterable[str],
+    executor: Executor,
+    chunk_size: int = settings.SUDOKU_BATCH_CHUNK_SIZE,
+    max_pending: int = settings.SUDOKU_BATCH_MAX_PENDING
+) -> Iterator[Dict[str, Any]]:
+    """
+    Check lines on `executor`, yielding results in input order
+
+    At most `max_pending` chunks are in flight; the next chunk is only
+    read once the oldest one has been yielded.
+    """
+    pending = deque()
+    for chunk in _chunks(lines, chunk_size):
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+        pending.append(executor.submit(check_chunk, chunk))
+    while pending:
+        yield from pending.popleft().result()
+
+
+async def aiter_lines(
+    chunks: AsyncIterable[bytes],
+    max_line_length: int = settings.SUDOKU_BATCH_MAX_LINE_LENGTH
+) -> AsyncIterator[str]:
+    """
+    Split a byte stream (e.g. a request body) into text lines
+
+    Raises:
+        ValueError: If a line is longer than `max_line_length` bytes, so
+            input without newlines cannot grow the buffer without bound
+    """
+    buffer = b""
+    number = 0
+    async for data in chunks:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if len(line) > max_line_length:
+                raise ValueError(f"Line {number} is longer than {max_line_length} bytes")
+            yield line.decode("utf-8", errors="replace")
+        if len(buffer) > max_line_length:
+            raise ValueError(f"Line {number + 1} is longer than {max_line_length} bytes")
+    if buffer:
+        yield buffer.decode("utf-8", errors="replace")
+
+
+async def spool_lines(
+    lines: AsyncIterable[str],
+    max_size: int = settings.SUDOKU_BATCH_SPOOL_SIZE
+) -> SpooledTemporaryFile:
+    """
+    Copy lines into a temporary file (in memory up to `max_size` bytes)
+
+    The endpoint reads the whole body before responding: once a streaming
+    response starts, the server's disconnect listener owns the receive
+    channel and the handler would see no body at all.
+    """
+    spool = SpooledTemporaryFile(max_size=max_size, mode="w+", encoding="utf-8")
+    try:
+        async for line in lines:
+            spool.write(line + "\n")
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def aiter_spooled(spool: SpooledTemporaryFile) -> AsyncIterator[str]:
+    """Yield the lines of a spool from `spool_lines`, closing it at the end"""
+    try:
+        for line in spool:
+            yield line
+    finally:
+        spool.close()
+
+
+class SudokuBatchRunner:
+    """Shared process pool for the batch endpoint"""
+
+    def __init__(
+        self,
+        max_workers: int = settings.SUDOKU_BATCH_WORKERS,
+        chunk_size: int = settings.SUDOKU_BATCH_CHUNK_SIZE,
+        max_pending: int = settings.SUDOKU_BATCH_MAX_PENDING
+    ):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawn rather than fork: the server process already runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def stream(self, lines: AsyncIterable[str]) -> AsyncIterator[str]:
+        """
+        Check lines from an async source, yielding NDJSON in input order
+
+        Awaiting the oldest chunk before reading more gives backpressure:
+        a large upload is consumed only as fast as it is checked.
+        """
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        chunk: List[Tuple[int, str]] = []
+        number = 0
+
+        async def drain_one() -> AsyncIterator[str]:
+            for result in await pending.popleft():
+                yield json.dumps(result) + "\n"
+
+        async for line in lines:
+            number += 1
+            if not line.strip():
+                continue
+            chunk.append((number, line.strip()))
+            if len(chunk) < self.chunk_size:
+                continue
+            if len(pending) >= self.max_pending:
+                async for output in drain_one():
+                    yield output
+            pending.append(loop.run_in_executor(self.executor, check_chunk, chunk))
+            chunk = []
+
+        if chunk:
+            pending.append(loop.run_in_executor(self.executor, check_chunk, chunk))
+        while pending:
+            async for output in drain_one():
+                yield output
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+sudoku_batch_runner = SudokuBatchRunner()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-check Sudoku puzzles (one per line) as NDJSON")
+    parser.add_argument("input", nargs="?", default="-", help="Input file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=settings.SUDOKU_BATCH_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    workers = args.workers or multiprocessing.cpu_count()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in iter_results(source, executor, args.chunk_size, max_pending=2 * workers):
+                sink.write(json.dumps(result) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
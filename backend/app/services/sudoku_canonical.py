@@ -0,0 +1,139 @@
+"""
+Sudoku Canonical Form
+Minimal representative of a puzzle under the Sudoku symmetry group
+
+Two puzzles are the same if one maps to the other by transposition, band
+or stack swaps, row swaps within a band, column swaps within a stack and
+digit relabeling. The canonical form is the lexicographically smallest
+81-character string over all of these, with digits relabeled by first
+appearance (empty cells stay 0).
+
+Brute force would try 2 * 1296 * 1296 arrangements. Instead:
+- the relabeled first row only depends on where its empty cells are, so
+  only column orders that push the most empties to the front can win;
+- rows are then chosen by branch and bound, abandoning an arrangement as
+  soon as a row compares greater than the best one found so far.
+This takes ~5-30 ms per puzzle, small next to generating it.
+"""
+import hashlib
+from itertools import permutations, product
+from typing import List, Sequence, Set, Tuple
+
+from app.services.sudoku_solver import GRID_SIZE, BOX_SIZE, flatten_grid
+
+
+_WORST_ROW = (GRID_SIZE + 1,) * GRID_SIZE
+_STACK_ORDERS = list(permutations(range(BOX_SIZE)))
+
+
+def _transpose(cells: List[int]) -> List[int]:
+    return [cells[c * GRID_SIZE + r] for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
+
+
+def _empties_key(row: Sequence[int]) -> Tuple[int, ...]:
+    """
+    Best achievable empty-cell pattern for a first row
+
+    Empties per stack, sorted descending: putting empty cells first within
+    each stack and the emptiest stacks first makes the relabeled row as
+    small as possible, and larger keys give smaller rows.
+    """
+    return tuple(sorted(
+        (sum(1 for v in row[s * BOX_SIZE:(s + 1) * BOX_SIZE] if not v) for s in range(BOX_SIZE)),
+        reverse=True
+    ))
+
+
+def _column_orders(row: Sequence[int]) -> Set[Tuple[int, ...]]:
+    """Every column order that gives `row` its best empty-cell pattern"""
+    within = []
+    empties = []
+    for s in range(BOX_SIZE):
+        cols = range(s * BOX_SIZE, (s + 1) * BOX_SIZE)
+        empty = [c for c in cols if not row[c]]
+        filled = [c for c in cols if row[c]]
+        empties.append(len(empty))
+        within.append([e + f for e in permutations(empty) for f in permutations(filled)])
+
+    orders = set()
+    for stacks in _STACK_ORDERS:
+        counts = [empties[s] for s in stacks]
+        if counts != sorted(counts, reverse=True):
+            continue
+        for parts in product(*(within[s] for s in stacks)):
+            orders.add(parts[0] + parts[1] + parts[2])
+    return orders
+
+
+def _search(rows: List[Tuple[int, ...]], best: List[Tuple[int, ...]]) -> None:
+    """Branch and bound over row arrangements, lowering `best` in place"""
+
+    def descend(depth: int, used: int, band: int, mapping: List[int], next_label: int) -> None:
+        if depth == GRID_SIZE:
+            return
+        if depth % BOX_SIZE == 0:
+            candidates = [
+                r for b in range(BOX_SIZE) if not used >> (b * BOX_SIZE) & 1
+                for r in range(b * BOX_SIZE, (b + 1) * BOX_SIZE)
+            ]
+        else:
+            candidates = [
+                r for r in range(band * BOX_SIZE, (band + 1) * BOX_SIZE)
+                if not used >> r & 1
+            ]
+
+        for r in candidates:
+            labels = mapping[:]
+            label = next_label
+            out = []
+            for v in rows[r]:
+                if v and not labels[v]:
+                    labels[v] = label
+                    label += 1
+                out.append(labels[v])
+            out = tuple(out)
+
+            if out > best[depth]:
+                continue
+            if out < best[depth]:
+                best[depth] = out
+                best[depth + 1:] = [_WORST_ROW] * (GRID_SIZE - depth - 1)
+            descend(depth + 1, used | 1 << r, r // BOX_SIZE, labels, label)
+
+    descend(0, 0, 0, [0] * (GRID_SIZE + 1), 1)
+
+
+def canonical_form(grid: Sequence) -> str:
+    """
+    Canonical 81-character string of a puzzle (or a full grid)
+
+    Args:
+        grid: 9x9 matrix, 81 flat values or 81-char string (0 = empty)
+    """
+    cells = flatten_grid(grid)
+    sources = []
+    best_key = None
+    for source in (cells, _transpose(cells)):
+        rows = [source[r * GRID_SIZE:(r + 1) * GRID_SIZE] for r in range(GRID_SIZE)]
+        key = max(_empties_key(row) for row in rows)
+        if best_key is None or key > best_key:
+            best_key = key
+            sources = []
+        if key == best_key:
+            sources.append(rows)
+
+    best = [_WORST_ROW] * GRID_SIZE
+    for rows in sources:
+        orders = set()
+        for row in rows:
+            if _empties_key(row) == best_key:
+                orders |= _column_orders(row)
+        for order in orders:
+            _search([tuple(row[c] for c in order) for row in rows], best)
+
+    return "".join(str(v) for row in best for v in row)
+
+
+def canonical_hash(grid: Sequence) -> str:
+    """SHA-1 hex digest (40 chars) of the canonical form"""
+    return hashlib.sha1(canonical_form(grid).encode("ascii")).hexdigest()
@@ -0,0 +1,155 @@
+"""
+Sudoku Grid Codec
+Compact 4-bit (nibble) packing for 9x9 grids
+
+Each cell value 0-9 fits in a nibble, so 81 cells pack into 41 bytes
+(high nibble first, the last low nibble is padding). This is the format of
+the `puzzle_packed` / `solution_packed` columns and of the in-memory index.
+The `*_many` helpers work on whole batches with numpy.
+"""
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.sudoku_solver import CELL_COUNT, sudoku_solver
+
+
+PACKED_SIZE = (CELL_COUNT + 1) // 2
+
+# byte -> (high nibble, low nibble)
+_BYTE_TO_PAIR = [(b >> 4, b & 0x0F) for b in range(256)]
+
+
+def pack_grid(cells: Sequence[int]) -> bytes:
+    """Pack 81 cell values (0-9) into 41 bytes"""
+    if len(cells) != CELL_COUNT:
+        raise ValueError(f"Expected {CELL_COUNT} cells, got {len(cells)}")
+    padded = list(cells) + [0]
+    return bytes((padded[i] << 4) | padded[i + 1] for i in range(0, CELL_COUNT + 1, 2))
+
+
+def unpack_grid(data: bytes) -> List[int]:
+    """Unpack 41 bytes into 81 cell values"""
+    if len(data) != PACKED_SIZE:
+        raise ValueError(f"Expected {PACKED_SIZE} bytes, got {len(data)}")
+    pairs = _BYTE_TO_PAIR
+    cells = [v for b in data for v in pairs[b]]
+    del cells[CELL_COUNT:]
+    return cells
+
+
+def pack_string(grid_string: str) -> bytes:
+    """Pack an 81-character grid string (non-digits = empty)"""
+    if len(grid_string) != CELL_COUNT:
+        raise ValueError(f"Invalid grid string length: {len(grid_string)}")
+    return pack_grid([int(ch) if ch.isdigit() else 0 for ch in grid_string])
+
+
+# ---------- Vectorized (numpy) ----------
+
+def pack_many(cells: np.ndarray) -> np.ndarray:
+    """Pack an (N, 81) array of cell values into an (N, 41) uint8 array"""
+    cells = np.asarray(cells, dtype=np.uint8)
+    if cells.ndim != 2 or cells.shape[1] != CELL_COUNT:
+        raise ValueError(f"Expected shape (N, {CELL_COUNT}), got {cells.shape}")
+    padded = np.zeros((cells.shape[0], 2 * PACKED_SIZE), dtype=np.uint8)
+    padded[:, :CELL_COUNT] = cells
+    return (padded[:, 0::2] << 4) | padded[:, 1::2]
+
+
+def unpack_many(packed: np.ndarray) -> np.ndarray:
+    """Unpack an (N, 41) uint8 array into an (N, 81) array of cell values"""
+    packed = np.asarray(packed, dtype=np.uint8)
+    if packed.ndim != 2 or packed.shape[1] != PACKED_SIZE:
+        raise ValueError(f"Expected shape (N, {PACKED_SIZE}), got {packed.shape}")
+    cells = np.empty((packed.shape[0], 2 * PACKED_SIZE), dtype=np.uint8)
+    cells[:, 0::2] = packed >> 4
+    cells[:, 1::2] = packed & 0x0F
+    return cells[:, :CELL_COUNT]
+
+
+def strings_to_array(grid_strings: Sequence[str]) -> np.ndarray:
+    """Parse 81-character grid strings into an (N, 81) array (non-digits = empty)"""
+    raw = np.frombuffer("".join(grid_strings).encode("ascii"), dtype=np.uint8)
+    if raw.size != len(grid_strings) * CELL_COUNT:
+        raise ValueError("Every grid string must be 81 characters")
+    cells = raw.reshape(-1, CELL_COUNT) - ord("0")
+    cells[cells > 9] = 0
+    return cells
+
+
+def array_to_strings(cells: np.ndarray) -> List[str]:
+    """Format an (N, 81) array as 81-character grid strings"""
+    text = (np.asarray(cells, dtype=np.uint8) + ord("0")).tobytes().decode("ascii")
+    return [text[i:i + CELL_COUNT] for i in range(0, len(text), CELL_COUNT)]
+
+
+# ---------- Stored rows ----------
+
+def to_storage_rows(
+    rows: List[Dict[str, Any]],
+    store_solution: bool = True,
+    store_text: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Convert generated rows (`puzzle_data` / `solution_data` strings) into
+    `sudoku_puzzles` insert rows with packed columns
+
+    Args:
+        rows: Rows as returned by `generate_batch`
+        store_solution: Keep `solution_packed`; otherwise it is left NULL and
+            derived with the solver on read
+        store_text: Also keep the legacy 81-character text columns
+    """
+    if not rows:
+        return []
+    puzzles = pack_many(strings_to_array([row["puzzle_data"] for row in rows]))
+    solutions = (
+        pack_many(strings_to_array([row["solution_data"] for row in rows]))
+        if store_solution else None
+    )
+
+    result = []
+    for i, row in enumerate(rows):
+        item = {k: v for k, v in row.items() if k not in ("puzzle_data", "solution_data")}
+        item["puzzle_packed"] = puzzles[i].tobytes()
+        item["solution_packed"] = solutions[i].tobytes() if solutions is not None else None
+        if store_text:
+            item["puzzle_data"] = row["puzzle_data"]
+            item["solution_data"] = row["solution_data"]
+        result.append(item)
+    return result
+
+
+def decode_stored_grid(packed: Optional[bytes], text: Optional[str]) -> Optional[List[int]]:
+    """Cells from a packed column, falling back to the legacy text column"""
+    if packed:
+        return unpack_grid(bytes(packed))
+    if text:
+        return [int(ch) if ch.isdigit() else 0 for ch in text]
+    return None
+
+
+def decode_puzzle_row(row: Any) -> Tuple[List[int], List[int]]:
+    """
+    Puzzle and solution cells of a `sudoku_puzzles` row (ORM object or Row)
+
+    The solution is derived with the solver when it is not stored.
+    """
+    puzzle = decode_stored_grid(row.puzzle_packed, row.puzzle_data)
+    if puzzle is None:
+        raise ValueError(f"Sudoku puzzle {row.id} has no puzzle data")
+    solution = decode_stored_grid(row.solution_packed, row.solution_data)
+    if solution is None:
+        solution = sudoku_solver.analyze(puzzle, limit=1)["solution"]
+        if solution is None:
+            raise ValueError(f"Sudoku puzzle {row.id} has no solution")
+    return puzzle, solution
+
+
+def packed_record(row: Any) -> bytes:
+    """Packed puzzle + solution (82 bytes) of a `sudoku_puzzles` row"""
+    if row.puzzle_packed and row.solution_packed:
+        return bytes(row.puzzle_packed) + bytes(row.solution_packed)
+    puzzle, solution = decode_puzzle_row(row)
+    return pack_grid(puzzle) + pack_grid(solution)
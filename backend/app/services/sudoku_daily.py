@@ -0,0 +1,252 @@
+"""
+Sudoku Daily Challenge
+Precomputed puzzle of the day per difficulty
+
+Every active user asks for the same puzzle right after midnight (UTC), so
+the day's puzzles are selected, graded and rendered to JSON ahead of time,
+tomorrow's included. Requests are served from an immutable cache of
+pre-rendered bytes with an ETag; nothing is computed on the hot path.
+
+Selection is deterministic (`SudokuPuzzleIndex.select` seeded by the date,
+over puzzles created before the previous day), so every worker serves the
+same puzzle without coordination.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.leaderboard_repository import LeaderboardRepository
+from app.services.sudoku_index import sudoku_puzzle_index
+from app.services.sudoku_solver import CELL_COUNT, to_matrix
+from app.services.sudoku_techniques import DIFFICULTY_ORDER, sudoku_technique_engine
+
+logger = logging.getLogger(__name__)
+
+
+class RenderedPayload(NamedTuple):
+    """Immutable pre-rendered JSON response"""
+    body: bytes
+    etag: str
+    expires_at: float  # Unix time; clients may cache until then
+
+
+class DailyPuzzle(NamedTuple):
+    day: str
+    difficulty: str
+    puzzle_id: int
+    payload: RenderedPayload
+
+
+def _render(data: Dict[str, Any], expires_at: float) -> RenderedPayload:
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return RenderedPayload(body, '"' + hashlib.sha1(body).hexdigest() + '"', expires_at)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day)
+
+
+def _expiry(day: date) -> float:
+    return (_day_start(day + timedelta(days=1)) - datetime(1970, 1, 1)).total_seconds()
+
+
+class SudokuDailyChallenge:
+    """Daily puzzle cache, precompute loop and daily leaderboard cache"""
+
+    def __init__(
+        self,
+        retry_interval: int = settings.SUDOKU_DAILY_RETRY_INTERVAL,
+        leaderboard_ttl: int = settings.SUDOKU_DAILY_LEADERBOARD_TTL
+    ):
+        self.retry_interval = retry_interval
+        self.leaderboard_ttl = leaderboard_ttl
+        self._puzzles: Dict[Tuple[str, str], DailyPuzzle] = {}
+        # Days with no eligible puzzle, until the next precompute retries them
+        self._misses: Set[Tuple[str, str]] = set()
+        self._leaderboards: Dict[Tuple[str, str, int], RenderedPayload] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def today() -> date:
+        return datetime.utcnow().date()
+
+    # ---------- Puzzle of the day ----------
+
+    def get(self, difficulty: str, day: Optional[date] = None) -> Optional[DailyPuzzle]:
+        """
+        Cached puzzle of the day, computed on a miss
+
+        A day with no eligible puzzle is remembered as such, so requests
+        don't rescan the index; only `precompute` tries it again.
+        """
+        day = day or self.today()
+        key = (day.isoformat(), difficulty)
+        cached = self._puzzles.get(key)
+        if cached is not None or key in self._misses:
+            return cached
+        return self._compute(day, difficulty)
+
+    def precompute(self, day: date) -> int:
+        """Select, grade and render every difficulty for `day`"""
+        with self._lock:
+            self._misses = {key for key in self._misses if key[0] != day.isoformat()}
+        computed = sum(
+            1 for difficulty in DIFFICULTY_ORDER if self.get(difficulty, day) is not None
+        )
+        self._prune()
+        return computed
+
+    def _compute(self, day: date, difficulty: str) -> Optional[DailyPuzzle]:
+        key = (day.isoformat(), difficulty)
+        # One computation per key even when a burst of requests misses at once
+        with self._lock:
+            cached = self._puzzles.get(key)
+            if cached is not None or key in self._misses:
+                return cached
+
+            entry = sudoku_puzzle_index.select(
+                difficulty,
+                seed=f"sudoku-daily:{key[0]}:{difficulty}",
+                created_before=_day_start(day - timedelta(days=1))
+            )
+            if entry is None:
+                self._misses.add(key)
+                return None
+
+            grade = sudoku_technique_engine.grade(entry["puzzle"])
+            payload = _render({
+                "date": key[0],
+                "difficulty": difficulty,
+                "puzzle_id": entry["id"],
+                "puzzle": to_matrix(entry["puzzle"]),
+                "clues": CELL_COUNT - entry["puzzle"].count(0),
+                "grade": {
+                    "difficulty": grade["difficulty"],
+                    "solved_by_logic": grade["solved_by_logic"],
+                    "techniques": grade["techniques"],
+                },
+                "expires_at": _day_start(day + timedelta(days=1)).isoformat() + "Z",
+            }, _expiry(day))
+
+            daily = DailyPuzzle(key[0], difficulty, entry["id"], payload)
+            self._puzzles[key] = daily
+            return daily
+
+    def is_daily_puzzle(self, puzzle_id: int, difficulty: str) -> Optional[str]:
+        """
+        Date key if `puzzle_id` is today's puzzle for `difficulty`
+
+        Only looks at the cache: a daily puzzle that was never computed has
+        never been served, so nobody can know its id.
+        """
+        daily = self._puzzles.get((self.today().isoformat(), difficulty))
+        if daily is not None and daily.puzzle_id == puzzle_id:
+            return daily.day
+        return None
+
+    def puzzle_ids(self) -> Set[int]:
+        """Ids of yesterday's, today's and tomorrow's puzzles, all difficulties"""
+        today = self.today()
+        return {
+            daily.puzzle_id
+            for day in (today - timedelta(days=1), today, today + timedelta(days=1))
+            for daily in (self.get(difficulty, day) for difficulty in DIFFICULTY_ORDER)
+            if daily is not None
+        }
+
+    def _prune(self) -> None:
+        """Keep yesterday (late finishers), today and tomorrow"""
+        oldest = (self.today() - timedelta(days=1)).isoformat()
+        with self._lock:
+            for key in [k for k in self._puzzles if k[0] < oldest]:
+                del self._puzzles[key]
+            self._misses = {key for key in self._misses if key[0] >= oldest}
+            for key in [k for k in self._leaderboards if k[0] < oldest]:
+                del self._leaderboards[key]
+
+    # ---------- Daily leaderboard ----------
+
+    def leaderboard(
+        self,
+        db: Session,
+        difficulty: str,
+        limit: int = 10,
+        day: Optional[date] = None
+    ) -> RenderedPayload:
+        """
+        Rendered leaderboard for one day's puzzle
+
+        Reused for `leaderboard_ttl` seconds, so a burst of readers costs
+        one indexed query per worker and TTL.
+        """
+        day_key = (day or self.today()).isoformat()
+        key = (day_key, difficulty, limit)
+        now = time.time()
+        cached = self._leaderboards.get(key)
+        if cached is not None and cached.expires_at > now:
+            return cached
+
+        entries = LeaderboardRepository(db).get_daily_sudoku_leaderboard(day_key, difficulty, limit)
+        payload = _render({
+            "date": day_key,
+            "difficulty": difficulty,
+            "leaderboard": entries,
+            "total": len(entries),
+        }, now + self.leaderboard_ttl)
+        self._leaderboards[key] = payload
+        return payload
+
+    def invalidate_leaderboard(self, day: str, difficulty: str) -> None:
+        """Drop this worker's cached leaderboards after a new daily score"""
+        with self._lock:
+            for key in [k for k in self._leaderboards if k[:2] == (day, difficulty)]:
+                del self._leaderboards[key]
+
+    # ---------- Scheduler ----------
+
+    def start(self) -> None:
+        """Start the precompute loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self.retry_interval
+            try:
+                today = self.today()
+                computed = 0
+                for day in (today, today + timedelta(days=1)):
+                    computed += await loop.run_in_executor(None, self.precompute, day)
+                if computed == 2 * len(DIFFICULTY_ORDER):
+                    # Tomorrow is ready: sleep until just after midnight,
+                    # then render the new tomorrow
+                    delay = max(60.0, _expiry(today) - time.time() + 60)
+                else:
+                    logger.warning("Sudoku daily challenge incomplete, puzzle pool empty?")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Sudoku daily challenge precompute failed")
+            await asyncio.sleep(delay)
+
+
+sudoku_daily_challenge = SudokuDailyChallenge()
@@ -0,0 +1,187 @@
+"""
+Dancing Links
+Knuth's Algorithm X for exact cover on array-backed nodes
+
+Nodes are indices into parallel int lists (left/right/up/down/column)
+instead of Python objects, so covering a column is a handful of list
+writes and a 25x25 Sudoku matrix (~60k nodes) is cheap to build.
+Node 0 is the root; nodes 1..n_columns are the column headers.
+"""
+from typing import List, Dict, Any, Iterable, Optional
+
+
+class DancingLinks:
+    """Exact-cover matrix with MRV column choice and iterative search"""
+
+    def __init__(self, n_columns: int):
+        n = n_columns + 1
+        self.left = [i - 1 for i in range(n)]
+        self.right = [i + 1 for i in range(n)]
+        self.left[0] = n - 1
+        self.right[n - 1] = 0
+        self.up = list(range(n))
+        self.down = list(range(n))
+        self.column = list(range(n))
+        self.row_id = [-1] * n
+        # Only meaningful for header nodes
+        self.size = [0] * n
+
+    def add_row(self, row_id: int, columns: Iterable[int]) -> None:
+        """Append a row covering the given (0-based) columns"""
+        left, right, up, down = self.left, self.right, self.up, self.down
+        first = -1
+        for col in columns:
+            header = col + 1
+            node = len(self.column)
+            self.column.append(header)
+            self.row_id.append(row_id)
+
+            # Vertical: insert above the header (bottom of the column)
+            last = up[header]
+            up.append(last)
+            down.append(header)
+            down[last] = node
+            up[header] = node
+            self.size[header] += 1
+
+            # Horizontal: circular list through the row's nodes
+            if first < 0:
+                left.append(node)
+                right.append(node)
+                first = node
+            else:
+                tail = left[first]
+                left.append(tail)
+                right.append(first)
+                right[tail] = node
+                left[first] = node
+
+    def cover(self, col: int) -> None:
+        """Remove a column (0-based) and every row that intersects it"""
+        self._cover(col + 1)
+
+    def _cover(self, header: int) -> None:
+        left, right, up, down, column, size = (
+            self.left, self.right, self.up, self.down, self.column, self.size
+        )
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, header: int) -> None:
+        left, right, up, down, column, size = (
+            self.left, self.right, self.up, self.down, self.column, self.size
+        )
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def _choose_column(self) -> int:
+        """MRV: header with the fewest remaining rows"""
+        right, size = self.right, self.size
+        best = -1
+        best_size = len(self.column)
+        c = right[0]
+        while c != 0:
+            if size[c] < best_size:
+                best, best_size = c, size[c]
+                if best_size <= 1:
+                    break
+            c = right[c]
+        return best
+
+    def search(self, limit: int = 1, max_guesses: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Find up to `limit` exact covers
+
+        The search is iterative, so deep matrices never hit the recursion
+        limit. It consumes the matrix: build a new one per problem.
+
+        Args:
+            limit: Stop after this many solutions
+            max_guesses: Give up after this many branch points
+
+        Returns:
+            Dict with `solutions` (lists of row ids), `complete` (False if
+            the guess budget ran out first) and `stats` counting guesses
+            (branch points with more than one row)
+        """
+        right, down, column = self.right, self.down, self.column
+        row_id = self.row_id
+        solutions: List[List[int]] = []
+        stats = {"guesses": 0}
+        complete = True
+        # Stack of chosen row nodes; the column of each is column[node]
+        chosen: List[int] = []
+
+        descend = True
+        while True:
+            if descend:
+                if right[0] == 0:
+                    solutions.append([row_id[node] for node in chosen])
+                    if len(solutions) >= limit:
+                        break
+                    descend = False
+                    continue
+
+                header = self._choose_column()
+                if self.size[header] == 0:
+                    descend = False
+                    continue
+                if self.size[header] > 1:
+                    if max_guesses is not None and stats["guesses"] >= max_guesses:
+                        complete = False
+                        break
+                    stats["guesses"] += 1
+
+                self._cover(header)
+                node = down[header]
+                chosen.append(node)
+                self._select(node)
+                continue
+
+            # Backtrack: try the next row of the deepest column
+            if not chosen:
+                break
+            node = chosen.pop()
+            self._deselect(node)
+            header = column[node]
+            node = down[node]
+            if node == header:
+                self._uncover(header)
+                continue
+            chosen.append(node)
+            self._select(node)
+            descend = True
+
+        return {"solutions": solutions, "complete": complete, "stats": stats}
+
+    def _select(self, node: int) -> None:
+        right, column = self.right, self.column
+        j = right[node]
+        while j != node:
+            self._cover(column[j])
+            j = right[j]
+
+    def _deselect(self, node: int) -> None:
+        left, column = self.left, self.column
+        j = left[node]
+        while j != node:
+            self._uncover(column[j])
+            j = left[j]
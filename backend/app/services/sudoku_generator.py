@@ -0,0 +1,151 @@
+"""
+Sudoku Puzzle Generator
+Unique-solution puzzle generation graded by required techniques
+
+Generation is CPU-bound, so `generate_batch` is a module-level function
+that can be shipped to a process pool (see `sudoku_pool.py`).
+"""
+import random
+from typing import List, Dict, Any, Optional
+
+from app.services.sudoku_solver import (
+    GRID_SIZE,
+    BOX_SIZE,
+    CELL_COUNT,
+    sudoku_solver,
+    to_string,
+)
+from app.services.sudoku_canonical import canonical_hash
+from app.services.sudoku_techniques import sudoku_technique_engine
+
+
+# Clue count to dig down to for each difficulty (matches the rules endpoint)
+CLUE_TARGETS = {
+    "easy": 32,
+    "medium": 27,
+    "hard": 22,
+}
+
+
+class SudokuGenerator:
+    """Generates unique-solution Sudoku puzzles for a target difficulty"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def generate_solution(self) -> List[int]:
+        """
+        Generate a random complete grid
+
+        The three diagonal boxes are independent, so they are filled with
+        random permutations and the solver completes the rest. A random
+        digit relabeling removes the bias of the solver's branch order.
+        """
+        cells = [0] * CELL_COUNT
+        for box in range(BOX_SIZE):
+            digits = list(range(1, GRID_SIZE + 1))
+            self.rng.shuffle(digits)
+            for k, digit in enumerate(digits):
+                r = box * BOX_SIZE + k // BOX_SIZE
+                c = box * BOX_SIZE + k % BOX_SIZE
+                cells[r * GRID_SIZE + c] = digit
+
+        solution = sudoku_solver.analyze(cells, limit=1)["solution"]
+
+        relabel = list(range(1, GRID_SIZE + 1))
+        self.rng.shuffle(relabel)
+        return [relabel[v - 1] for v in solution]
+
+    def dig(self, solution: List[int], clue_target: int) -> List[int]:
+        """
+        Remove clues in symmetric pairs while the solution stays unique
+
+        Args:
+            solution: Complete grid (81 flat cells)
+            clue_target: Stop once the clue count reaches this value
+
+        Returns:
+            Puzzle cells (0 = empty)
+        """
+        puzzle = solution[:]
+        clues = CELL_COUNT
+        order = list(range(CELL_COUNT // 2 + 1))
+        self.rng.shuffle(order)
+
+        for i in order:
+            if clues <= clue_target:
+                break
+            mirror = CELL_COUNT - 1 - i
+            removed = [(i, puzzle[i])]
+            if mirror != i:
+                removed.append((mirror, puzzle[mirror]))
+
+            for index, _ in removed:
+                puzzle[index] = 0
+            if sudoku_solver.count_solutions(puzzle, limit=2) == 1:
+                clues -= len(removed)
+            else:
+                for index, value in removed:
+                    puzzle[index] = value
+
+        return puzzle
+
+    def generate(self, difficulty: str, max_attempts: int = 20) -> Optional[Dict[str, Any]]:
+        """
+        Generate one puzzle graded as `difficulty`
+
+        Args:
+            difficulty: 'easy', 'medium' or 'hard'
+            max_attempts: Puzzles to try before giving up
+
+        Returns:
+            Dict with `difficulty`, `puzzle_data`, `solution_data` and
+            `grade`, or None if no attempt matched the difficulty
+        """
+        if difficulty not in CLUE_TARGETS:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+
+        for _ in range(max_attempts):
+            solution = self.generate_solution()
+            puzzle = self.dig(solution, CLUE_TARGETS[difficulty])
+            grade = sudoku_technique_engine.grade(puzzle)
+            if grade["difficulty"] == difficulty:
+                return {
+                    "difficulty": difficulty,
+                    "puzzle_data": to_string(puzzle),
+                    "solution_data": to_string(solution),
+                    "grade": grade,
+                }
+        return None
+
+
+def generate_batch(
+    difficulty: str,
+    count: int,
+    seed: Optional[int] = None
+) -> List[Dict[str, str]]:
+    """
+    Generate up to `count` puzzles of one difficulty
+
+    Process-pool entry point: returns plain dicts ready for a bulk insert.
+    Canonical hashes are computed here, in the worker, and puzzles that are
+    the same up to symmetry are only returned once.
+    """
+    generator = SudokuGenerator(seed)
+    rows = []
+    seen = set()
+    for _ in range(count):
+        puzzle = generator.generate(difficulty)
+        if puzzle is None:
+            continue
+        digest = canonical_hash(puzzle["puzzle_data"])
+        if digest in seen:
+            continue
+        seen.add(digest)
+        rows.append({
+            "difficulty": puzzle["difficulty"],
+            "puzzle_data": puzzle["puzzle_data"],
+            "solution_data": puzzle["solution_data"],
+            "canonical_hash": digest,
+        })
+    return rows
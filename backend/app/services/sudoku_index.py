@@ -0,0 +1,207 @@
+"""
+Sudoku Puzzle Index
+Warm in-process copy of `sudoku_puzzles`, grouped by difficulty
+
+Puzzles and solutions are kept nibble-packed (41 bytes each) in one
+bytearray per difficulty, so the whole pool costs ~82 bytes per puzzle plus
+its id. Random selection is a single `randrange` and needs no DB round trip.
+The index is loaded at startup and refreshed incrementally: rows with a
+higher id than any seen, plus rows created within `refresh_overlap` seconds
+of the previous refresh. Refillers in several workers commit out of id
+order, so a lower id can become visible after a higher one; the overlap
+window picks it up on the next refresh instead of skipping it for good.
+"""
+import logging
+import random
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.game import SudokuPuzzle
+from app.services.sudoku_codec import PACKED_SIZE, packed_record, unpack_grid
+
+logger = logging.getLogger(__name__)
+
+_RECORD_SIZE = 2 * PACKED_SIZE  # puzzle + solution
+
+
+class _DifficultyBucket:
+    """Parallel arrays for one difficulty"""
+
+    def __init__(self):
+        self.ids = array("q")
+        self.created_at = array("d")
+        self.data = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class SudokuPuzzleIndex:
+    """In-memory puzzle pool with O(1) random pick and id lookup"""
+
+    def __init__(self, refresh_overlap: int = settings.SUDOKU_INDEX_REFRESH_OVERLAP):
+        self.refresh_overlap = refresh_overlap
+        self._buckets: Dict[str, _DifficultyBucket] = {}
+        self._positions: Dict[int, Tuple[str, int]] = {}
+        self._max_id = 0
+        self._refreshed_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._positions)
+
+    def size(self, difficulty: Optional[str] = None) -> int:
+        if difficulty is None:
+            return len(self._positions)
+        bucket = self._buckets.get(difficulty)
+        return len(bucket) if bucket else 0
+
+    def load(self, db: Session) -> int:
+        """Load every puzzle; returns the number of puzzles indexed"""
+        with self._lock:
+            self._buckets = {}
+            self._positions = {}
+            self._max_id = 0
+            self._refreshed_at = None
+        return self.refresh(db)
+
+    def refresh(self, db: Session, batch_size: int = 5000) -> int:
+        """
+        Index puzzles inserted since the last refresh
+
+        Returns:
+            Number of new puzzles indexed
+        """
+        started = datetime.utcnow()
+        # Rows committed late can have an id below `_max_id`; re-read the
+        # recent `created_at` window and skip the ones already indexed
+        new_rows = [SudokuPuzzle.id > self._max_id]
+        if self._refreshed_at is not None:
+            new_rows.append(
+                SudokuPuzzle.created_at >= self._refreshed_at - timedelta(seconds=self.refresh_overlap)
+            )
+        after_id = 0 if len(new_rows) > 1 else self._max_id
+        added = 0
+        while True:
+            rows = db.query(
+                SudokuPuzzle.id,
+                SudokuPuzzle.difficulty,
+                SudokuPuzzle.puzzle_packed,
+                SudokuPuzzle.solution_packed,
+                SudokuPuzzle.puzzle_data,
+                SudokuPuzzle.solution_data,
+                SudokuPuzzle.created_at
+            ).filter(
+                SudokuPuzzle.id > after_id,
+                or_(*new_rows)
+            ).order_by(SudokuPuzzle.id).limit(batch_size).all()
+
+            if not rows:
+                self._refreshed_at = started
+                return added
+
+            after_id = rows[-1].id
+
+            with self._lock:
+                for row in rows:
+                    # Concurrent refreshes may fetch the same rows
+                    if row.id in self._positions:
+                        continue
+                    try:
+                        self._add(row.id, row.difficulty, packed_record(row), row.created_at)
+                        added += 1
+                    except ValueError:
+                        logger.warning("Skipping malformed Sudoku puzzle %s", row.id)
+                    self._max_id = max(self._max_id, row.id)
+
+    def _add(
+        self,
+        puzzle_id: int,
+        difficulty: str,
+        record: bytes,
+        created_at: Optional[datetime]
+    ) -> None:
+        bucket = self._buckets.get(difficulty)
+        if bucket is None:
+            bucket = self._buckets[difficulty] = _DifficultyBucket()
+        position = len(bucket)
+        # Data first, then ids: readers size their pick by `ids`
+        bucket.data += record
+        bucket.created_at.append(created_at.timestamp() if created_at else 0.0)
+        bucket.ids.append(puzzle_id)
+        self._positions[puzzle_id] = (difficulty, position)
+
+    def random(self, difficulty: str) -> Optional[Dict[str, Any]]:
+        """Pick a random puzzle of `difficulty`, or None if there is none"""
+        bucket = self._buckets.get(difficulty)
+        if not bucket:
+            return None
+        return self._entry(difficulty, bucket, self._rng.randrange(len(bucket)))
+
+    def select(
+        self,
+        difficulty: str,
+        seed: str,
+        created_before: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Deterministic pick: the same seed over the same puzzles always
+        returns the same puzzle, in every worker
+
+        Args:
+            difficulty: Puzzle difficulty
+            seed: Selection key (e.g. a date)
+            created_before: Only consider puzzles created before this, so
+                workers whose index is a few minutes behind still agree
+
+        Returns None when no indexed puzzle matches; the pool is never
+        widened, since workers with different recent rows would disagree.
+        """
+        bucket = self._buckets.get(difficulty)
+        if not bucket:
+            return None
+        count = len(bucket)
+        positions = range(count)
+        if created_before is not None:
+            cutoff = created_before.timestamp()
+            positions = [p for p in positions if bucket.created_at[p] < cutoff]
+            if not positions:
+                logger.warning(
+                    "No %s puzzle created before %s, skipping selection",
+                    difficulty, created_before.isoformat()
+                )
+                return None
+        # str seeds are hashed with SHA-512, independent of PYTHONHASHSEED
+        position = positions[random.Random(seed).randrange(len(positions))]
+        return self._entry(difficulty, bucket, position)
+
+    def get(self, puzzle_id: int) -> Optional[Dict[str, Any]]:
+        """Look up a puzzle by id, or None if it is not indexed"""
+        location = self._positions.get(puzzle_id)
+        if location is None:
+            return None
+        difficulty, position = location
+        return self._entry(difficulty, self._buckets[difficulty], position)
+
+    @staticmethod
+    def _entry(difficulty: str, bucket: _DifficultyBucket, position: int) -> Dict[str, Any]:
+        offset = position * _RECORD_SIZE
+        record = bytes(bucket.data[offset:offset + _RECORD_SIZE])
+        return {
+            "id": bucket.ids[position],
+            "difficulty": difficulty,
+            "puzzle": unpack_grid(record[:PACKED_SIZE]),
+            "solution": unpack_grid(record[PACKED_SIZE:]),
+            "created_at": datetime.fromtimestamp(bucket.created_at[position]),
+        }
+
+
+sudoku_puzzle_index = SudokuPuzzleIndex()
@@ -0,0 +1,261 @@
+"""
+Sudoku Puzzle Pool
+Background job keeping `sudoku_puzzles` topped up per difficulty
+
+Generation runs in a process pool so it never blocks the event loop or
+competes with request handling for the GIL. Finished batches are written
+with one bulk INSERT each, in the packed storage format; puzzles equal up
+to symmetry to a stored one are skipped via the unique `canonical_hash`
+column. On startup, rows from before those columns existed are backfilled.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.game_repository import GameScoreRepository, SudokuPuzzleRepository
+from app.services.sudoku_canonical import canonical_hash
+from app.services.sudoku_codec import (
+    decode_stored_grid,
+    pack_many,
+    strings_to_array,
+    to_storage_rows,
+)
+from app.services.sudoku_daily import sudoku_daily_challenge
+from app.services.sudoku_generator import CLUE_TARGETS, generate_batch
+from app.services.sudoku_index import sudoku_puzzle_index
+
+logger = logging.getLogger(__name__)
+
+
+class SudokuPoolRefiller:
+    """Periodically generates puzzles until each difficulty reaches its target"""
+
+    def __init__(
+        self,
+        target_size: int = settings.SUDOKU_POOL_TARGET_SIZE,
+        batch_size: int = settings.SUDOKU_POOL_BATCH_SIZE,
+        max_workers: int = settings.SUDOKU_POOL_WORKERS,
+        interval_seconds: int = settings.SUDOKU_POOL_REFILL_INTERVAL,
+        store_solution: bool = settings.SUDOKU_STORE_SOLUTION,
+        store_text: bool = settings.SUDOKU_STORE_TEXT
+    ):
+        self.target_size = target_size
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.interval_seconds = interval_seconds
+        self.store_solution = store_solution
+        self.store_text = store_text
+        self.sudoku_repository = SudokuPuzzleRepository()
+        self.game_score_repository = GameScoreRepository()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the refill loop on the running event loop"""
+        if self._task is not None:
+            return
+        # Spawn rather than fork: the server process already runs threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the refill loop and shut the worker processes down"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for name, backfill in (
+            ("packed storage", self.backfill_packed_storage),
+            ("canonical hashes", self.backfill_canonical_hashes),
+        ):
+            try:
+                counts = await loop.run_in_executor(None, backfill)
+                if any(counts.values()):
+                    logger.info("Sudoku %s backfilled: %s", name, counts)
+            except Exception:
+                logger.exception("Sudoku %s backfill failed", name)
+
+        while True:
+            try:
+                inserted = await self.refill_once()
+                if any(inserted.values()):
+                    logger.info("Sudoku pool refilled: %s", inserted)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Sudoku pool refill failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def refill_once(self) -> Dict[str, int]:
+        """
+        Generate and insert puzzles for every difficulty below target
+
+        Returns:
+            Number of puzzles inserted per difficulty
+        """
+        loop = asyncio.get_running_loop()
+        counts = await loop.run_in_executor(None, self._count_puzzles)
+
+        jobs = []
+        for difficulty in CLUE_TARGETS:
+            deficit = self.target_size - counts.get(difficulty, 0)
+            while deficit > 0:
+                size = min(self.batch_size, deficit)
+                jobs.append(loop.run_in_executor(self._executor, generate_batch, difficulty, size))
+                deficit -= size
+
+        inserted = {difficulty: 0 for difficulty in CLUE_TARGETS}
+        for job in asyncio.as_completed(jobs):
+            rows = await job
+            if rows:
+                inserted[rows[0]["difficulty"]] += await loop.run_in_executor(
+                    None, self._insert_rows, rows
+                )
+
+        # Also picks up puzzles inserted by other workers since the last cycle
+        await loop.run_in_executor(None, self._refresh_index)
+        return inserted
+
+    def backfill_packed_storage(self, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Fill `puzzle_packed` / `solution_packed` from the legacy text columns
+
+        Text columns are left in place; they can be cleared once every
+        reader is on the packed columns (see
+        `database/add_sudoku_packed_storage.sql`).
+
+        Returns:
+            Number of rows packed
+        """
+        db = SessionLocal()
+        packed = 0
+        try:
+            after_id = 0
+            while True:
+                puzzles = self.sudoku_repository.get_missing_packed(db, after_id, batch_size)
+                if not puzzles:
+                    break
+                after_id = puzzles[-1].id
+                puzzles = [p for p in puzzles if p.puzzle_data and len(p.puzzle_data) == 81]
+
+                puzzle_bytes = pack_many(strings_to_array([p.puzzle_data for p in puzzles]))
+                for i, puzzle in enumerate(puzzles):
+                    puzzle.puzzle_packed = puzzle_bytes[i].tobytes()
+
+                if self.store_solution:
+                    with_solution = [
+                        p for p in puzzles if p.solution_data and len(p.solution_data) == 81
+                    ]
+                    solution_bytes = pack_many(
+                        strings_to_array([p.solution_data for p in with_solution])
+                    )
+                    for i, puzzle in enumerate(with_solution):
+                        puzzle.solution_packed = solution_bytes[i].tobytes()
+
+                db.commit()
+                packed += len(puzzles)
+            return {"packed": packed}
+        finally:
+            db.close()
+
+    def backfill_canonical_hashes(self, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Hash rows inserted before `canonical_hash` existed
+
+        Of two rows equal up to symmetry the earliest keeps the hash and the
+        other is deleted, so the unique index only ever sees distinct
+        puzzles. Rows referenced by a score (`game_data->>'puzzle_id'`) or a
+        current daily challenge are never deleted: if both are referenced,
+        the later one is kept with a NULL hash and retried next startup.
+
+        Returns:
+            Number of rows hashed, removed and kept as referenced duplicates
+        """
+        db = SessionLocal()
+        hashed = removed = kept = 0
+        try:
+            referenced = (
+                self.game_score_repository.get_sudoku_puzzle_ids(db)
+                | sudoku_daily_challenge.puzzle_ids()
+            )
+            after_id = 0
+            while True:
+                puzzles = self.sudoku_repository.get_missing_canonical_hash(db, after_id, batch_size)
+                if not puzzles:
+                    break
+                for puzzle in puzzles:
+                    after_id = puzzle.id
+                    cells = decode_stored_grid(puzzle.puzzle_packed, puzzle.puzzle_data)
+                    if cells is None:
+                        continue
+                    digest = canonical_hash(cells)
+                    existing = self.sudoku_repository.get_by_canonical_hash(db, digest)
+                    if existing is None:
+                        puzzle.canonical_hash = digest
+                        hashed += 1
+                    elif existing.id > puzzle.id and existing.id not in referenced:
+                        # A newer copy holds the hash: move it to this earlier row
+                        db.delete(existing)
+                        db.flush()
+                        puzzle.canonical_hash = digest
+                        hashed += 1
+                        removed += 1
+                    elif puzzle.id not in referenced:
+                        db.delete(puzzle)
+                        removed += 1
+                    else:
+                        kept += 1
+                    db.flush()
+                db.commit()
+
+            if removed:
+                # The index has no removal; reload it without the duplicates
+                sudoku_puzzle_index.load(db)
+            return {"hashed": hashed, "removed": removed, "kept": kept}
+        finally:
+            db.close()
+
+    def _count_puzzles(self) -> Dict[str, int]:
+        db = SessionLocal()
+        try:
+            return self.sudoku_repository.count_by_difficulty(db)
+        finally:
+            db.close()
+
+    def _insert_rows(self, rows: List[Dict[str, str]]) -> int:
+        db = SessionLocal()
+        try:
+            count = self.sudoku_repository.bulk_create(
+                db,
+                to_storage_rows(rows, self.store_solution, self.store_text)
+            )
+            sudoku_puzzle_index.refresh(db)
+            return count
+        finally:
+            db.close()
+
+    def _refresh_index(self) -> None:
+        db = SessionLocal()
+        try:
+            sudoku_puzzle_index.refresh(db)
+        finally:
+            db.close()
+
+
+sudoku_pool_refiller = SudokuPoolRefiller()
@@ -5,11 +5,29 @@ Business logic for Sudoku puzzle game
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
-import random
 import copy
+import math
 
 from app.repositories.game_repository import SudokuPuzzleRepository, GameScoreRepository
-from app.core.exceptions import AppException
+from app.core.exceptions import AppException, GameNotFoundError
+from app.services.sudoku_solver import sudoku_solver, flatten_grid, to_matrix, POPCOUNT
+from app.services.sudoku_codec import decode_puzzle_row
+from app.services.sudoku_daily import DailyPuzzle, RenderedPayload, sudoku_daily_challenge
+from app.services.sudoku_index import sudoku_puzzle_index
+from app.services.sudoku_session import SudokuSession, sudoku_session_store
+from app.services.sudoku_variants import (
+    SudokuVariantGenerator,
+    decode_grid as decode_variant,
+    encode_grid,
+    sudoku_variant_solver,
+    to_matrix as variant_to_matrix,
+)
+from app.services.sudoku_techniques import (
+    CandidateGrid,
+    DIFFICULTY_ORDER,
+    sudoku_technique_engine,
+    step_to_hint,
+)
 
 
 class SudokuService:
@@ -37,30 +55,57 @@ class SudokuService:
             puzzle_id: Optional specific puzzle ID
         
         Returns:
-            Dict containing puzzle data
+            Dict containing puzzle data; `solution` is None while the puzzle
+            is a current daily challenge, so the daily leaderboard stays fair
         """
+        # Hot path: served from the in-memory index, no DB round trip
+        entry = (
+            sudoku_puzzle_index.get(puzzle_id) if puzzle_id
+            else sudoku_puzzle_index.random(difficulty)
+        )
+        if entry is not None:
+            return self._hide_daily_solution({
+                "id": entry["id"],
+                "difficulty": entry["difficulty"],
+                "puzzle": to_matrix(entry["puzzle"]),
+                "solution": to_matrix(entry["solution"]),
+                "hints_used": 0,
+                "created_at": entry["created_at"].isoformat()
+            })
+        
+        # Index empty or not yet refreshed: fall back to the database
         if puzzle_id:
-            puzzle = self.sudoku_repository.get_by_id(puzzle_id)
+            puzzle = self.sudoku_repository.get_by_id(self.db, puzzle_id)
             if not puzzle:
                 raise AppException("Puzzle not found", status_code=404)
         else:
-            # Get random puzzle by difficulty
-            puzzles = self.sudoku_repository.get_by_difficulty(difficulty, limit=10)
-            if not puzzles:
+            # Get random puzzle by difficulty (whole pool, not just the first rows)
+            puzzle = self.sudoku_repository.get_random_by_difficulty(self.db, difficulty)
+            if not puzzle:
                 raise AppException(
                     f"No puzzles available for difficulty: {difficulty}",
                     status_code=404
                 )
-            puzzle = random.choice(puzzles)
         
-        return {
+        try:
+            puzzle_cells, solution_cells = decode_puzzle_row(puzzle)
+        except ValueError as e:
+            raise AppException(str(e), status_code=500)
+        
+        return self._hide_daily_solution({
             "id": puzzle.id,
             "difficulty": puzzle.difficulty,
-            "puzzle": self._parse_grid(puzzle.puzzle_data),
-            "solution": self._parse_grid(puzzle.solution_data),
+            "puzzle": to_matrix(puzzle_cells),
+            "solution": to_matrix(solution_cells),
             "hints_used": 0,
             "created_at": puzzle.created_at.isoformat()
-        }
+        })
+    
+    def _hide_daily_solution(self, puzzle: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop the solution if the puzzle is today's daily challenge"""
+        if sudoku_daily_challenge.is_daily_puzzle(puzzle["id"], puzzle["difficulty"]):
+            puzzle["solution"] = None
+        return puzzle
     
     def _parse_grid(self, grid_string: str) -> List[List[int]]:
         """
@@ -220,44 +265,316 @@ class SudokuService:
             "message": "Move accepted"
         }
     
+    def start_session(
+        self,
+        difficulty: str = "medium",
+        puzzle_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Start a server-side play session for a puzzle
+        
+        Args:
+            difficulty: Puzzle difficulty ('easy', 'medium', 'hard')
+            puzzle_id: Optional specific puzzle ID
+        
+        Returns:
+            Session state (session ID, grid, givens)
+        """
+        puzzle = self.get_puzzle(difficulty=difficulty, puzzle_id=puzzle_id)
+        session = sudoku_session_store.create(
+            puzzle["puzzle"],
+            puzzle_id=puzzle["id"],
+            difficulty=puzzle["difficulty"]
+        )
+        return session.to_dict()
+    
+    def get_session(self, session_id: str) -> SudokuSession:
+        """Get an active play session"""
+        session = sudoku_session_store.get(session_id)
+        if session is None:
+            raise GameNotFoundError("Sudoku session not found or expired")
+        return session
+    
+    def session_move(
+        self,
+        session_id: str,
+        row: int,
+        col: int,
+        value: int
+    ) -> Dict[str, Any]:
+        """
+        Make a move in a play session
+        
+        Validation, placement, clearing and completion detection are all
+        constant time thanks to the session's row/column/box masks.
+        
+        Args:
+            session_id: Session ID from start_session
+            row: Row index (0-8)
+            col: Column index (0-8)
+            value: Number to place (1-9) or 0 to clear
+        
+        Returns:
+            Move result with filled count and completion status
+        """
+        return self.get_session(session_id).move(row, col, value)
+    
     def get_hint(
         self,
         puzzle_grid: List[List[int]],
-        solution_grid: List[List[int]]
+        solution_grid: Optional[List[List[int]]] = None
     ) -> Dict[str, Any]:
         """
-        Get a hint for the current puzzle state
+        Get a logical hint for the current puzzle state
+        
+        Finds the easiest human technique (singles, pairs, pointing,
+        X-Wing, ...) that leads to the next placement. Falls back to
+        revealing a cell only when logic gets stuck.
         
         Args:
             puzzle_grid: Current grid with user's progress
-            solution_grid: Complete solution grid
+            solution_grid: Optional complete solution grid, used to point
+                out wrong entries before giving a logical hint
         
         Returns:
-            Dict with hint position and value
+            Dict with hint position, value, technique and eliminated candidates
         """
-        # Find all empty cells
-        empty_cells = []
-        for i in range(self.GRID_SIZE):
-            for j in range(self.GRID_SIZE):
-                if puzzle_grid[i][j] == 0:
-                    empty_cells.append((i, j))
+        # Check both shapes before any cell is read
+        try:
+            cells = flatten_grid(puzzle_grid)
+            solution = flatten_grid(solution_grid) if solution_grid else None
+        except ValueError as e:
+            raise AppException(str(e), status_code=400)
+        
+        # Wrong entries make every later deduction unreliable, so fix those first
+        if solution:
+            for index, value in enumerate(cells):
+                if value and value != solution[index]:
+                    i, j = divmod(index, self.GRID_SIZE)
+                    return {
+                        "available": True,
+                        "technique": "mistake",
+                        "row": i,
+                        "col": j,
+                        "value": solution[index],
+                        "eliminations": [],
+                        "steps": [],
+                        "message": f"Row {i + 1}, column {j + 1} is wrong: it should be {solution[index]}"
+                    }
+        
+        grid = CandidateGrid.from_grid(cells)
         
-        if not empty_cells:
+        if grid is None:
+            return {
+                "available": False,
+                "message": "Grid has conflicting numbers"
+            }
+        
+        if grid.is_solved():
             return {
                 "available": False,
                 "message": "No empty cells remaining"
             }
         
-        # Choose random empty cell
-        row, col = random.choice(empty_cells)
-        hint_value = solution_grid[row][col]
+        result = sudoku_technique_engine.next_placement(grid)
+        if result is None:
+            return self._reveal_hint(grid, solution)
+        
+        placement_hint = step_to_hint(result["step"])
+        supporting = [step_to_hint(step) for step in result["supporting"]]
+        steps = supporting + [placement_hint]
+        
+        # Report the hardest technique needed, not just the final single
+        key_step = max(steps, key=lambda s: DIFFICULTY_ORDER.index(s["level"]))
+        placement = placement_hint["placements"][0]
         
         return {
             "available": True,
+            "technique": key_step["technique"],
+            "technique_name": key_step["technique_name"],
+            "level": key_step["level"],
+            "row": placement["row"],
+            "col": placement["col"],
+            "value": placement["value"],
+            "eliminations": [e for step in supporting for e in step["eliminations"]],
+            "steps": steps,
+            "message": " → ".join(step["message"] for step in steps)
+        }
+    
+    def _reveal_hint(
+        self,
+        grid: CandidateGrid,
+        solution: Optional[List[int]]
+    ) -> Dict[str, Any]:
+        """Reveal the most constrained empty cell when no technique applies"""
+        if not solution:
+            solved = sudoku_solver.analyze(grid.cells, limit=1)["solution"]
+            if solved is None:
+                return {
+                    "available": False,
+                    "message": "Puzzle has no solution from this position"
+                }
+            solution = solved
+        
+        empty = [i for i in range(len(grid.cells)) if not grid.cells[i]]
+        index = min(empty, key=lambda i: POPCOUNT[grid.candidates[i]])
+        row, col = divmod(index, self.GRID_SIZE)
+        value = solution[index]
+        
+        return {
+            "available": True,
+            "technique": "reveal",
             "row": row,
             "col": col,
-            "value": hint_value,
-            "message": f"Place {hint_value} at row {row + 1}, column {col + 1}"
+            "value": value,
+            "eliminations": [],
+            "steps": [],
+            "message": f"Place {value} at row {row + 1}, column {col + 1}"
+        }
+    
+    def solve_puzzle(self, grid: List[List[int]]) -> Dict[str, Any]:
+        """
+        Solve a user-entered grid and check solution uniqueness
+        
+        Args:
+            grid: 9x9 grid (0 = empty)
+        
+        Returns:
+            Dict with solvability, uniqueness and the solution grid
+        """
+        try:
+            analysis = sudoku_solver.analyze(grid, limit=2)
+        except ValueError as e:
+            raise AppException(str(e), status_code=400)
+        
+        solution_count = analysis["solution_count"]
+        
+        if solution_count == 0:
+            message = "Puzzle has no solution"
+        elif solution_count == 1:
+            message = "Puzzle has a unique solution"
+        else:
+            message = "Puzzle has multiple solutions"
+        
+        return {
+            "solvable": solution_count > 0,
+            "unique": solution_count == 1,
+            "solution": to_matrix(analysis["solution"]) if analysis["solution"] else None,
+            "stats": analysis["stats"],
+            "message": message
+        }
+    
+    def solve_variant(self, grid: Any) -> Dict[str, Any]:
+        """
+        Solve an NxN grid (4x4, 9x9, 16x16, 25x25) with Dancing Links
+        
+        Args:
+            grid: NxN matrix or grid string (letters for values above 9)
+        
+        Returns:
+            Dict with size, solvability, uniqueness and the solution
+        """
+        try:
+            analysis = sudoku_variant_solver.analyze(grid, limit=2)
+        except ValueError as e:
+            raise AppException(str(e), status_code=400)
+        
+        solution_count = analysis["solution_count"]
+        solution = analysis["solution"]
+        
+        if solution_count == 0:
+            message = "Puzzle has no solution"
+        elif solution_count == 1:
+            message = "Puzzle has a unique solution"
+        else:
+            message = "Puzzle has multiple solutions"
+        
+        return {
+            "size": analysis["size"],
+            "box_size": analysis["box_size"],
+            "solvable": solution_count > 0,
+            "unique": solution_count == 1,
+            "solution": variant_to_matrix(solution) if solution else None,
+            "solution_string": encode_grid(solution) if solution else None,
+            "stats": analysis["stats"],
+            "message": message
+        }
+    
+    def generate_variant(self, size: int = 16, difficulty: str = "medium") -> Dict[str, Any]:
+        """
+        Generate an NxN puzzle
+        
+        Variant puzzles are generated on demand and not stored.
+        
+        Args:
+            size: Grid size (4, 9, 16 or 25)
+            difficulty: 'easy', 'medium' or 'hard'
+        
+        Returns:
+            Dict with puzzle and solution as matrices and grid strings
+        """
+        box_size = math.isqrt(size) if size > 0 else 0
+        if not box_size or box_size * box_size != size:
+            raise AppException(f"Unsupported grid size: {size}", status_code=400)
+        
+        try:
+            generated = SudokuVariantGenerator().generate(box_size, difficulty)
+        except ValueError as e:
+            raise AppException(str(e), status_code=400)
+        
+        return {
+            **generated,
+            "puzzle_grid": variant_to_matrix(decode_variant(generated["puzzle"])),
+            "solution_grid": variant_to_matrix(decode_variant(generated["solution"]))
+        }
+    
+    def check_grid(
+        self,
+        grid: List[List[int]],
+        solution_grid: Optional[List[List[int]]] = None,
+        puzzle_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Check a whole grid in one request
+        
+        Args:
+            grid: Current grid with user's progress
+            solution_grid: Optional solution grid
+            puzzle_id: Optional puzzle ID to look the solution up instead
+        
+        Returns:
+            Conflict cells, wrong cells (if a solution is known), empty
+            cells without candidates, and the candidate count per cell
+        """
+        if solution_grid is None and puzzle_id:
+            solution_grid = self.get_puzzle(puzzle_id=puzzle_id)["solution"]
+        
+        try:
+            result = sudoku_solver.check(grid, solution_grid)
+        except ValueError as e:
+            raise AppException(str(e), status_code=400)
+        
+        def positions(indices: List[int]) -> List[Dict[str, int]]:
+            return [
+                {"row": i // self.GRID_SIZE, "col": i % self.GRID_SIZE}
+                for i in indices
+            ]
+        
+        wrong = result["wrong"]
+        solved = (
+            result["filled"] == self.GRID_SIZE * self.GRID_SIZE
+            and not result["conflicts"]
+            and not wrong
+        )
+        
+        return {
+            "conflict_cells": positions(result["conflicts"]),
+            "wrong_cells": positions(wrong) if wrong is not None else None,
+            "dead_cells": positions(result["dead_ends"]),
+            "candidate_counts": to_matrix(result["candidates"]),
+            "filled": result["filled"],
+            "solved": solved,
+            "has_errors": bool(result["conflicts"] or wrong or result["dead_ends"])
         }
     
     def _is_complete(self, grid: List[List[int]]) -> bool:
@@ -269,28 +586,7 @@ class SudokuService:
     
     def _is_valid_solution(self, grid: List[List[int]]) -> bool:
         """Check if filled grid is a valid solution"""
-        # Check all rows
-        for row in grid:
-            if len(set(row)) != self.GRID_SIZE or min(row) < 1 or max(row) > 9:
-                return False
-        
-        # Check all columns
-        for col in range(self.GRID_SIZE):
-            column_values = [grid[row][col] for row in range(self.GRID_SIZE)]
-            if len(set(column_values)) != self.GRID_SIZE:
-                return False
-        
-        # Check all 3x3 boxes
-        for box_row in range(0, self.GRID_SIZE, self.BOX_SIZE):
-            for box_col in range(0, self.GRID_SIZE, self.BOX_SIZE):
-                box_values = []
-                for i in range(box_row, box_row + self.BOX_SIZE):
-                    for j in range(box_col, box_col + self.BOX_SIZE):
-                        box_values.append(grid[i][j])
-                if len(set(box_values)) != self.GRID_SIZE:
-                    return False
-        
-        return True
+        return sudoku_solver.is_valid_solution(grid)
     
     def save_score(
         self,
@@ -327,6 +623,16 @@ class SudokuService:
         
         final_score = max(100, int((base_score - time_penalty - hint_penalty) * multiplier))
         
+        game_data = {
+            "puzzle_id": puzzle_id,
+            "hints_used": hints_used,
+            "difficulty": difficulty
+        }
+        daily = sudoku_daily_challenge.is_daily_puzzle(puzzle_id, difficulty) if puzzle_id else None
+        if daily:
+            # Indexed key for the daily leaderboard
+            game_data["daily"] = daily
+        
         score_data = {
             "user_id": user_id,
             "game_type": "sudoku",
@@ -334,14 +640,12 @@ class SudokuService:
             "time_seconds": time_seconds,
             "moves": 0,  # Not tracked for Sudoku
             "completed": True,
-            "game_data": {
-                "puzzle_id": puzzle_id,
-                "hints_used": hints_used,
-                "difficulty": difficulty
-            }
+            "game_data": game_data
         }
         
         saved_score = self.game_score_repository.create(self.db, score_data)
+        if daily:
+            sudoku_daily_challenge.invalidate_leaderboard(daily, difficulty)
         
         return {
             "id": saved_score.id,
@@ -351,9 +655,38 @@ class SudokuService:
             "score": saved_score.score,
             "time_seconds": saved_score.time_seconds,
             "hints_used": hints_used,
+            "daily": daily,
             "created_at": saved_score.created_at.isoformat()
         }
     
+    def get_daily_challenge(self, difficulty: str = "medium") -> DailyPuzzle:
+        """
+        Get today's puzzle for a difficulty
+        
+        Served pre-rendered from the daily challenge cache. The solution is
+        not included so the daily leaderboard stays fair; use `/hint` or
+        `/session` to check progress.
+        
+        Returns:
+            DailyPuzzle with the rendered JSON body and its ETag
+        """
+        if difficulty not in DIFFICULTY_ORDER:
+            raise AppException(f"Invalid difficulty: {difficulty}", status_code=400)
+        
+        daily = sudoku_daily_challenge.get(difficulty)
+        if daily is None:
+            raise AppException(
+                f"No daily challenge available for difficulty: {difficulty}",
+                status_code=404
+            )
+        return daily
+    
+    def get_daily_leaderboard(self, difficulty: str = "medium", limit: int = 10) -> RenderedPayload:
+        """Get today's daily challenge leaderboard (rendered, short-lived cache)"""
+        if difficulty not in DIFFICULTY_ORDER:
+            raise AppException(f"Invalid difficulty: {difficulty}", status_code=400)
+        return sudoku_daily_challenge.leaderboard(self.db, difficulty, limit)
+    
     def get_leaderboard(
         self,
         difficulty: Optional[str] = None,
@@ -0,0 +1,221 @@
+"""
+Sudoku Play Sessions
+Server-side game state with O(1) move validation
+
+A session keeps row/column/box digit masks and a filled-cell count, so
+validating, placing and clearing a digit and detecting completion never
+rescan the grid. Conflicting placements are rejected, which keeps the masks
+exact: a full grid is therefore always a valid solution.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Sequence
+
+from app.core.config import settings
+from app.services.sudoku_solver import (
+    GRID_SIZE,
+    CELL_COUNT,
+    ROW_OF,
+    COL_OF,
+    BOX_OF,
+    flatten_grid,
+    to_matrix,
+)
+
+
+class SudokuSession:
+    """Mutable Sudoku board with incremental constraint masks"""
+
+    def __init__(
+        self,
+        session_id: str,
+        puzzle: Sequence,
+        puzzle_id: Optional[int] = None,
+        difficulty: Optional[str] = None
+    ):
+        cells = flatten_grid(puzzle)
+        self.session_id = session_id
+        self.puzzle_id = puzzle_id
+        self.difficulty = difficulty
+        self.cells = cells
+        self.givens = [value != 0 for value in cells]
+        self.rows = [0] * GRID_SIZE
+        self.cols = [0] * GRID_SIZE
+        self.boxes = [0] * GRID_SIZE
+        self.filled = 0
+        self.moves = 0
+        self.created_at = time.time()
+        self.last_active = self.created_at
+
+        for i, value in enumerate(cells):
+            if not value:
+                continue
+            if self._conflict(i, value):
+                raise ValueError("Puzzle has conflicting givens")
+            self._set(i, value)
+
+    # ---------- Constant-time operations ----------
+
+    def _conflict(self, index: int, value: int) -> Optional[str]:
+        bit = 1 << (value - 1)
+        if self.rows[ROW_OF[index]] & bit:
+            return "row"
+        if self.cols[COL_OF[index]] & bit:
+            return "column"
+        if self.boxes[BOX_OF[index]] & bit:
+            return "box"
+        return None
+
+    def _set(self, index: int, value: int) -> None:
+        bit = 1 << (value - 1)
+        self.cells[index] = value
+        self.rows[ROW_OF[index]] |= bit
+        self.cols[COL_OF[index]] |= bit
+        self.boxes[BOX_OF[index]] |= bit
+        self.filled += 1
+
+    def _unset(self, index: int) -> None:
+        bit = 1 << (self.cells[index] - 1)
+        self.cells[index] = 0
+        self.rows[ROW_OF[index]] &= ~bit
+        self.cols[COL_OF[index]] &= ~bit
+        self.boxes[BOX_OF[index]] &= ~bit
+        self.filled -= 1
+
+    @property
+    def complete(self) -> bool:
+        return self.filled == CELL_COUNT
+
+    def validate(self, row: int, col: int, value: int) -> Dict[str, Any]:
+        """Check a placement without applying it"""
+        if not (0 <= row < GRID_SIZE and 0 <= col < GRID_SIZE):
+            return {"valid": False, "error": "Position out of bounds"}
+        if not (1 <= value <= GRID_SIZE):
+            return {"valid": False, "error": "Value must be between 1 and 9"}
+
+        index = row * GRID_SIZE + col
+        if self.cells[index]:
+            return {"valid": False, "error": "Cell is already filled"}
+
+        conflict = self._conflict(index, value)
+        if conflict == "row":
+            return {"valid": False, "error": f"Number {value} already exists in row {row + 1}", "conflict": "row"}
+        if conflict == "column":
+            return {"valid": False, "error": f"Number {value} already exists in column {col + 1}", "conflict": "column"}
+        if conflict == "box":
+            return {"valid": False, "error": f"Number {value} already exists in 3x3 box", "conflict": "box"}
+
+        return {"valid": True, "message": "Valid move"}
+
+    def move(self, row: int, col: int, value: int) -> Dict[str, Any]:
+        """
+        Place a digit, or clear the cell when `value` is 0
+
+        Returns:
+            Dict with validation result, filled count and completion status
+        """
+        self.last_active = time.time()
+
+        if value == 0:
+            if not (0 <= row < GRID_SIZE and 0 <= col < GRID_SIZE):
+                return self._result({"valid": False, "error": "Position out of bounds"})
+            index = row * GRID_SIZE + col
+            if self.givens[index]:
+                return self._result({"valid": False, "error": "Cannot clear a given cell"})
+            if self.cells[index]:
+                self._unset(index)
+                self.moves += 1
+            return self._result({"valid": True, "message": "Cell cleared"})
+
+        validation = self.validate(row, col, value)
+        if not validation["valid"]:
+            return self._result(validation)
+
+        self._set(row * GRID_SIZE + col, value)
+        self.moves += 1
+        return self._result({"valid": True, "message": "Move accepted"})
+
+    def _result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        complete = self.complete
+        return {
+            **result,
+            "session_id": self.session_id,
+            "filled": self.filled,
+            "complete": complete,
+            # Conflicts are never placed, so a full grid is a solution
+            "solved": complete,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "puzzle_id": self.puzzle_id,
+            "difficulty": self.difficulty,
+            "grid": to_matrix(self.cells),
+            "givens": to_matrix([1 if g else 0 for g in self.givens]),
+            "filled": self.filled,
+            "moves": self.moves,
+            "complete": self.complete,
+        }
+
+
+class SudokuSessionStore:
+    """
+    In-process session store with idle expiry and LRU eviction
+
+    Sessions live in the worker that created them, like the RateLimiter
+    state in `core/dependencies.py`: under several uvicorn workers a
+    session is only found again with sticky routing (see README).
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = settings.SUDOKU_SESSION_MAX,
+        ttl_seconds: int = settings.SUDOKU_SESSION_TTL
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, SudokuSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(
+        self,
+        puzzle: Sequence,
+        puzzle_id: Optional[int] = None,
+        difficulty: Optional[str] = None
+    ) -> SudokuSession:
+        session = SudokuSession(secrets.token_urlsafe(16), puzzle, puzzle_id, difficulty)
+        with self._lock:
+            self._evict()
+            self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[SudokuSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.time() - session.last_active > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self) -> None:
+        """Drop expired sessions from the LRU end, then the oldest if full"""
+        now = time.time()
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_active > self.ttl_seconds or len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            else:
+                break
+
+
+sudoku_session_store = SudokuSessionStore()
@@ -0,0 +1,353 @@
+"""
+Sudoku Solver Engine
+Bitmask constraint propagation with MRV branching
+
+Digits are stored as bits 0-8 of an int. Each row, column and box keeps a
+mask of the digits already placed, so the candidates of a cell are
+``ALL_DIGITS & ~(row | col | box)`` and placing a digit is three ORs.
+Propagation applies naked singles and hidden singles until nothing changes,
+then the search branches on the empty cell with the fewest candidates.
+"""
+from typing import List, Dict, Any, Optional, Sequence
+
+
+GRID_SIZE = 9
+BOX_SIZE = 3
+CELL_COUNT = GRID_SIZE * GRID_SIZE
+ALL_DIGITS = (1 << GRID_SIZE) - 1
+
+# Cell index -> row / column / box index
+ROW_OF = [i // GRID_SIZE for i in range(CELL_COUNT)]
+COL_OF = [i % GRID_SIZE for i in range(CELL_COUNT)]
+BOX_OF = [
+    (i // GRID_SIZE // BOX_SIZE) * BOX_SIZE + (i % GRID_SIZE) // BOX_SIZE
+    for i in range(CELL_COUNT)
+]
+
+# 27 units: 9 rows, 9 columns, 9 boxes (lists of cell indices)
+ROW_UNITS = [[r * GRID_SIZE + c for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
+COL_UNITS = [[r * GRID_SIZE + c for r in range(GRID_SIZE)] for c in range(GRID_SIZE)]
+BOX_UNITS = [[i for i in range(CELL_COUNT) if BOX_OF[i] == b] for b in range(GRID_SIZE)]
+UNITS = ROW_UNITS + COL_UNITS + BOX_UNITS
+
+# Lookup tables over 9-bit masks
+POPCOUNT = [bin(m).count("1") for m in range(ALL_DIGITS + 1)]
+BIT_TO_DIGIT = {1 << d: d + 1 for d in range(GRID_SIZE)}
+
+
+def flatten_grid(grid: Sequence) -> List[int]:
+    """
+    Convert a 9x9 matrix, a flat list of 81 ints or an 81-char string
+    into a flat list of 81 ints (0 = empty)
+    """
+    if isinstance(grid, str):
+        if len(grid) != CELL_COUNT:
+            raise ValueError(f"Invalid grid string length: {len(grid)}")
+        return [int(ch) if ch.isdigit() else 0 for ch in grid]
+
+    if len(grid) == GRID_SIZE and all(isinstance(row, (list, tuple)) for row in grid):
+        if any(len(row) != GRID_SIZE for row in grid):
+            raise ValueError("Grid must be 9x9")
+        return [int(v) for row in grid for v in row]
+
+    if len(grid) == CELL_COUNT:
+        return [int(v) for v in grid]
+
+    raise ValueError("Grid must be 9x9, 81 values or an 81-character string")
+
+
+def to_matrix(cells: Sequence[int]) -> List[List[int]]:
+    """Convert 81 flat cells to a 9x9 matrix"""
+    return [list(cells[r * GRID_SIZE:(r + 1) * GRID_SIZE]) for r in range(GRID_SIZE)]
+
+
+def to_string(cells: Sequence[int]) -> str:
+    """Convert 81 flat cells to an 81-character string (0 = empty)"""
+    return "".join(str(v) for v in cells)
+
+
+class SudokuSolver:
+    """Bitmask constraint-propagation solver for 9x9 Sudoku"""
+
+    def solve(self, grid: Sequence) -> Optional[List[List[int]]]:
+        """
+        Solve a puzzle
+
+        Args:
+            grid: 9x9 matrix, 81 flat values or 81-char string (0 = empty)
+
+        Returns:
+            Solved 9x9 grid, or None if the puzzle has no solution
+        """
+        solutions = self._run(flatten_grid(grid), limit=1)["solutions"]
+        return to_matrix(solutions[0]) if solutions else None
+
+    def count_solutions(self, grid: Sequence, limit: int = 2) -> int:
+        """
+        Count solutions, stopping once `limit` is reached
+
+        `limit=2` is enough to tell "no solution", "unique" and "multiple"
+        apart without enumerating everything.
+        """
+        return len(self._run(flatten_grid(grid), limit=limit)["solutions"])
+
+    def has_unique_solution(self, grid: Sequence) -> bool:
+        """Check if the puzzle has exactly one solution"""
+        return self.count_solutions(grid, limit=2) == 1
+
+    def analyze(self, grid: Sequence, limit: int = 2) -> Dict[str, Any]:
+        """
+        Solve and report how the solution was reached
+
+        Returns:
+            Dict with `solution` (flat cells or None), `solution_count`
+            (capped at `limit`), and `stats` counting naked singles, hidden
+            singles and guesses (branch points) used by the search
+        """
+        result = self._run(flatten_grid(grid), limit=limit)
+        solutions = result["solutions"]
+        return {
+            "solution": solutions[0] if solutions else None,
+            "solution_count": len(solutions),
+            "stats": result["stats"],
+        }
+
+    def check(self, grid: Sequence, solution: Optional[Sequence] = None) -> Dict[str, Any]:
+        """
+        Diff a grid in progress against the constraints and the solution
+
+        One pass per unit keeps a `once` and a `twice` digit mask; any
+        filled cell whose digit is in its unit's `twice` mask conflicts.
+        Candidate counts come from the row/column/box masks of the filled
+        cells.
+
+        Args:
+            grid: Current grid (0 = empty)
+            solution: Optional solution; enables wrong-cell detection
+
+        Returns:
+            Dict with flat cell indices: `conflicts`, `wrong` (None without
+            a solution) and `dead_ends` (empty cells with no candidate),
+            plus per-cell `candidates` counts (0 for filled cells) and
+            `filled`
+        """
+        cells = flatten_grid(grid)
+
+        conflict_mask = [0] * CELL_COUNT
+        for unit in UNITS:
+            once = 0
+            twice = 0
+            for i in unit:
+                if cells[i]:
+                    bit = 1 << (cells[i] - 1)
+                    twice |= once & bit
+                    once |= bit
+            if twice:
+                for i in unit:
+                    if cells[i] and (1 << (cells[i] - 1)) & twice:
+                        conflict_mask[i] = 1
+
+        rows = [0] * GRID_SIZE
+        cols = [0] * GRID_SIZE
+        boxes = [0] * GRID_SIZE
+        for i, value in enumerate(cells):
+            if value:
+                bit = 1 << (value - 1)
+                rows[ROW_OF[i]] |= bit
+                cols[COL_OF[i]] |= bit
+                boxes[BOX_OF[i]] |= bit
+
+        candidates = [
+            0 if value else
+            POPCOUNT[ALL_DIGITS & ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])]
+            for i, value in enumerate(cells)
+        ]
+
+        wrong = None
+        if solution is not None:
+            expected = flatten_grid(solution)
+            wrong = [i for i, value in enumerate(cells) if value and value != expected[i]]
+
+        return {
+            "conflicts": [i for i in range(CELL_COUNT) if conflict_mask[i]],
+            "wrong": wrong,
+            "dead_ends": [i for i, value in enumerate(cells) if not value and not candidates[i]],
+            "candidates": candidates,
+            "filled": CELL_COUNT - cells.count(0),
+        }
+
+    def is_valid_solution(self, grid: Sequence) -> bool:
+        """Check that a filled grid satisfies every row, column and box"""
+        cells = flatten_grid(grid)
+        rows = [0] * GRID_SIZE
+        cols = [0] * GRID_SIZE
+        boxes = [0] * GRID_SIZE
+        for i, value in enumerate(cells):
+            if not 1 <= value <= GRID_SIZE:
+                return False
+            bit = 1 << (value - 1)
+            r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return False
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+        return True
+
+    # ---------- Search ----------
+
+    def _run(self, cells: List[int], limit: int) -> Dict[str, Any]:
+        """Set up masks for the givens and run the search"""
+        stats = {"naked_singles": 0, "hidden_singles": 0, "guesses": 0}
+        solutions: List[List[int]] = []
+
+        rows = [0] * GRID_SIZE
+        cols = [0] * GRID_SIZE
+        boxes = [0] * GRID_SIZE
+        for i, value in enumerate(cells):
+            if value == 0:
+                continue
+            if not 1 <= value <= GRID_SIZE:
+                return {"solutions": solutions, "stats": stats}
+            bit = 1 << (value - 1)
+            r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                # Conflicting givens
+                return {"solutions": solutions, "stats": stats}
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+        self._search(cells, rows, cols, boxes, limit, solutions, stats)
+        return {"solutions": solutions, "stats": stats}
+
+    def _search(
+        self,
+        cells: List[int],
+        rows: List[int],
+        cols: List[int],
+        boxes: List[int],
+        limit: int,
+        solutions: List[List[int]],
+        stats: Dict[str, int]
+    ) -> None:
+        """Depth-first search; mutates its arguments, callers pass copies"""
+        if not self._propagate(cells, rows, cols, boxes, stats):
+            return
+
+        # MRV: branch on the empty cell with the fewest candidates
+        best_cell = -1
+        best_mask = 0
+        best_count = GRID_SIZE + 1
+        for i in range(CELL_COUNT):
+            if cells[i]:
+                continue
+            mask = ALL_DIGITS & ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])
+            count = POPCOUNT[mask]
+            if count < best_count:
+                best_cell, best_mask, best_count = i, mask, count
+                if count == 2:
+                    break
+
+        if best_cell < 0:
+            solutions.append(cells)
+            return
+
+        stats["guesses"] += 1
+        r, c, b = ROW_OF[best_cell], COL_OF[best_cell], BOX_OF[best_cell]
+        mask = best_mask
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+
+            next_cells = cells[:]
+            next_rows = rows[:]
+            next_cols = cols[:]
+            next_boxes = boxes[:]
+            next_cells[best_cell] = BIT_TO_DIGIT[bit]
+            next_rows[r] |= bit
+            next_cols[c] |= bit
+            next_boxes[b] |= bit
+
+            self._search(next_cells, next_rows, next_cols, next_boxes, limit, solutions, stats)
+            if len(solutions) >= limit:
+                return
+
+    def _propagate(
+        self,
+        cells: List[int],
+        rows: List[int],
+        cols: List[int],
+        boxes: List[int],
+        stats: Dict[str, int]
+    ) -> bool:
+        """
+        Apply naked and hidden singles until a fixpoint
+
+        Returns:
+            False if a contradiction was found
+        """
+        changed = True
+        while changed:
+            changed = False
+
+            # Naked singles: a cell with exactly one candidate
+            for i in range(CELL_COUNT):
+                if cells[i]:
+                    continue
+                r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+                mask = ALL_DIGITS & ~(rows[r] | cols[c] | boxes[b])
+                if not mask:
+                    return False
+                if mask & (mask - 1) == 0:
+                    cells[i] = BIT_TO_DIGIT[mask]
+                    rows[r] |= mask
+                    cols[c] |= mask
+                    boxes[b] |= mask
+                    stats["naked_singles"] += 1
+                    changed = True
+
+            # Hidden singles: a digit with exactly one place in a unit
+            for unit in UNITS:
+                once = 0
+                twice = 0
+                placed = 0
+                for i in unit:
+                    value = cells[i]
+                    if value:
+                        placed |= 1 << (value - 1)
+                        continue
+                    mask = ALL_DIGITS & ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])
+                    twice |= once & mask
+                    once |= mask
+
+                if (once | placed) != ALL_DIGITS:
+                    # Some digit has nowhere to go in this unit
+                    return False
+
+                hidden = once & ~twice
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for i in unit:
+                        if cells[i]:
+                            continue
+                        r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+                        used = rows[r] | cols[c] | boxes[b]
+                        if (ALL_DIGITS & ~used) & bit:
+                            cells[i] = BIT_TO_DIGIT[bit]
+                            rows[r] |= bit
+                            cols[c] |= bit
+                            boxes[b] |= bit
+                            stats["hidden_singles"] += 1
+                            changed = True
+                            break
+                    else:
+                        # Its only cell was taken by another hidden single
+                        return False
+
+        return True
+
+
+# Shared stateless instance
+sudoku_solver = SudokuSolver()
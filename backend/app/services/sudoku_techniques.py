@@ -0,0 +1,510 @@
+"""
+Sudoku Logic Techniques
+Human-style deduction steps over an incremental candidate grid
+
+Each cell holds a 9-bit candidate mask. Placing a digit clears that bit from
+the 20 peers only, so the grid is updated incrementally rather than
+recomputed. Techniques are tried from easiest to hardest; the first one that
+makes progress is returned as a step.
+"""
+from itertools import combinations
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from app.services.sudoku_solver import (
+    GRID_SIZE,
+    CELL_COUNT,
+    ALL_DIGITS,
+    ROW_OF,
+    COL_OF,
+    BOX_OF,
+    ROW_UNITS,
+    COL_UNITS,
+    BOX_UNITS,
+    UNITS,
+    POPCOUNT,
+    BIT_TO_DIGIT,
+    flatten_grid,
+)
+
+
+PEERS = [
+    sorted(
+        {j for unit in (ROW_UNITS[ROW_OF[i]], COL_UNITS[COL_OF[i]], BOX_UNITS[BOX_OF[i]])
+         for j in unit} - {i}
+    )
+    for i in range(CELL_COUNT)
+]
+
+UNIT_NAMES = ["row"] * GRID_SIZE + ["column"] * GRID_SIZE + ["box"] * GRID_SIZE
+
+# Difficulty tier of each technique
+EASY = "easy"
+MEDIUM = "medium"
+HARD = "hard"
+DIFFICULTY_ORDER = [EASY, MEDIUM, HARD]
+
+TECHNIQUE_LEVELS = {
+    "naked_single": EASY,
+    "hidden_single": EASY,
+    "pointing": MEDIUM,
+    "claiming": MEDIUM,
+    "naked_pair": MEDIUM,
+    "hidden_pair": MEDIUM,
+    "naked_triple": MEDIUM,
+    "x_wing": HARD,
+    "swordfish": HARD,
+}
+
+TECHNIQUE_LABELS = {
+    "naked_single": "Naked single",
+    "hidden_single": "Hidden single",
+    "pointing": "Pointing",
+    "claiming": "Box/line reduction",
+    "naked_pair": "Naked pair",
+    "hidden_pair": "Hidden pair",
+    "naked_triple": "Naked triple",
+    "x_wing": "X-Wing",
+    "swordfish": "Swordfish",
+}
+
+
+def mask_to_digits(mask: int) -> List[int]:
+    """Expand a candidate mask into a sorted digit list"""
+    return [d + 1 for d in range(GRID_SIZE) if mask >> d & 1]
+
+
+def cell_position(index: int) -> Dict[str, int]:
+    """Row/column of a flat cell index"""
+    return {"row": ROW_OF[index], "col": COL_OF[index]}
+
+
+class CandidateGrid:
+    """81 cell values plus 81 candidate masks, updated incrementally"""
+
+    def __init__(self, cells: List[int], candidates: List[int]):
+        self.cells = cells
+        self.candidates = candidates
+
+    @classmethod
+    def from_grid(cls, grid: Sequence) -> Optional["CandidateGrid"]:
+        """
+        Build the candidate grid for a puzzle
+
+        Returns:
+            None if the givens conflict with each other
+        """
+        cells = flatten_grid(grid)
+        rows = [0] * GRID_SIZE
+        cols = [0] * GRID_SIZE
+        boxes = [0] * GRID_SIZE
+        for i, value in enumerate(cells):
+            if not value:
+                continue
+            if not 1 <= value <= GRID_SIZE:
+                return None
+            bit = 1 << (value - 1)
+            r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return None
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+        candidates = [
+            0 if cells[i] else ALL_DIGITS & ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])
+            for i in range(CELL_COUNT)
+        ]
+        return cls(cells, candidates)
+
+    def copy(self) -> "CandidateGrid":
+        return CandidateGrid(self.cells[:], self.candidates[:])
+
+    def is_solved(self) -> bool:
+        return all(self.cells)
+
+    def place(self, index: int, digit: int) -> None:
+        """Place a digit and remove it from the candidates of its peers"""
+        bit = 1 << (digit - 1)
+        self.cells[index] = digit
+        self.candidates[index] = 0
+        candidates = self.candidates
+        for peer in PEERS[index]:
+            candidates[peer] &= ~bit
+
+    def eliminate(self, index: int, mask: int) -> None:
+        self.candidates[index] &= ~mask
+
+    def apply(self, step: Dict[str, Any]) -> None:
+        """Apply the placements and eliminations of a step"""
+        for placement in step["placements"]:
+            self.place(placement["index"], placement["value"])
+        for elimination in step["eliminations"]:
+            self.eliminate(elimination["index"], elimination["mask"])
+
+
+class SudokuTechniqueEngine:
+    """Finds the easiest applicable human deduction for a candidate grid"""
+
+    def __init__(self):
+        self.techniques = [
+            ("naked_single", self._naked_single),
+            ("hidden_single", self._hidden_single),
+            ("pointing", self._pointing),
+            ("claiming", self._claiming),
+            ("naked_pair", self._naked_pair),
+            ("hidden_pair", self._hidden_pair),
+            ("naked_triple", self._naked_triple),
+            ("x_wing", lambda grid: self._fish(grid, 2)),
+            ("swordfish", lambda grid: self._fish(grid, 3)),
+        ]
+
+    def find_step(self, grid: CandidateGrid) -> Optional[Dict[str, Any]]:
+        """
+        Find the easiest technique that makes progress
+
+        Returns:
+            Step dict with `technique`, `level`, `cells`, `digits`,
+            `placements` and `eliminations`, or None if stuck
+        """
+        for name, technique in self.techniques:
+            step = technique(grid)
+            if step is not None:
+                step["technique"] = name
+                step["level"] = TECHNIQUE_LEVELS[name]
+                return step
+        return None
+
+    def next_placement(
+        self,
+        grid: CandidateGrid,
+        max_steps: int = 50
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the next digit placement, applying elimination steps on the way
+
+        Clients only send placed digits, not pencil marks, so an
+        elimination-only step on its own would be suggested again on the next
+        request. Instead the eliminations are applied to `grid` until a
+        placement appears, and returned as its supporting steps.
+
+        Returns:
+            Dict with `step` (the placement step) and `supporting` (the
+            elimination steps before it), or None if logic gets stuck
+        """
+        supporting = []
+        for _ in range(max_steps):
+            step = self.find_step(grid)
+            if step is None:
+                return None
+            if step["placements"]:
+                return {"step": step, "supporting": supporting}
+            grid.apply(step)
+            supporting.append(step)
+        return None
+
+    def grade(self, puzzle: Sequence) -> Dict[str, Any]:
+        """
+        Grade a puzzle by the hardest technique needed to solve it
+
+        Puzzles that logic alone cannot finish are graded hard.
+
+        Returns:
+            Dict with `difficulty`, `solved_by_logic`, `steps` and the
+            per-technique usage counts
+        """
+        grid = CandidateGrid.from_grid(puzzle)
+        if grid is None:
+            return {"difficulty": None, "solved_by_logic": False, "steps": 0, "techniques": {}}
+
+        hardest = 0
+        steps = 0
+        used: Dict[str, int] = {}
+        while not grid.is_solved():
+            step = self.find_step(grid)
+            if step is None:
+                return {
+                    "difficulty": HARD,
+                    "solved_by_logic": False,
+                    "steps": steps,
+                    "techniques": used,
+                }
+            grid.apply(step)
+            steps += 1
+            used[step["technique"]] = used.get(step["technique"], 0) + 1
+            hardest = max(hardest, DIFFICULTY_ORDER.index(step["level"]))
+
+        return {
+            "difficulty": DIFFICULTY_ORDER[hardest],
+            "solved_by_logic": True,
+            "steps": steps,
+            "techniques": used,
+        }
+
+    # ---------- Techniques ----------
+
+    @staticmethod
+    def _step(
+        cells: List[int],
+        digits: List[int],
+        placements: Optional[List[Tuple[int, int]]] = None,
+        eliminations: Optional[List[Tuple[int, int]]] = None,
+        unit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        step = {
+            "cells": cells,
+            "digits": digits,
+            "placements": [
+                {"index": i, "value": v} for i, v in (placements or [])
+            ],
+            "eliminations": [
+                {"index": i, "mask": m} for i, m in (eliminations or [])
+            ],
+        }
+        if unit is not None:
+            step["unit"] = {"type": UNIT_NAMES[unit], "index": unit % GRID_SIZE}
+        return step
+
+    def _naked_single(self, grid: CandidateGrid) -> Optional[Dict[str, Any]]:
+        """A cell with a single candidate"""
+        cells, candidates = grid.cells, grid.candidates
+        for i in range(CELL_COUNT):
+            mask = candidates[i]
+            if not cells[i] and mask and mask & (mask - 1) == 0:
+                digit = BIT_TO_DIGIT[mask]
+                return self._step([i], [digit], placements=[(i, digit)])
+        return None
+
+    def _hidden_single(self, grid: CandidateGrid) -> Optional[Dict[str, Any]]:
+        """A digit with a single possible cell in a unit"""
+        candidates = grid.candidates
+        for u, unit in enumerate(UNITS):
+            once = 0
+            twice = 0
+            for i in unit:
+                mask = candidates[i]
+                twice |= once & mask
+                once |= mask
+            hidden = once & ~twice
+            if hidden:
+                bit = hidden & -hidden
+                digit = BIT_TO_DIGIT[bit]
+                for i in unit:
+                    if candidates[i] & bit:
+                        return self._step([i], [digit], placements=[(i, digit)], unit=u)
+        return None
+
+    def _pointing(self, grid: CandidateGrid) -> Optional[Dict[str, Any]]:
+        """
+        Locked candidates (pointing): a digit confined to one row or column
+        inside a box is removed from the rest of that row or column
+        """
+        candidates = grid.candidates
+        for b, box in enumerate(BOX_UNITS):
+            for d in range(GRID_SIZE):
+                bit = 1 << d
+                spots = [i for i in box if candidates[i] & bit]
+                if len(spots) < 2:
+                    continue
+                for line_of, line_units, offset in (
+                    (ROW_OF, ROW_UNITS, 0),
+                    (COL_OF, COL_UNITS, GRID_SIZE),
+                ):
+                    line = line_of[spots[0]]
+                    if any(line_of[i] != line for i in spots):
+                        continue
+                    eliminations = [
+                        (i, bit) for i in line_units[line]
+                        if BOX_OF[i] != b and candidates[i] & bit
+                    ]
+                    if eliminations:
+                        return self._step(
+                            spots, [d + 1], eliminations=eliminations, unit=offset + line
+                        )
+        return None
+
+    def _claiming(self, grid: CandidateGrid) -> Optional[Dict[str, Any]]:
+        """
+        Box/line reduction: a digit confined to one box inside a row or
+        column is removed from the rest of that box
+        """
+        candidates = grid.candidates
+        for u, line in enumerate(ROW_UNITS + COL_UNITS):
+            for d in range(GRID_SIZE):
+                bit = 1 << d
+                spots = [i for i in line if candidates[i] & bit]
+                if len(spots) < 2:
+                    continue
+                box = BOX_OF[spots[0]]
+                if any(BOX_OF[i] != box for i in spots):
+                    continue
+                eliminations = [
+                    (i, bit) for i in BOX_UNITS[box]
+                    if i not in spots and candidates[i] & bit
+                ]
+                if eliminations:
+                    return self._step(spots, [d + 1], eliminations=eliminations, unit=u)
+        return None
+
+    def _naked_pair(self, grid: CandidateGrid) -> Optional[Dict[str, Any]]:
+        """Two cells in a unit sharing the same two candidates"""
+        candidates = grid.candidates
+        for u, unit in enumerate(UNITS):
+            pairs = [i for i in unit if POPCOUNT[candidates[i]] == 2]
+            for a in range(len(pairs)):
+                mask = candidates[pairs[a]]
+                for b in range(a + 1, len(pairs)):
+                    if candidates[pairs[b]] != mask:
+                        continue
+                    eliminations = [
+                        (i, candidates[i] & mask) for i in unit
+                        if i != pairs[a] and i != pairs[b] and candidates[i] & mask
+                    ]
+                    if eliminations:
+                        return self._step(
+                            [pairs[a], pairs[b]], mask_to_digits(mask),
+                            eliminations=eliminations, unit=u
+                        )
+        return None
+
+    def _hidden_pair(self, grid: CandidateGrid) -> Optional[Dict[str, Any]]:
+        """Two digits confined to the same two cells of a unit"""
+        candidates = grid.candidates
+        for u, unit in enumerate(UNITS):
+            # positions[d]: bitmask of unit slots where digit d can go
+            positions = [0] * GRID_SIZE
+            for slot, i in enumerate(unit):
+                mask = candidates[i]
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    positions[BIT_TO_DIGIT[bit] - 1] |= 1 << slot
+            for d1 in range(GRID_SIZE):
+                if POPCOUNT[positions[d1]] != 2:
+                    continue
+                for d2 in range(d1 + 1, GRID_SIZE):
+                    if positions[d2] != positions[d1]:
+                        continue
+                    pair_mask = (1 << d1) | (1 << d2)
+                    cells = [unit[s] for s in range(GRID_SIZE) if positions[d1] >> s & 1]
+                    eliminations = [
+                        (i, candidates[i] & ~pair_mask) for i in cells
+                        if candidates[i] & ~pair_mask
+                    ]
+                    if eliminations:
+                        return self._step(
+                            cells, [d1 + 1, d2 + 1], eliminations=eliminations, unit=u
+                        )
+        return None
+
+    def _naked_triple(self, grid: CandidateGrid) -> Optional[Dict[str, Any]]:
+        """Three cells in a unit whose candidates together are three digits"""
+        candidates = grid.candidates
+        for u, unit in enumerate(UNITS):
+            small = [i for i in unit if 2 <= POPCOUNT[candidates[i]] <= 3]
+            for triple in combinations(small, 3):
+                mask = candidates[triple[0]] | candidates[triple[1]] | candidates[triple[2]]
+                if POPCOUNT[mask] != 3:
+                    continue
+                eliminations = [
+                    (i, candidates[i] & mask) for i in unit
+                    if i not in triple and candidates[i] & mask
+                ]
+                if eliminations:
+                    return self._step(
+                        list(triple), mask_to_digits(mask),
+                        eliminations=eliminations, unit=u
+                    )
+        return None
+
+    def _fish(self, grid: CandidateGrid, size: int) -> Optional[Dict[str, Any]]:
+        """
+        X-Wing (size 2) / Swordfish (size 3): a digit confined to the same
+        `size` columns across `size` rows (or vice versa) is removed from
+        those columns in every other row
+        """
+        candidates = grid.candidates
+        for base_units, cover_units in ((ROW_UNITS, COL_UNITS), (COL_UNITS, ROW_UNITS)):
+            for d in range(GRID_SIZE):
+                bit = 1 << d
+                # For each base line: bitmask of cover lines holding the digit
+                lines = []
+                for b, unit in enumerate(base_units):
+                    spread = 0
+                    for slot, i in enumerate(unit):
+                        if candidates[i] & bit:
+                            spread |= 1 << slot
+                    if 2 <= POPCOUNT[spread] <= size:
+                        lines.append((b, spread))
+                for fish in combinations(lines, size):
+                    cover = 0
+                    for _, spread in fish:
+                        cover |= spread
+                    if POPCOUNT[cover] != size:
+                        continue
+                    base_set = {b for b, _ in fish}
+                    eliminations = []
+                    for c in range(GRID_SIZE):
+                        if not cover >> c & 1:
+                            continue
+                        for slot, i in enumerate(cover_units[c]):
+                            if slot not in base_set and candidates[i] & bit:
+                                eliminations.append((i, bit))
+                    if eliminations:
+                        cells = [
+                            base_units[b][c] for b, _ in fish for c in range(GRID_SIZE)
+                            if cover >> c & 1 and candidates[base_units[b][c]] & bit
+                        ]
+                        return self._step(cells, [d + 1], eliminations=eliminations)
+        return None
+
+
+def step_to_hint(step: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert an engine step into a client-facing hint
+
+    Returns:
+        Dict with `technique`, `level`, `cells`, `digits`, `placements`,
+        `eliminations` (row/col/digits) and a human-readable `message`
+    """
+    label = TECHNIQUE_LABELS[step["technique"]]
+    placements = [
+        {**cell_position(p["index"]), "value": p["value"]}
+        for p in step["placements"]
+    ]
+    eliminations = [
+        {**cell_position(e["index"]), "digits": mask_to_digits(e["mask"])}
+        for e in step["eliminations"]
+    ]
+    cells = [cell_position(i) for i in step["cells"]]
+    digits = ", ".join(str(d) for d in step["digits"])
+
+    if placements:
+        p = placements[0]
+        where = f" in {step['unit']['type']} {step['unit']['index'] + 1}" if "unit" in step else ""
+        message = (
+            f"{label}: {p['value']} is the only option{where} "
+            f"for row {p['row'] + 1}, column {p['col'] + 1}"
+        )
+    else:
+        message = (
+            f"{label} on {digits}: remove candidates from "
+            f"{len(eliminations)} cell{'s' if len(eliminations) != 1 else ''}"
+        )
+
+    hint = {
+        "technique": step["technique"],
+        "technique_name": label,
+        "level": step["level"],
+        "cells": cells,
+        "digits": step["digits"],
+        "placements": placements,
+        "eliminations": eliminations,
+        "message": message,
+    }
+    if "unit" in step:
+        hint["unit"] = step["unit"]
+    return hint
+
+
+# Shared stateless instance
+sudoku_technique_engine = SudokuTechniqueEngine()
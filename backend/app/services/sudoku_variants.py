@@ -0,0 +1,304 @@
+"""
+Sudoku Variants
+NxN Sudoku (4x4, 9x9, 16x16, 25x25) as exact cover with Dancing Links
+
+A grid with box size b has n = b*b symbols and four families of n*n
+constraint columns: cell filled, row/digit, column/digit, box/digit. Only
+candidate rows consistent with the givens are added and the givens'
+columns are covered up front, so the matrix shrinks with every clue.
+
+Grids with more than 9 symbols are written as strings over SYMBOLS
+(1-9 then A-P), with '0' or '.' for empty cells, so 9x9 strings keep the
+format used by `sudoku_puzzles`.
+"""
+import random
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from app.services.sudoku_dlx import DancingLinks
+
+
+SUPPORTED_BOX_SIZES = (2, 3, 4, 5)
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+EMPTY_SYMBOLS = "0."
+
+_SYMBOL_VALUES = {ch: i + 1 for i, ch in enumerate(SYMBOLS)}
+_SYMBOL_VALUES.update({ch.lower(): v for ch, v in _SYMBOL_VALUES.items() if ch.isalpha()})
+_BOX_SIZE_BY_CELLS = {(b * b) ** 2: b for b in SUPPORTED_BOX_SIZES}
+
+# Share of cells kept as clues per difficulty. Large grids need a higher
+# share than 9x9 to keep uniqueness checks fast during generation.
+VARIANT_CLUE_RATIOS = {
+    "easy": 0.55,
+    "medium": 0.48,
+    "hard": 0.42,
+}
+
+# Branch points a uniqueness check may spend while digging; a removal whose
+# uniqueness is not proven within budget is undone
+DIG_GUESS_BUDGET = 20
+
+
+# ---------- Grid encoding ----------
+
+def box_size_for(cell_count: int) -> int:
+    """Box size of a grid with `cell_count` cells"""
+    box_size = _BOX_SIZE_BY_CELLS.get(cell_count)
+    if box_size is None:
+        raise ValueError(f"Unsupported grid with {cell_count} cells")
+    return box_size
+
+
+def encode_grid(cells: Sequence[int]) -> str:
+    """Encode flat cells as a string ('0' = empty, 10+ as letters)"""
+    box_size_for(len(cells))
+    return "".join(SYMBOLS[v - 1] if v else "0" for v in cells)
+
+
+def decode_grid(text: str) -> List[int]:
+    """Decode a grid string into flat cells (0 = empty)"""
+    size = box_size_for(len(text)) ** 2
+    cells = []
+    for ch in text:
+        if ch in EMPTY_SYMBOLS:
+            cells.append(0)
+            continue
+        value = _SYMBOL_VALUES.get(ch)
+        if value is None or value > size:
+            raise ValueError(f"Invalid symbol {ch!r} for a {size}x{size} grid")
+        cells.append(value)
+    return cells
+
+
+def parse_grid(grid: Any) -> Tuple[List[int], int]:
+    """
+    Parse an NxN matrix, a flat list or a grid string
+
+    Returns:
+        (flat cells, box size)
+    """
+    if isinstance(grid, str):
+        cells = decode_grid(grid)
+    elif grid and all(isinstance(row, (list, tuple)) for row in grid):
+        if any(len(row) != len(grid) for row in grid):
+            raise ValueError("Grid must be square")
+        cells = [int(v) for row in grid for v in row]
+    else:
+        cells = [int(v) for v in grid]
+
+    box_size = box_size_for(len(cells))
+    size = box_size * box_size
+    if any(not 0 <= v <= size for v in cells):
+        raise ValueError(f"Values must be between 0 and {size}")
+    return cells, box_size
+
+
+def to_matrix(cells: Sequence[int]) -> List[List[int]]:
+    """Convert flat cells to an NxN matrix"""
+    size = box_size_for(len(cells)) ** 2
+    return [list(cells[r * size:(r + 1) * size]) for r in range(size)]
+
+
+# ---------- Solver ----------
+
+class SudokuVariantSolver:
+    """Exact-cover solver for any supported box size"""
+
+    def analyze(
+        self,
+        grid: Any,
+        limit: int = 2,
+        max_guesses: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Solve and count solutions up to `limit`
+
+        Args:
+            grid: NxN matrix, flat cells or grid string (0 = empty)
+            limit: Stop after this many solutions
+            max_guesses: Optional search budget (branch points)
+
+        Returns:
+            Dict with `box_size`, `size`, `solution` (flat cells or None),
+            `solution_count` (capped at `limit`), `complete` (False if the
+            budget ran out, so the count is only a lower bound) and `stats`
+        """
+        cells, box_size = parse_grid(grid)
+        size = box_size * box_size
+        result = {
+            "box_size": box_size,
+            "size": size,
+            "solution": None,
+            "solution_count": 0,
+            "complete": True,
+            "stats": {"guesses": 0},
+        }
+
+        matrix = self._build(cells, box_size)
+        if matrix is None:
+            return result
+
+        search = matrix.search(limit=limit, max_guesses=max_guesses)
+        solutions = search["solutions"]
+        if solutions:
+            solution = cells[:]
+            for row_id in solutions[0]:
+                solution[row_id // size] = row_id % size + 1
+            result["solution"] = solution
+        result["solution_count"] = len(solutions)
+        result["complete"] = search["complete"]
+        result["stats"] = search["stats"]
+        return result
+
+    def solve(self, grid: Any) -> Optional[List[int]]:
+        """Solve a puzzle; returns flat cells or None"""
+        return self.analyze(grid, limit=1)["solution"]
+
+    def count_solutions(self, grid: Any, limit: int = 2) -> int:
+        """Count solutions, stopping once `limit` is reached"""
+        return self.analyze(grid, limit=limit)["solution_count"]
+
+    def _build(self, cells: List[int], box_size: int) -> Optional[DancingLinks]:
+        """Build the exact-cover matrix, or None if the givens conflict"""
+        size = box_size * box_size
+        cell_count = size * size
+        rows = [0] * size
+        cols = [0] * size
+        boxes = [0] * size
+        box_of = [
+            (i // size // box_size) * box_size + (i % size) // box_size
+            for i in range(cell_count)
+        ]
+
+        for i, value in enumerate(cells):
+            if not value:
+                continue
+            bit = 1 << (value - 1)
+            r, c, b = i // size, i % size, box_of[i]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return None
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+        # Column layout: cell | row-digit | col-digit | box-digit
+        matrix = DancingLinks(4 * cell_count)
+        for i, value in enumerate(cells):
+            if value:
+                continue
+            r, c, b = i // size, i % size, box_of[i]
+            used = rows[r] | cols[c] | boxes[b]
+            for d in range(size):
+                if used >> d & 1:
+                    continue
+                matrix.add_row(i * size + d, (
+                    i,
+                    cell_count + r * size + d,
+                    2 * cell_count + c * size + d,
+                    3 * cell_count + b * size + d,
+                ))
+
+        # Constraints already met by the givens have no rows: drop them
+        for i, value in enumerate(cells):
+            if not value:
+                continue
+            d = value - 1
+            matrix.cover(i)
+            matrix.cover(cell_count + (i // size) * size + d)
+            matrix.cover(2 * cell_count + (i % size) * size + d)
+            matrix.cover(3 * cell_count + box_of[i] * size + d)
+
+        return matrix
+
+
+# ---------- Generator ----------
+
+class SudokuVariantGenerator:
+    """Generates unique-solution NxN puzzles"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.solver = SudokuVariantSolver()
+
+    def generate_solution(self, box_size: int) -> List[int]:
+        """
+        Generate a random complete grid
+
+        Starts from the shifted base pattern and applies random validity-
+        preserving symmetries: row shuffles within bands, band shuffles,
+        the same for columns, and a symbol relabeling.
+        """
+        b = box_size
+        n = b * b
+
+        def shuffled(values):
+            values = list(values)
+            self.rng.shuffle(values)
+            return values
+
+        rows = [g * b + r for g in shuffled(range(b)) for r in shuffled(range(b))]
+        cols = [g * b + c for g in shuffled(range(b)) for c in shuffled(range(b))]
+        symbols = shuffled(range(1, n + 1))
+        return [
+            symbols[(b * (r % b) + r // b + c) % n]
+            for r in rows
+            for c in cols
+        ]
+
+    def dig(self, solution: List[int], clue_target: int) -> List[int]:
+        """Remove clues in symmetric pairs while the solution stays unique"""
+        puzzle = solution[:]
+        cell_count = len(solution)
+        clues = cell_count
+        order = list(range(cell_count // 2 + 1))
+        self.rng.shuffle(order)
+
+        for i in order:
+            if clues <= clue_target:
+                break
+            mirror = cell_count - 1 - i
+            removed = [(i, puzzle[i])]
+            if mirror != i:
+                removed.append((mirror, puzzle[mirror]))
+
+            for index, _ in removed:
+                puzzle[index] = 0
+            check = self.solver.analyze(puzzle, limit=2, max_guesses=DIG_GUESS_BUDGET)
+            if check["complete"] and check["solution_count"] == 1:
+                clues -= len(removed)
+            else:
+                for index, value in removed:
+                    puzzle[index] = value
+
+        return puzzle
+
+    def generate(self, box_size: int, difficulty: str = "medium") -> Dict[str, Any]:
+        """
+        Generate one puzzle
+
+        Args:
+            box_size: 2 (4x4), 3 (9x9), 4 (16x16) or 5 (25x25)
+            difficulty: 'easy', 'medium' or 'hard' (sets the clue share)
+
+        Returns:
+            Dict with `size`, `box_size`, `difficulty`, `clues`, and
+            encoded `puzzle` / `solution` strings
+        """
+        if box_size not in SUPPORTED_BOX_SIZES:
+            raise ValueError(f"Unsupported box size: {box_size}")
+        if difficulty not in VARIANT_CLUE_RATIOS:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+
+        cell_count = box_size ** 4
+        solution = self.generate_solution(box_size)
+        puzzle = self.dig(solution, int(cell_count * VARIANT_CLUE_RATIOS[difficulty]))
+        return {
+            "size": box_size * box_size,
+            "box_size": box_size,
+            "difficulty": difficulty,
+            "clues": sum(1 for v in puzzle if v),
+            "puzzle": encode_grid(puzzle),
+            "solution": encode_grid(solution),
+        }
+
+
+sudoku_variant_solver = SudokuVariantSolver()
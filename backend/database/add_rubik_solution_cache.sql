@@ -0,0 +1,12 @@
+-- Use rubik_solutions as a persistent solution cache
+-- Rows with user_id NULL are shared cache entries keyed by the 54-char
+-- facelet string; per-user history rows are unaffected
+
+ALTER TABLE rubik_solutions ALTER COLUMN user_id DROP NOT NULL;
+
+-- One cache row per cube state (partial: users may solve the same cube)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rubik_solutions_cache_state
+    ON rubik_solutions(cube_state) WHERE user_id IS NULL;
+
+-- Display confirmation
+SELECT 'Rubik solution cache index created successfully' AS status;
@@ -0,0 +1,14 @@
+-- Add canonical hash to sudoku_puzzles
+-- Run this script to deduplicate puzzles that are the same up to symmetry
+-- (relabeling, band/stack swaps, row/column swaps, transposition)
+
+-- Nullable: existing rows are backfilled by the API's puzzle pool job on
+-- startup, which also removes rows whose canonical form already exists
+-- (keeping the earliest; rows referenced by scores or a daily challenge stay)
+ALTER TABLE sudoku_puzzles ADD COLUMN IF NOT EXISTS canonical_hash VARCHAR(40);
+
+-- Unique index: new duplicates are skipped on insert (ON CONFLICT DO NOTHING)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sudoku_puzzles_canonical_hash ON sudoku_puzzles(canonical_hash);
+
+-- Display confirmation
+SELECT 'Sudoku canonical hash column created successfully' AS status;
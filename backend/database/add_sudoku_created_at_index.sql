@@ -0,0 +1,9 @@
+-- Add created_at index to sudoku_puzzles
+-- Run this script to speed up the puzzle index's incremental refresh
+
+-- Each refresh re-reads rows created in the last SUDOKU_INDEX_REFRESH_OVERLAP
+-- seconds, so puzzles committed out of id order are not skipped
+CREATE INDEX IF NOT EXISTS idx_sudoku_puzzles_created_at ON sudoku_puzzles(created_at);
+
+-- Display confirmation
+SELECT 'Sudoku created_at index created successfully' AS status;
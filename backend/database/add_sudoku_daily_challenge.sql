@@ -0,0 +1,10 @@
+-- Add Sudoku daily challenge leaderboard index
+-- Run this script to speed up the daily challenge leaderboard
+
+-- Daily scores are tagged with game_data->>'daily' = 'YYYY-MM-DD'
+CREATE INDEX IF NOT EXISTS idx_game_scores_sudoku_daily
+    ON game_scores ((game_data->>'daily'), (game_data->>'difficulty'))
+    WHERE game_type = 'sudoku';
+
+-- Display confirmation
+SELECT 'Sudoku daily challenge index created successfully' AS status;
@@ -0,0 +1,23 @@
+-- Add packed storage to sudoku_puzzles
+-- Run this script to store puzzles as 4-bit packed grids (41 bytes each)
+-- instead of 81-character text
+
+-- Step 1: packed columns; the legacy text columns become optional
+ALTER TABLE sudoku_puzzles ADD COLUMN IF NOT EXISTS puzzle_packed BYTEA;
+ALTER TABLE sudoku_puzzles ADD COLUMN IF NOT EXISTS solution_packed BYTEA; -- NULL = derived with the solver
+ALTER TABLE sudoku_puzzles ALTER COLUMN puzzle_data DROP NOT NULL;
+ALTER TABLE sudoku_puzzles ALTER COLUMN solution_data DROP NOT NULL;
+
+-- Step 2: existing rows are packed by the API's puzzle pool job on startup
+-- (SUDOKU_POOL_ENABLED=True). New rows are written packed only unless
+-- SUDOKU_STORE_TEXT=True.
+
+-- Step 3 (optional, once every row is packed and no reader needs the text):
+-- UPDATE sudoku_puzzles SET puzzle_data = NULL, solution_data = NULL
+--     WHERE puzzle_packed IS NOT NULL;
+-- To also derive solutions instead of storing them (SUDOKU_STORE_SOLUTION=False):
+-- UPDATE sudoku_puzzles SET solution_packed = NULL;
+-- VACUUM FULL sudoku_puzzles;
+
+-- Display confirmation
+SELECT 'Sudoku packed storage columns created successfully' AS status;
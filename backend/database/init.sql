@@ -35,7 +35,7 @@ CREATE TABLE IF NOT EXISTS game_scores (
 -- Create rubik_solutions table for storing Rubik cube solutions
 CREATE TABLE IF NOT EXISTS rubik_solutions (
     id SERIAL PRIMARY KEY,
-    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE, -- NULL = shared solution cache
     cube_state TEXT NOT NULL, -- 54 character string representing cube state
     solution TEXT NOT NULL, -- Solution steps (e.g., "R U R' U'")
     steps_count INTEGER NOT NULL,
@@ -47,8 +47,11 @@ CREATE TABLE IF NOT EXISTS rubik_solutions (
 CREATE TABLE IF NOT EXISTS sudoku_puzzles (
     id SERIAL PRIMARY KEY,
     difficulty VARCHAR(10) NOT NULL, -- 'easy', 'medium', 'hard'
-    puzzle_data TEXT NOT NULL, -- 81 character string (0 for empty)
-    solution_data TEXT NOT NULL,
+    puzzle_data TEXT, -- 81 character string (0 for empty), legacy
+    solution_data TEXT,
+    puzzle_packed BYTEA, -- 4-bit packed grid (41 bytes)
+    solution_packed BYTEA, -- NULL = derived with the solver
+    canonical_hash VARCHAR(40) UNIQUE, -- SHA-1 of the canonical form (same puzzle up to symmetry)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT check_difficulty CHECK (difficulty IN ('easy', 'medium', 'hard'))
 );
@@ -160,7 +163,9 @@ CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_game_scores_user_id ON game_scores(user_id);
 CREATE INDEX IF NOT EXISTS idx_game_scores_game_type ON game_scores(game_type);
 CREATE INDEX IF NOT EXISTS idx_game_scores_score ON game_scores(score DESC);
+CREATE INDEX IF NOT EXISTS idx_game_scores_sudoku_daily ON game_scores ((game_data->>'daily'), (game_data->>'difficulty')) WHERE game_type = 'sudoku';
 CREATE INDEX IF NOT EXISTS idx_rubik_solutions_user_id ON rubik_solutions(user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rubik_solutions_cache_state ON rubik_solutions(cube_state) WHERE user_id IS NULL;
 CREATE INDEX IF NOT EXISTS idx_user_activity_logs_user_id ON user_activity_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_friendships_user_id ON friendships(user_id);
 CREATE INDEX IF NOT EXISTS idx_friendships_friend_id ON friendships(friend_id);
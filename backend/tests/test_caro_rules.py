@@ -0,0 +1,27 @@
+from app.services.caro_rules import RenjuRules
+
+BLACK = 1
+
+
+def _board(stones, size=15):
+    board = [[0] * size for _ in range(size)]
+    for row, col in stones:
+        board[row][col] = BLACK
+    return board
+
+
+def test_renju_allows_four_three():
+    # Row 7: X X . X -> four after (7,5); column 5: X X above -> open three
+    board = _board([(7, 3), (7, 4), (7, 6), (5, 5), (6, 5)])
+    assert RenjuRules().get_forbidden_reason(board, 7, 5, BLACK) is None
+
+
+def test_renju_forbids_double_three():
+    # Open twos on row 7 and column 7 meeting at (7,7)
+    board = _board([(7, 5), (7, 6), (5, 7), (6, 7)])
+    assert RenjuRules().get_forbidden_reason(board, 7, 7, BLACK) == "Double-three is forbidden for Black"
+
+
+def test_renju_forbids_double_four():
+    board = _board([(7, 4), (7, 5), (7, 6), (4, 7), (5, 7), (6, 7)])
+    assert RenjuRules().get_forbidden_reason(board, 7, 7, BLACK) == "Double-four is forbidden for Black"
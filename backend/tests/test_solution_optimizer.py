@@ -0,0 +1,25 @@
+import asyncio
+
+from app.services import solution_optimizer as optimizer_module
+from app.services.solution_optimizer import count_moves, shorten, simplify
+
+
+def test_simplify_merges_and_cancels():
+    assert simplify(["R", "R'"]) == []
+    assert simplify(["U", "U2"]) == ["U'"]
+    assert simplify(["R", "L", "R"]) == ["R2", "L"]
+    assert count_moves(["R2", "U"], "qtm") == 3
+
+
+def test_shorten_runs_on_optimize_pool_capped_at_its_size(monkeypatch):
+    depths = []
+
+    async def run(fn, notation, depth, timeout=None):
+        depths.append(depth)
+        return ("R U", 0.0, 0.0) if depth == 4 else ("R U F", 0.0, 0.0)
+
+    monkeypatch.setattr(optimizer_module.rubik_optimize_pool, "run", run)
+    monkeypatch.setattr(optimizer_module.rubik_optimize_pool, "max_workers", 2)
+    best = asyncio.run(shorten("cube", ["R", "U", "F", "D", "B"], runs=3))
+    assert sorted(depths) == [3, 4]
+    assert best == ["R", "U"]
@@ -0,0 +1,36 @@
+import asyncio
+
+import kociemba
+
+from app.core.exceptions import CubeSolverBusyError
+from app.services import solver_service as service_module
+from app.services.cube_model import SOLVED_FACELETS, facelet_frames, solves
+from app.services.solver_cache import CacheLookup
+from app.services.solver_service import SolverService
+
+SCRAMBLED = facelet_frames(SOLVED_FACELETS, ["R", "U", "F2", "L'"])[-1]
+
+
+class _Cache:
+    async def get_or_solve(self, notation, solve):
+        return CacheLookup(kociemba.solve(notation), "memory")
+
+    def put(self, notation, solution):
+        pass
+
+    def discard(self, notation):
+        pass
+
+
+def test_busy_optimal_pool_falls_back_to_two_phase(monkeypatch):
+    async def busy(*args, **kwargs):
+        raise CubeSolverBusyError("busy")
+
+    monkeypatch.setattr(service_module, "solver_cache", _Cache())
+    monkeypatch.setattr(service_module, "tables_available", lambda: True)
+    monkeypatch.setattr(service_module.rubik_optimal_pool, "run", busy)
+
+    response = asyncio.run(SolverService().solve(None, notation=SCRAMBLED, optimal=True))
+    assert response.success
+    assert response.optimal is False
+    assert solves(SCRAMBLED, response.algorithm.split())
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from app.services import sudoku_daily as daily_module
+from app.services.sudoku_codec import pack_grid
+from app.services.sudoku_daily import SudokuDailyChallenge
+from app.services.sudoku_index import SudokuPuzzleIndex
+
+_RECORD = pack_grid([0] * 81) + pack_grid([1] * 81)
+
+
+def test_missing_daily_is_cached_until_precompute(monkeypatch):
+    index = SudokuPuzzleIndex()
+    # Created today: too new for today's selection
+    index._add(1, "easy", _RECORD, datetime.utcnow())
+    monkeypatch.setattr(daily_module, "sudoku_puzzle_index", index)
+    selections = []
+    select = index.select
+    monkeypatch.setattr(index, "select", lambda *a, **kw: selections.append(a) or select(*a, **kw))
+
+    daily = SudokuDailyChallenge()
+    for _ in range(5):
+        assert daily.get("easy") is None
+        assert daily.is_daily_puzzle(1, "easy") is None
+    assert len(selections) == 1
+
+    daily.precompute(daily.today())
+    assert len(selections) == 1 + len(daily_module.DIFFICULTY_ORDER)
+
+
+def test_is_daily_puzzle_does_not_compute(monkeypatch):
+    index = SudokuPuzzleIndex()
+    index._add(1, "easy", _RECORD, datetime(2024, 1, 1))
+    monkeypatch.setattr(daily_module, "sudoku_puzzle_index", index)
+
+    daily = SudokuDailyChallenge()
+    assert daily.is_daily_puzzle(1, "easy") is None
+    assert daily.get("easy").puzzle_id == 1
+    assert daily.is_daily_puzzle(1, "easy") == daily.today().isoformat()
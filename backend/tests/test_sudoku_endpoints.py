@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import sudoku
+from app.core.database import get_db
+from app.core.exception_handlers import app_exception_handler
+from app.core.exceptions import AppException
+from app.services.sudoku_batch import sudoku_batch_runner
+
+PUZZLE = (
+    "530070000600195000098000060800060003400803001"
+    "700020006060000280000419005000080079"
+)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(sudoku.router, prefix="/api/games")
+    app.add_exception_handler(AppException, app_exception_handler)
+    app.dependency_overrides[get_db] = lambda: None
+    yield TestClient(app)
+    sudoku_batch_runner.shutdown()
+
+
+def _matrix(grid):
+    return [[int(ch) for ch in grid[r * 9:(r + 1) * 9]] for r in range(9)]
+
+
+def test_solve_endpoint(client):
+    response = client.post("/api/games/sudoku/solve", json={"grid": _matrix(PUZZLE)})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["solvable"] and body["unique"]
+    assert body["solution"][0] == [5, 3, 4, 6, 7, 8, 9, 1, 2]
+
+
+def test_batch_endpoint_streams_a_result_per_line(client):
+    body = "\n".join([PUZZLE, "bad line", PUZZLE.replace("5", ".", 1)] * 50) + "\n"
+    response = client.post("/api/games/sudoku/batch", content=body.encode())
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["line"] for r in results] == list(range(1, 151))
+    assert results[0]["unique"] and results[0]["solution"].startswith("534678912")
+    assert "error" in results[1]
+    assert results[2]["puzzle"] == results[0]["puzzle"].replace("5", "0", 1)
+
+
+def test_batch_endpoint_rejects_overlong_lines(client):
+    response = client.post("/api/games/sudoku/batch", content=b"1" * 100000)
+    assert response.status_code == 400
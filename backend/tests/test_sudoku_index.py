@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.game import SudokuPuzzle
+from app.services.sudoku_codec import pack_grid
+from app.services.sudoku_index import SudokuPuzzleIndex
+
+_RECORD = pack_grid([0] * 81) + pack_grid([1] * 81)
+
+
+def _index(*created):
+    index = SudokuPuzzleIndex()
+    for puzzle_id, created_at in enumerate(created, start=1):
+        index._add(puzzle_id, "easy", _RECORD, created_at)
+    return index
+
+
+def test_select_is_deterministic_within_cutoff():
+    index = _index(datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 10))
+    picks = {
+        index.select("easy", seed=f"day-{n}", created_before=datetime(2024, 1, 5))["id"]
+        for n in range(20)
+    }
+    assert picks <= {1, 2}
+    first = index.select("easy", seed="day-1", created_before=datetime(2024, 1, 5))
+    again = index.select("easy", seed="day-1", created_before=datetime(2024, 1, 5))
+    assert first["id"] == again["id"]
+
+
+def test_select_does_not_widen_past_cutoff():
+    index = _index(datetime(2024, 1, 10), datetime(2024, 1, 11))
+    assert index.select("easy", seed="day", created_before=datetime(2024, 1, 5)) is None
+
+
+def test_refresh_picks_up_rows_committed_out_of_id_order():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[SudokuPuzzle.__table__])
+    db = sessionmaker(bind=engine)()
+    puzzle, solution = "0" * 81, "1" * 81
+
+    index = SudokuPuzzleIndex()
+    db.add(SudokuPuzzle(id=1, difficulty="easy", puzzle_data=puzzle, solution_data=solution))
+    # Id 3 commits first; id 2 was still in an open transaction
+    db.add(SudokuPuzzle(id=3, difficulty="easy", puzzle_data=puzzle, solution_data=solution))
+    db.commit()
+    assert index.load(db) == 2
+
+    db.add(SudokuPuzzle(id=2, difficulty="easy", puzzle_data=puzzle, solution_data=solution))
+    db.commit()
+    assert index.refresh(db) == 1
+    assert index.get(2)["id"] == 2
+    assert index.size("easy") == 3
+    # Rows in the overlap window that are already indexed are not added twice
+    assert index.refresh(db) == 0
+    assert index.size("easy") == 3
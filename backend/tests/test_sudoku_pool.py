@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.game import GameScore, SudokuPuzzle
+from app.models.user import User
+from app.services import sudoku_pool as pool_module
+from app.services.sudoku_canonical import canonical_hash
+from app.services.sudoku_pool import SudokuPoolRefiller
+from app.services.sudoku_solver import flatten_grid
+
+PUZZLE = (
+    "530070000600195000098000060800060003400803001"
+    "700020006060000280000419005000080079"
+)
+# The same puzzle transposed: equal up to symmetry
+TRANSPOSED = "".join(PUZZLE[c * 9 + r] for r in range(9) for c in range(9))
+OTHER = "1" + PUZZLE[1:]
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(
+        engine, tables=[User.__table__, GameScore.__table__, SudokuPuzzle.__table__]
+    )
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(pool_module, "SessionLocal", factory)
+    monkeypatch.setattr(pool_module.sudoku_daily_challenge, "puzzle_ids", lambda: {5})
+    monkeypatch.setattr(pool_module.sudoku_puzzle_index, "load", lambda db: 0)
+    return factory
+
+
+def _seed(factory, puzzles, score_puzzle_ids=(), hashed=()):
+    db = factory()
+    db.add(User(id=1, username="player", email="p@example.com", password_hash="x", salt="x"))
+    for puzzle_id, data in puzzles:
+        digest = canonical_hash(flatten_grid(data)) if puzzle_id in hashed else None
+        db.add(SudokuPuzzle(
+            id=puzzle_id, difficulty="easy", puzzle_data=data,
+            canonical_hash=digest, created_at=datetime(2024, 1, 1)
+        ))
+    for puzzle_id in score_puzzle_ids:
+        db.add(GameScore(user_id=1, game_type="sudoku", game_data={"puzzle_id": puzzle_id}))
+    db.commit()
+    db.close()
+
+
+def _remaining(factory):
+    db = factory()
+    rows = {p.id: p.canonical_hash for p in db.query(SudokuPuzzle).all()}
+    db.close()
+    return rows
+
+
+def test_backfill_removes_unreferenced_duplicate(session_factory):
+    _seed(session_factory, [(1, PUZZLE), (2, TRANSPOSED), (3, OTHER)])
+    counts = SudokuPoolRefiller().backfill_canonical_hashes()
+    assert counts == {"hashed": 2, "removed": 1, "kept": 0}
+    assert sorted(_remaining(session_factory)) == [1, 3]
+
+
+def test_backfill_keeps_duplicates_referenced_by_scores_or_daily(session_factory):
+    _seed(session_factory, [(1, PUZZLE), (2, TRANSPOSED), (5, PUZZLE)], score_puzzle_ids=[2])
+    counts = SudokuPoolRefiller().backfill_canonical_hashes()
+    assert counts == {"hashed": 1, "removed": 0, "kept": 2}
+    remaining = _remaining(session_factory)
+    assert remaining[1] is not None
+    assert remaining[2] is None and remaining[5] is None
+
+
+def test_backfill_moves_hash_to_earliest_row(session_factory):
+    # Row 2 was inserted by the refiller, already hashed
+    _seed(session_factory, [(1, PUZZLE), (2, TRANSPOSED)], hashed=[2])
+    counts = SudokuPoolRefiller().backfill_canonical_hashes()
+    assert counts == {"hashed": 1, "removed": 1, "kept": 0}
+    assert list(_remaining(session_factory)) == [1]
+
+
+def test_backfill_keeps_newer_referenced_copy(session_factory):
+    _seed(session_factory, [(1, PUZZLE), (2, TRANSPOSED)], score_puzzle_ids=[2], hashed=[2])
+    counts = SudokuPoolRefiller().backfill_canonical_hashes()
+    assert counts == {"hashed": 0, "removed": 1, "kept": 0}
+    assert list(_remaining(session_factory)) == [2]
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.exceptions import AppException
+from app.services import sudoku_service as service_module
+from app.services.sudoku_codec import pack_grid
+from app.services.sudoku_daily import SudokuDailyChallenge
+from app.services.sudoku_index import SudokuPuzzleIndex
+from app.services.sudoku_service import SudokuService
+
+_RECORD = pack_grid([0] * 81) + pack_grid([1] * 81)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    index = SudokuPuzzleIndex()
+    index._add(1, "easy", _RECORD, datetime(2024, 1, 1))
+    index._add(2, "easy", _RECORD, datetime(2024, 1, 2))
+    daily = SudokuDailyChallenge()
+    monkeypatch.setattr(service_module, "sudoku_puzzle_index", index)
+    monkeypatch.setattr(service_module, "sudoku_daily_challenge", daily)
+    monkeypatch.setattr("app.services.sudoku_daily.sudoku_puzzle_index", index)
+    return SudokuService(db=None)
+
+
+def test_get_puzzle_hides_solution_of_daily_challenge(service):
+    daily = service_module.sudoku_daily_challenge.get("easy")
+    other = 2 if daily.puzzle_id == 1 else 1
+    assert service.get_puzzle(puzzle_id=daily.puzzle_id)["solution"] is None
+    assert service.get_puzzle(puzzle_id=other)["solution"] == [[1] * 9] * 9
+
+
+@pytest.mark.parametrize("puzzle_grid, solution_grid", [
+    ([[0] * 9] * 8, [[1] * 9] * 9),
+    ([[0] * 9] * 9, [[1] * 9] * 8),
+    ([[0] * 9] * 9, [[1] * 8] * 9),
+])
+def test_get_hint_rejects_malformed_grid(puzzle_grid, solution_grid):
+    with pytest.raises(AppException) as excinfo:
+        SudokuService(db=None).get_hint(puzzle_grid, solution_grid)
+    assert excinfo.value.status_code == 400
+
+
+def test_get_hint_points_out_mistake():
+    solution = [[(3 * (r % 3) + r // 3 + c) % 9 + 1 for c in range(9)] for r in range(9)]
+    grid = [[0] * 9 for _ in range(9)]
+    grid[4][2] = solution[4][2] % 9 + 1
+    hint = SudokuService(db=None).get_hint(grid, solution)
+    assert (hint["technique"], hint["row"], hint["col"]) == ("mistake", 4, 2)
+    assert hint["value"] == solution[4][2]
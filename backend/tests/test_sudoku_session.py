@@ -0,0 +1,59 @@
+import pytest
+
+from app.services.sudoku_session import SudokuSession, SudokuSessionStore
+
+PUZZLE = (
+    "530070000600195000098000060800060003400803001"
+    "700020006060000280000419005000080079"
+)
+SOLUTION = (
+    "534678912672195348198342567859761423426853791"
+    "713924856961537284287419635345286179"
+)
+
+
+def test_rejects_conflicts_by_unit():
+    session = SudokuSession("s", PUZZLE)
+    assert session.move(0, 2, 5)["conflict"] == "row"
+    assert session.move(0, 2, 8)["conflict"] == "column"
+    assert session.move(0, 2, 6)["conflict"] == "box"
+    assert session.move(0, 0, 4)["error"] == "Cell is already filled"
+    assert session.filled == 30 and session.moves == 0
+
+
+def test_clearing_restores_the_masks():
+    session = SudokuSession("s", PUZZLE)
+    assert session.move(0, 2, 4)["valid"]
+    assert session.validate(0, 5, 4)["conflict"] == "row"
+    assert session.move(0, 2, 0)["valid"]
+    assert session.validate(0, 5, 4)["valid"]
+    assert session.move(0, 0, 0)["error"] == "Cannot clear a given cell"
+    assert session.filled == 30 and session.moves == 2
+
+
+def test_filling_the_solution_completes_the_session():
+    session = SudokuSession("s", PUZZLE)
+    result = None
+    for index, (given, value) in enumerate(zip(PUZZLE, SOLUTION)):
+        if given == "0":
+            result = session.move(index // 9, index % 9, int(value))
+            assert result["valid"]
+    assert result["complete"] and result["solved"]
+    assert session.filled == 81
+
+
+def test_conflicting_givens_are_rejected():
+    with pytest.raises(ValueError):
+        SudokuSession("s", "55" + PUZZLE[2:])
+
+
+def test_store_expires_idle_sessions_and_evicts_oldest():
+    store = SudokuSessionStore(max_sessions=2, ttl_seconds=60)
+    first = store.create(PUZZLE)
+    second = store.create(PUZZLE)
+    third = store.create(PUZZLE)
+    assert store.get(first.session_id) is None
+    assert store.get(second.session_id) is second
+
+    third.last_active -= 120
+    assert store.get(third.session_id) is None
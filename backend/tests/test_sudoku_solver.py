@@ -0,0 +1,46 @@
+import pytest
+
+from app.services.sudoku_solver import flatten_grid, sudoku_solver, to_matrix
+
+PUZZLE = (
+    "530070000600195000098000060800060003400803001"
+    "700020006060000280000419005000080079"
+)
+SOLUTION = (
+    "534678912672195348198342567859761423426853791"
+    "713924856961537284287419635345286179"
+)
+
+
+def test_solve_returns_the_unique_solution():
+    assert sudoku_solver.solve(PUZZLE) == to_matrix(flatten_grid(SOLUTION))
+    assert sudoku_solver.has_unique_solution(PUZZLE)
+    assert sudoku_solver.is_valid_solution(SOLUTION)
+
+
+def test_analyze_counts_multiple_solutions():
+    analysis = sudoku_solver.analyze("0" * 81, limit=2)
+    assert analysis["solution_count"] == 2
+    assert sudoku_solver.is_valid_solution(analysis["solution"])
+
+
+def test_unsolvable_grid_has_no_solution():
+    # Two 5s in the first row
+    grid = "55" + PUZZLE[2:]
+    assert sudoku_solver.solve(grid) is None
+    assert sudoku_solver.count_solutions(grid) == 0
+
+
+def test_check_reports_conflicts_and_wrong_cells():
+    cells = flatten_grid(PUZZLE)
+    cells[2] = 5  # conflicts with the 5 at index 0
+    cells[5] = 2  # no conflict, but the solution has 8 there
+    result = sudoku_solver.check(cells, SOLUTION)
+    assert result["conflicts"] == [0, 2]
+    assert result["wrong"] == [2, 5]
+
+
+@pytest.mark.parametrize("grid", ["123", [[0] * 9] * 8, [[0] * 8] * 9])
+def test_flatten_grid_rejects_bad_shapes(grid):
+    with pytest.raises(ValueError):
+        flatten_grid(grid)
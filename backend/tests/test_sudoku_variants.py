@@ -0,0 +1,68 @@
+import pytest
+
+from app.core.exceptions import AppException
+from app.services.sudoku_dlx import DancingLinks
+from app.services.sudoku_service import SudokuService
+from app.services.sudoku_variants import (
+    SudokuVariantGenerator,
+    decode_grid,
+    encode_grid,
+    sudoku_variant_solver,
+)
+
+PUZZLE_9 = (
+    "530070000600195000098000060800060003400803001"
+    "700020006060000280000419005000080079"
+)
+
+
+def test_dlx_finds_knuths_exact_cover():
+    # Knuth's example: rows 0, 3 and 4 cover columns 0-6 exactly once
+    rows = [[2, 4, 5], [0, 3, 6], [1, 2, 5], [0, 3], [1, 6], [3, 4, 6]]
+    matrix = DancingLinks(7)
+    for row_id, columns in enumerate(rows):
+        matrix.add_row(row_id, columns)
+    result = matrix.search(limit=2)
+    assert [sorted(s) for s in result["solutions"]] == [[0, 3, 4]]
+    assert result["complete"]
+
+
+def test_dlx_guess_budget_marks_search_incomplete():
+    matrix = DancingLinks(2)
+    for row_id in range(4):
+        matrix.add_row(row_id, [row_id % 2])
+    result = matrix.search(limit=10, max_guesses=0)
+    assert not result["complete"]
+
+
+def test_variant_solver_matches_9x9_and_4x4():
+    analysis = sudoku_variant_solver.analyze(PUZZLE_9)
+    assert analysis["solution_count"] == 1
+    assert encode_grid(analysis["solution"]).startswith("534678912")
+
+    assert sudoku_variant_solver.count_solutions("1000001000010000") == 2
+    assert sudoku_variant_solver.solve("1200340000000000") is not None
+    assert sudoku_variant_solver.solve("1100000000000000") is None
+
+
+@pytest.mark.parametrize("box_size", [2, 3])
+def test_generator_yields_unique_puzzles(box_size):
+    generated = SudokuVariantGenerator(seed=7).generate(box_size, "medium")
+    puzzle, solution = decode_grid(generated["puzzle"]), decode_grid(generated["solution"])
+    assert generated["size"] == box_size * box_size
+    assert generated["clues"] == sum(1 for v in puzzle if v)
+    assert all(p in (0, s) for p, s in zip(puzzle, solution))
+    assert sudoku_variant_solver.count_solutions(puzzle) == 1
+
+
+@pytest.mark.parametrize("size", [-4, 0, 6, 36])
+def test_generate_variant_rejects_unsupported_sizes(size):
+    with pytest.raises(AppException) as excinfo:
+        SudokuService(db=None).generate_variant(size)
+    assert excinfo.value.status_code == 400
+
+
+def test_generate_variant_returns_matrices():
+    result = SudokuService(db=None).generate_variant(4, "easy")
+    assert len(result["puzzle_grid"]) == 4
+    assert all(len(row) == 4 for row in result["solution_grid"])